@@ -2,6 +2,7 @@
 dessert_2020_2024.csv vs 소비자물가(CPI) 상관관계 분석
 - 분기별 디저트 매출·비중 집계
 - CPI, inflation_mom, expected_inflation과 상관분석
+- 행정동별 lag 0~4 상관 + Granger 검정 (BH FDR 보정)
 - 산점도, 상관행렬, 시계열 비교 시각화
 """
 import sys
@@ -12,16 +13,6 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import seaborn as sns
-
-plt.rcParams["axes.unicode_minus"] = False
-for f in fm.fontManager.ttflist:
-    if "AppleGothic" in f.name or "Nanum" in f.name or "Malgun" in f.name:
-        plt.rcParams["font.family"] = f.name
-        break
-else:
-    plt.rcParams["font.family"] = "DejaVu Sans"
 
 FIG_DIR = Path("outputs/figures/correlation")
 CSV_DIR = Path("outputs/correlation")
@@ -34,25 +25,28 @@ def main():
     dessert_path = Path("data/processed/dessert_2020_2024.csv")
     ml_path = Path("data/processed/dessert_ml_ready.csv")
     if ml_path.exists() and "디저트_비중" in pd.read_csv(ml_path, nrows=1).columns:
-        df_dessert = pd.read_csv(ml_path)
-        has_ratio = True
+        panel_path, has_ratio = ml_path, True
     else:
-        df_dessert = pd.read_csv(dessert_path)
-        has_ratio = False
+        panel_path, has_ratio = dessert_path, False
+    df_dessert = pd.read_csv(panel_path)
 
     print("1. 디저트 데이터 로드")
     print(f"   행 수: {len(df_dessert):,}, 컬럼: {list(df_dessert.columns[:8])}...")
 
-    # 2. 분기별 집계
-    agg = df_dessert.groupby(["연도", "분기"]).agg(
-        총_디저트_매출=("당월_매출_금액", "sum"),
-        평균_디저트_매출=("당월_매출_금액", "mean"),
-        행정동_수=("당월_매출_금액", "count"),
-    ).reset_index()
-    if has_ratio and "디저트_비중" in df_dessert.columns:
-        ratio_agg = df_dessert.groupby(["연도", "분기"])["디저트_비중"].mean().reset_index().rename(columns={"디저트_비중": "평균_디저트_비중"})
-        agg = agg.merge(ratio_agg, on=["연도", "분기"], how="left")
-    agg["연분기"] = agg["연도"].astype(str) + "-Q" + agg["분기"].astype(str)
+    # 2. 분기별 집계 (행정동 패널 큐브 - 파일이 같으면 캐시 재사용, 서울 수준 합계·건수 슬라이스)
+    from src.data.cube import cube_slice, load_or_build_panel_cube
+
+    cube = load_or_build_panel_cube(panel_path, measures=["당월_매출_금액"] + (["디저트_비중"] if has_ratio else []))
+    total = cube_slice(cube, "당월_매출_금액", level="서울", stat="sum")
+    count = cube_slice(cube, "당월_매출_금액", level="서울", stat="count")["당월_매출_금액"]
+    agg = total[["연도", "분기"]].assign(
+        총_디저트_매출=total["당월_매출_금액"],
+        평균_디저트_매출=total["당월_매출_금액"] / count,
+        행정동_수=count.astype(int),
+    )
+    if has_ratio:
+        agg["평균_디저트_비중"] = cube_slice(cube, "디저트_비중", level="서울", stat="mean")["디저트_비중"].to_numpy()
+    agg["연분기"] = total["연분기"]
 
     print(f"   분기별 집계: {len(agg)}개 연분기")
 
@@ -98,7 +92,31 @@ def main():
     sub = corr.loc[num_cols, cpi_cols] if cpi_cols else corr
     print(sub.to_string())
 
+    # 5-1. 행정동별 lag 상관 · Granger (디저트 비중·성장률 vs 물가, lag 0~4)
+    from src.analysis.correlation import lagged_macro_screen, screen_summary
+    from src.data.preprocess import add_growth_rate
+
+    panel = df_dessert.groupby(["행정동_코드", "연도", "분기"], as_index=False).agg(
+        당월_매출_금액=("당월_매출_금액", "sum"),
+        **({"디저트_비중": ("디저트_비중", "mean")} if has_ratio else {}),
+    ).sort_values(["행정동_코드", "연도", "분기"])
+    panel = add_growth_rate(panel)
+    try:
+        screen = lagged_macro_screen(panel, macro)
+    except ValueError as e:
+        screen = None
+        print(f"\n5-1. 행정동별 lag 상관 · Granger 생략: {e}")
+    else:
+        screen_sum = screen_summary(screen)
+        print("\n5-1. 행정동별 lag 상관 · Granger (FDR q < 0.05 비율)")
+        print(screen_sum.to_string(index=False))
+
     # 6. 시각화
+    import seaborn as sns
+    from src.analysis.plot_style import apply_style
+
+    apply_style()
+
     # 6-1. 상관행렬 히트맵
     fig, ax = plt.subplots(figsize=(10, 8))
     sns.heatmap(corr, annot=True, fmt=".2f", cmap="RdYlBu_r", center=0, ax=ax, vmin=-0.8, vmax=0.8)
@@ -173,6 +191,10 @@ def main():
     corr.to_csv(CSV_DIR / "dessert_cpi_correlation.csv")
     merged.to_csv(CSV_DIR / "dessert_cpi_merged_quarterly.csv", index=False)
     print(f"\n저장: {CSV_DIR / 'dessert_cpi_correlation.csv'}, {CSV_DIR / 'dessert_cpi_merged_quarterly.csv'}")
+    if screen is not None:
+        screen.to_csv(CSV_DIR / "dong_lag_macro_screen.csv", index=False)
+        screen_sum.to_csv(CSV_DIR / "dong_lag_macro_summary.csv", index=False)
+        print(f"저장: {CSV_DIR / 'dong_lag_macro_screen.csv'}, {CSV_DIR / 'dong_lag_macro_summary.csv'}")
     print("\n디저트-소비자물가 상관분석 완료.")
 
 
@@ -0,0 +1,75 @@
+"""
+모듈 import 시간 벤치마크
+- 모듈마다 새 인터프리터에서 import → 최소 시간 (repeat회 중), 함께 로드된 무거운 패키지 표시
+- --detail: python -X importtime 기준 누적 시간 상위 import 출력
+사용: python scripts/bench_import_time.py [모듈 ...] [--repeat 5] [--detail]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "src.data.load_dessert",
+    "src.data.preprocess",
+    "src.models.train",
+    "src.models.runner",
+    "src.models.experiments",
+    "src.analysis.visualize",
+    "src.analysis.inflation_visualize",
+]
+HEAVY = ("sklearn", "xgboost", "statsmodels", "seaborn", "matplotlib", "scipy")
+
+_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(dt, ",".join(heavy))
+"""
+
+
+def time_import(module: str, repeat: int = 5) -> tuple[float, str]:
+    """새 프로세스에서 import 시간 (최솟값), 로드된 무거운 패키지"""
+    best, heavy = float("inf"), ""
+    code = _PROBE.format(root=str(ROOT), module=module, heavy=HEAVY)
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        dt, heavy = out.stdout.strip().split(" ", 1) if " " in out.stdout.strip() else (out.stdout.strip(), "")
+        best = min(best, float(dt))
+    return best, heavy
+
+
+def import_profile(module: str, top: int = 10) -> list[tuple[int, str]]:
+    """python -X importtime 누적 시간(us) 상위 top개"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r}); import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈 import 시간 벤치마크")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--detail", action="store_true", help="-X importtime 상위 누적 시간 출력")
+    args = parser.parse_args()
+
+    print(f"{'모듈':<36} {'import(s)':>10}  로드된 무거운 패키지")
+    for module in args.modules:
+        dt, heavy = time_import(module, args.repeat)
+        print(f"{module:<36} {dt:>10.3f}  {heavy or '-'}")
+        if args.detail:
+            for us, name in import_profile(module):
+                print(f"    {us / 1e6:>8.3f}s  {name}")
@@ -23,7 +23,14 @@ from src.data.preprocess import (
     clip_outliers,
     time_split,
 )
-from src.models.fe_model import fit_fe_model, predict_fe_model, fe_summary_table
+from src.models.fe_model import (
+    fit_fe_model,
+    predict_fe_model,
+    fe_summary_table,
+    fit_fe_grid,
+    wild_cluster_bootstrap,
+)
+from src.models.predict import predict_chunked
 
 
 def _prepare(df: pd.DataFrame, cols: list[str], target: str):
@@ -60,7 +67,7 @@ def run_rolling_cv(df: pd.DataFrame, target: str, baseline_cols: list[str], full
         if len(X_tr) < 10 or len(X_te) < 1:
             continue
         m = LinearRegression().fit(X_tr, y_tr)
-        pred = m.predict(X_te)
+        pred = predict_chunked(m, X_te)
         results["Baseline"].append(eval_model(y_te, pred))
 
         # Full: LR with shock (no FE for rolling - FE needs train dong/t)
@@ -70,7 +77,7 @@ def run_rolling_cv(df: pd.DataFrame, target: str, baseline_cols: list[str], full
         if len(X_tr2) < 10 or len(X_te2) < 1:
             continue
         m2 = LinearRegression().fit(X_tr2, y_tr2)
-        pred2 = m2.predict(X_te2)
+        pred2 = predict_chunked(m2, X_te2)
         results["Full_LR"].append(eval_model(y_te2, pred2))
 
     out = []
@@ -121,8 +128,8 @@ if __name__ == "__main__":
     m_baseline = LinearRegression().fit(X_tr_b, y_tr_b)
     m_full = LinearRegression().fit(X_tr_f, y_tr_f)
 
-    perf_b = eval_model(y_te_b, m_baseline.predict(X_te_b))
-    perf_f = eval_model(y_te_f, m_full.predict(X_te_f))
+    perf_b = eval_model(y_te_b, predict_chunked(m_baseline, X_te_b))
+    perf_f = eval_model(y_te_f, predict_chunked(m_full, X_te_f))
 
     print("  Baseline (lag-only):", perf_b)
     print("  Full (lag+shock):   ", perf_f)
@@ -133,6 +140,9 @@ if __name__ == "__main__":
     fe_model = fit_fe_model(train_df, target=target, shock_cols=shock_cols)
     if fe_model is not None:
         print(f"  FE R² (train): {fe_model.rsquared:.4f}")
+        print(f"  표준오차: {fe_model.cov_type_used}")
+        if fe_model.cov_fallback:
+            print(f"  ({fe_model.cov_fallback} → HC1 대체, wild_cluster_bootstrap 권장)")
         tbl = fe_summary_table(fe_model)
         print(tbl.to_string(index=False))
 
@@ -144,6 +154,32 @@ if __name__ == "__main__":
             perf_fe = eval_model(y_te_all[valid], pred_fe[valid])
             print("  FE (test, 예측가능 행만):", perf_fe)
 
+    # 4-0. 분기 군집 wild bootstrap (군집 ~20개 → 해석적 cluster SE 불안정)
+    boot = pd.DataFrame()
+    if fe_model is not None:
+        print("\n4-0. Wild cluster bootstrap (분기 군집, Webb 가중치)...")
+        boot = wild_cluster_bootstrap(fe_model, cols=shock_cols, cluster="t", n_boot=9999)
+        print(boot.to_string(index=False))
+
+    # 4-1. FE 스펙 그리드 (baseline vs shock 변수별, 공유 demeaned 행렬)
+    print("\n4-1. FE 스펙 그리드...")
+    shock_sets = {
+        "baseline": [],
+        "shock_ma": ["infl_shock_ma", "infl_shock_ma_lag1"],
+        "shock_z": ["infl_shock_z", "infl_shock_z_lag1"],
+        "accel": ["infl_accel", "infl_accel_lag1"],
+        "exp_shock": ["exp_shock_ma", "exp_shock_ma_lag1"],
+        "full": shock_cols,
+    }
+    # shock 변수는 분기 공통값 → 시간 FE에 흡수되므로 행정동 FE만 사용
+    specs = [
+        {"name": name, "target": target, "regressors": baseline_cols + cols, "fe": "entity", "cov_type": "cluster"}
+        for name, cols in shock_sets.items()
+    ]
+    grid = fit_fe_grid(train_df, specs)
+    if len(grid) > 0:
+        print(grid[~grid["변수"].isin(baseline_cols)].to_string(index=False))
+
     # 5. Rolling CV
     print("\n5. Rolling TimeSeriesSplit (Baseline vs Full)...")
     rolling = run_rolling_cv(df, target, baseline_cols, full_cols)
@@ -166,4 +202,8 @@ if __name__ == "__main__":
     if fe_model is not None and len(tbl) > 0:
         tbl.to_csv(out_dir / "fe_coefficients.csv", index=False)
     rolling.to_csv(out_dir / "rolling_cv.csv", index=False)
+    if len(boot) > 0:
+        boot.to_csv(out_dir / "fe_wild_bootstrap.csv", index=False)
+    if len(grid) > 0:
+        grid.to_csv(out_dir / "fe_grid_coefficients.csv", index=False)
     print(f"\n저장: {out_dir}/")
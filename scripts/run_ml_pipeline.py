@@ -3,26 +3,54 @@
 - 타겟: 다음 분기 디저트 비중 (현재 비중 제외, lag_비중만 사용)
 - CPI 변수, TimeSeriesSplit
 - LR, DT, RF, XGBoost, MLP 5개 모델 비교
+- --search: 학습 전 하이퍼파라미터 successive halving
+- --mlp-stream: MLP를 feature store 미니배치로 학습 (또는 ML_MLP_MODE=stream)
+- --district-neighbors: 인접 파일이 없을 때 같은 자치구 행정동을 공간 이웃으로 사용
 """
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import numpy as np
 import pandas as pd
 
 from src.data.load_dessert import load_dessert_data, aggregate_by_year_quarter_dong
 from src.data.preprocess import (
     preprocess_ml,
     add_target,
+    add_multi_horizon_targets,
+    add_category_shares,
     clip_outliers,
     add_cpi,
     time_split,
     calculate_vif,
 )
-from src.models.train import train_and_evaluate, print_performance_table, get_feature_importance, get_feature_cols
+from src.models.train import (
+    train_and_evaluate,
+    print_performance_table,
+    get_feature_importance,
+    get_feature_cols,
+    permutation_importance_all,
+    compare_precision,
+)
+from src.config import get_precision
+from src.models.tree_export import export_tree_models
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="디저트 비중 ML 학습 파이프라인")
+    parser.add_argument("--search", action="store_true", help="학습 전 하이퍼파라미터 successive halving")
+    parser.add_argument(
+        "--mlp-stream", action="store_true",
+        help="MLP를 feature store 미니배치로 학습 (기본: ML_MLP_MODE 환경변수, 없으면 전체 행렬)",
+    )
+    parser.add_argument(
+        "--district-neighbors", action="store_true",
+        help="인접 파일(data/adjacency.csv)이 없을 때 같은 자치구 행정동을 이웃으로 사용",
+    )
+    args = parser.parse_args()
+
     # 1. 데이터 로드 & 전처리
     print("1. 데이터 로드 및 전처리...")
     df = load_dessert_data()
@@ -32,6 +60,8 @@ if __name__ == "__main__":
     # 2. 타겟 생성 (다음 분기 디저트 비중 예측)
     print("2. 타겟 생성 (다음 분기 디저트 비중)...")
     df = add_target(df, value_col="디저트_비중", shift=-1)
+    df = add_multi_horizon_targets(df, value_col="디저트_비중", horizons=(1, 2, 3, 4))
+    df = add_category_shares(df)  # 업종 그룹별 비중·lag·다음 분기 타겟 (target_{그룹})
 
     # 3. CPI(물가) 변수 추가
     print("3. CPI 변수 추가...")
@@ -41,6 +71,11 @@ if __name__ == "__main__":
     print("4. 이상치 클리핑 (IQR)...")
     df = clip_outliers(df, cols=["성장률", "디저트_비중"], iqr_factor=1.5)
 
+    # 4-1. 공간 이웃 피처 (인접 행정동 lag1_비중·성장률 평균, 클리핑된 값 기준)
+    print("4-1. 공간 이웃 피처...")
+    from src.data.spatial import add_spatial_lags
+    df = add_spatial_lags(df, district_fallback=args.district_neighbors)
+
     # 5. VIF 확인
     FEATURE_COLS = get_feature_cols(df)
     print("\n5. 다중공선성 (VIF) 확인...")
@@ -56,27 +91,114 @@ if __name__ == "__main__":
     train_df, test_df = time_split(df, test_year=2024)
     print(f"   Train: {len(train_df):,} / Test: {len(test_df):,}")
 
+    # 6-1. (--search) 하이퍼파라미터 successive halving (train 구간 분기 fold)
+    params = None
+    if args.search:
+        print("\n6-1. 하이퍼파라미터 탐색 (successive halving)...")
+        from src.models.search import search_all
+        params, search_tab = search_all(train_df, FEATURE_COLS)
+        print(search_tab.to_string(index=False))
+        Path("outputs").mkdir(exist_ok=True)
+        search_tab.to_csv(Path("outputs") / "hparam_search.csv", index=False)
+
     # 7. 학습 & 평가 (LR, DT, RF, XGB, MLP)
     print("\n7. 모델 학습 (LR, DT, RF, XGBoost, MLP)...")
-    results = train_and_evaluate(train_df, test_df, feature_cols=FEATURE_COLS)
+    results = train_and_evaluate(
+        train_df, test_df, feature_cols=FEATURE_COLS, params=params,
+        mlp_mode="stream" if args.mlp_stream else None,
+    )
 
     # 7. 성능표
     print_performance_table(results)
 
+    # 7-0. float32 모드: float64 대비 성능 차이 확인 (ML_PRECISION=float32)
+    if get_precision() == "float32":
+        print("\n정밀도 비교 (float64 vs float32):")
+        precision_report = compare_precision(
+            train_df, test_df, feature_cols=FEATURE_COLS, params=params,
+            mlp_mode="stream" if args.mlp_stream else None, results=results,
+        )
+        print(precision_report.to_string(index=False))
+
+    # 7-1. XGBoost 분기 fold CV (패널 양자화 1회, 다음 분기 early stopping)
+    print("\nXGBoost 분기 fold CV (early stopping):")
+    from src.models.xgb_model import build_panel_matrix, xgb_fold_cv
+    xgb_cv = xgb_fold_cv(build_panel_matrix(df, FEATURE_COLS))
+    print(xgb_cv.to_string(index=False))
+
+    # 7-2. 다중 horizon (1~4분기 뒤, horizon별 RandomForest 병렬 학습)
+    print("\n다중 horizon 예측 (RandomForest, direct):")
+    from src.models.horizon import evaluate_horizons, fit_horizons
+    horizon_fit = fit_horizons(
+        train_df, FEATURE_COLS, "RandomForest", params=(params or {}).get("RandomForest"), test_year=2024
+    )
+    horizon_perf = evaluate_horizons(horizon_fit, test_df)
+    print(horizon_perf.to_string(index=False))
+
+    # 7-3. 업종 그룹별 다음 분기 비중 (설계 행렬 공유, 다중 타겟)
+    print("\n업종 그룹별 다음 분기 비중 (RMSE):")
+    from src.data.load_dessert import INDUSTRY_GROUPS
+    from src.models.multi_target import train_multi_target
+    group_targets = [f"target_{g}" for g in INDUSTRY_GROUPS]
+    group_cols = FEATURE_COLS + [f"lag1_{g}_비중" for g in INDUSTRY_GROUPS if g != "디저트"]  # 디저트 lag = lag1_비중
+    multi = train_multi_target(train_df, test_df, group_cols, group_targets, params=params)
+    print(multi["table"].pivot(index="target", columns="model", values="RMSE").to_string())
+
     # 8. Feature Importance (RF, XGB, DT)
     print("\nFeature Importance:")
     imp = get_feature_importance(results)
     print(imp.to_string(index=False))
 
+    # 8-1. Permutation importance (전체 모델, 물가 등 블록 단위)
+    print("\nPermutation Importance (RMSE 증가량, 블록 단위):")
+    perm_imp = permutation_importance_all(results, n_repeats=10)
+    print(perm_imp.pivot(index="feature", columns="model", values="importance_mean").to_string())
+
+    # 8-2. 스태킹 (분기 fold OOF 캐시 → NNLS 메타 학습기)
+    print("\n스태킹 (OOF 기반, 분기 fold RMSE):")
+    from src.models.stacking import BASE_MODELS, oof_matrix, stacking_cv
+    oof = oof_matrix(df, FEATURE_COLS, {m: (params or {}).get(m) for m in BASE_MODELS})
+    stack = stacking_cv(oof)
+    print(stack["table"].to_string(index=False))
+    weights = {m: round(float(w), 3) for m, w in zip(stack["stacker"]["models"], stack["stacker"]["weights"])}
+    print(f"  메타 가중치 (NNLS): {weights}")
+
+    # 8-3. CPI 시나리오 (물가상승률 ±1%p, 마지막 분기 기준, RandomForest)
+    print("\nCPI 시나리오 (물가상승률 ±1%p → 행정동 평균 예측 변화):")
+    from src.models.scenario import macro_history, run_scenarios, scenario_table, shift_path
+    deltas = np.round(np.linspace(-0.01, 0.01, 21), 4)
+    scen = run_scenarios(
+        results["RandomForest"]["model"], df, FEATURE_COLS,
+        shift_path(macro_history(df), "물가상승률", deltas),
+    )
+    scen_tab = scenario_table(scen, names=deltas).groupby("scenario")[["pred", "diff"]].mean().reset_index()
+    print(scen_tab.iloc[::5].to_string(index=False))
+
+    # 8-4. 계층 조정 (RF 비중 예측 × 전체 업종 매출 → 행정동 → 자치구 → 서울, 희소 solve 1회)
+    print("\n계층 예측 조정 (디저트 매출 = RF 비중 예측 × 전체 매출, test 분기):")
+    from src.models.reconcile import reconcile_panel
+    recon = reconcile_panel(df, results["RandomForest"]["model"], FEATURE_COLS, method="mint_diag")
+    print(recon["table"].to_string(index=False))
+
     # 9. 결과 저장
     out_dir = Path("outputs")
     out_dir.mkdir(exist_ok=True)
     imp.to_csv(out_dir / "feature_importance.csv", index=False)
+    perm_imp.to_csv(out_dir / "permutation_importance.csv", index=False)
     vif.to_csv(out_dir / "vif_results.csv", index=False)
+    xgb_cv.to_csv(out_dir / "xgb_fold_cv.csv", index=False)
+    stack["table"].to_csv(out_dir / "stacking_cv.csv", index=False)
+    scen_tab.to_csv(out_dir / "cpi_scenarios.csv", index=False)
+    horizon_perf.to_csv(out_dir / "horizon_performance.csv", index=False)
+    multi["table"].to_csv(out_dir / "multi_target_performance.csv", index=False)
+    recon["table"].to_csv(out_dir / "reconciliation.csv", index=False)
+
+    # 트리 모델(DT/RF/XGB) → 배열 패킹 (대량 스코어링용, predict_packed로 예측)
+    export_tree_models(results, out_dir / "models" / "tree_models.npz")
 
     # 10. k-means 군집 시각화
     print("\n10. k-means 군집 시각화...")
     from src.analysis.visualize import plot_kmeans_clusters
     plot_kmeans_clusters(df, n_clusters=3)
 
-    print(f"\n저장: {out_dir / 'feature_importance.csv'}, {out_dir / 'vif_results.csv'}")
+    print(f"\n저장: {out_dir / 'feature_importance.csv'}, {out_dir / 'vif_results.csv'}, {out_dir / 'models' / 'tree_models.npz'}")
@@ -4,11 +4,12 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src.data.load_dessert import load_dessert_data, aggregate_by_year_quarter_dong
+from src.data.cube import load_or_build_cube
+from src.data.load_dessert import DESSERT_CATEGORIES
 from src.analysis.visualize import plot_all
 
 if __name__ == "__main__":
-    df = load_dessert_data()
-    df = aggregate_by_year_quarter_dong(df, drop_age=True)
-    plot_all(df)
+    # 디저트 업종 큐브 (원본 파일이 같으면 npz 캐시 재사용)
+    cube = load_or_build_cube(industries=DESSERT_CATEGORIES)
+    plot_all(cube)
     print("\n시각화 완료. outputs/figures/basic/ 폴더를 확인하세요.")
@@ -0,0 +1,219 @@
+"""
+행정동별 lag 상관 · Granger 스크리닝 (디저트 비중·성장률 vs 거시 물가 시계열)
+- 패널 → (행정동 × 분기 × 값) 큐브 1개, 거시 → (lag × 분기 × 시계열) lag 큐브 1개
+- 상관: 관측 마스크 포함 합계를 einsum 1회로 → 모든 (행정동, 값, 시계열, lag) 상관 동시 계산
+- Granger: y_t ~ 1 + y_(t-1..p) [+ x_(t-1..p)], 행정동·값·시계열을 배치로 묶어 정규방정식 batched solve
+- p-value는 Benjamini–Hochberg FDR로 보정 (검정 종류별 전체 표 기준)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+VALUE_COLS = ("디저트_비중", "성장률")
+MACRO_COLS = ("CPI_qoq", "inflation_mom", "expected_inflation")
+# MACRO_COLS가 하나도 없을 때 (예: cpi_example.csv 대체 표) 대신 검정할 컬럼
+FALLBACK_MACRO_COLS = ("물가상승률",)
+LAGS = (0, 1, 2, 3, 4)
+
+
+def fdr_bh(p: np.ndarray) -> np.ndarray:
+    """Benjamini–Hochberg 보정 q-value (NaN은 그대로, 모양 유지)"""
+    p = np.asarray(p, dtype=float)
+    q = np.full(p.shape, np.nan)
+    ok = ~np.isnan(p)
+    pv = p[ok]
+    m = len(pv)
+    if m == 0:
+        return q
+    order = np.argsort(pv)
+    ranked = pv[order] * m / np.arange(1, m + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    out = np.empty(m)
+    out[order] = np.minimum(ranked, 1.0)
+    q[ok] = out
+    return q
+
+
+def _panel_cube(df: pd.DataFrame, cols: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """패널 → (D, T, C) 큐브 (결측 NaN), 행정동 코드, 분기 키 (연도*4 + 분기-1, 빈 분기 없이 연속)"""
+    codes, d = np.unique(df["행정동_코드"].astype(str).to_numpy(), return_inverse=True)
+    key = df["연도"].to_numpy() * 4 + df["분기"].to_numpy() - 1
+    quarters = np.arange(key.min(), key.max() + 1)
+    cube = np.full((len(codes), len(quarters), len(cols)), np.nan)
+    cube[d, key - quarters[0]] = df[cols].to_numpy(dtype=float)
+    return cube, codes, quarters
+
+
+def _macro_lags(macro: pd.DataFrame, cols: list[str], quarters: np.ndarray, lags) -> np.ndarray:
+    """거시 분기표 → (L, T, M) lag 큐브: [l, t] = x_(t-l) (패널 이전 분기도 lag에 사용)"""
+    m = macro.assign(_t=macro["연도"] * 4 + macro["분기"] - 1).drop_duplicates("_t").set_index("_t")[cols]
+    full = m.reindex(np.arange(quarters[0] - max(lags), quarters[-1] + 1)).to_numpy(dtype=float)
+    start = max(lags)
+    return np.stack([full[start - l:start - l + len(quarters)] for l in lags])
+
+
+def lagged_correlation(
+    cube: np.ndarray,
+    xlag: np.ndarray,
+    min_obs: int = 6,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    cube (D, T, C), xlag (L, T, M) → 상관 r, 관측 수 n, p-value (모두 (D, C, L, M))
+    쌍별 완전 관측 기준 (행정동마다 관측 분기가 달라도 einsum 1회)
+    """
+    from scipy import stats
+
+    oy, ox = ~np.isnan(cube), ~np.isnan(xlag)
+    y, x = np.where(oy, cube, 0.0), np.where(ox, xlag, 0.0)
+    oy, ox = oy.astype(float), ox.astype(float)
+
+    # 모든 합계를 한 번에: 좌 [1, y, y²] × 우 [1, x, x²] 조합 중 필요한 5개 + n
+    Y = np.stack([oy, y, y * y], axis=-1)  # (D, T, C, 3)
+    X = np.stack([ox, x, x * x], axis=-1)  # (L, T, M, 3)
+    S = np.einsum("dtca,ltmb->dclmab", Y, X, optimize=True)
+    n, sx, sxx = S[..., 0, 0], S[..., 0, 1], S[..., 0, 2]
+    sy, syy, sxy = S[..., 1, 0], S[..., 2, 0], S[..., 1, 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        r = np.where((var > 0) & (n >= min_obs), cov / np.sqrt(var), np.nan)
+        r = np.clip(r, -1.0, 1.0)
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    p = 2 * stats.t.sf(np.abs(t), df=np.maximum(n - 2, 1))
+    p = np.where(np.isnan(r), np.nan, np.where(np.abs(r) == 1, 0.0, p))
+    return r, n, p
+
+
+def _lag_stack(a: np.ndarray, p: int) -> np.ndarray:
+    """(..., T) → (..., T-p, p): [t] = a_(t+p-1) .. a_t (행 t+p의 lag 1..p)"""
+    T = a.shape[-1]
+    return np.stack([a[..., p - k:T - k] for k in range(1, p + 1)], axis=-1)
+
+
+def _batched_rss(X: np.ndarray, y: np.ndarray, ridge: float = 1e-10) -> np.ndarray:
+    """배치 OLS 잔차제곱합: X (B, n, k), y (B, n) (결측 행은 0으로 채워 영향 없음)"""
+    XtX = np.einsum("bnk,bnj->bkj", X, X)
+    Xty = np.einsum("bnk,bn->bk", X, y)
+    scale = np.maximum(np.trace(XtX, axis1=1, axis2=2) / X.shape[-1], 1.0)
+    XtX = XtX + ridge * scale[:, None, None] * np.eye(X.shape[-1])
+    beta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    return np.einsum("bn,bn->b", y, y) - np.einsum("bk,bk->b", beta, Xty)
+
+
+def granger_tests(
+    cube: np.ndarray,
+    x: np.ndarray,
+    orders=(1, 2, 3, 4),
+    min_dof: int = 3,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    cube (D, T, C), x (T, M) → Granger F, p-value (모두 (D, C, P, M))
+    H0: x_(t-1..p)가 y_t 설명에 기여하지 않음 (y 자기 lag 통제)
+    차수별로 (D·C·M) 배치를 한 번에 solve, 결측 분기가 포함된 행은 제외
+    """
+    from scipy import stats
+
+    D, T, C = cube.shape
+    M = x.shape[1]
+    F = np.full((D, C, len(orders), M), np.nan)
+    P = np.full_like(F, np.nan)
+    yc = np.moveaxis(cube, 1, -1)  # (D, C, T)
+    xc = x.T  # (M, T)
+
+    for j, p in enumerate(orders):
+        if T - p <= 2 * p + 1 + min_dof:
+            continue
+        Yt = yc[..., p:]  # (D, C, T-p)
+        Ylag = _lag_stack(yc, p)  # (D, C, T-p, p)
+        Xlag = _lag_stack(xc, p)  # (M, T-p, p)
+        n_t = T - p
+
+        # 배치 (D, C, M) 평탄화
+        Yt_b = np.broadcast_to(Yt[:, :, None], (D, C, M, n_t))
+        Ylag_b = np.broadcast_to(Ylag[:, :, None], (D, C, M, n_t, p))
+        Xlag_b = np.broadcast_to(Xlag[None, None], (D, C, M, n_t, p))
+        ones = np.ones((D, C, M, n_t, 1))
+        Zr = np.concatenate([ones, Ylag_b], axis=-1)
+        Zu = np.concatenate([Zr, Xlag_b], axis=-1)
+
+        ok = ~(np.isnan(Yt_b) | np.isnan(Zu).any(axis=-1))  # (D, C, M, n_t)
+        n = ok.sum(axis=-1)
+        y = np.where(ok, Yt_b, 0.0).reshape(-1, n_t)
+        Zr = np.where(ok[..., None], Zr, 0.0).reshape(-1, n_t, p + 1)
+        Zu = np.where(ok[..., None], Zu, 0.0).reshape(-1, n_t, 2 * p + 1)
+
+        rss_r = _batched_rss(Zr, y).reshape(D, C, M)
+        rss_u = _batched_rss(Zu, y).reshape(D, C, M)
+        dof = n - (2 * p + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            f = ((rss_r - rss_u) / p) / (rss_u / dof)
+        f = np.where((dof >= min_dof) & (rss_u > 0), np.maximum(f, 0.0), np.nan)
+        F[:, :, j] = f
+        P[:, :, j] = np.where(np.isnan(f), np.nan, stats.f.sf(f, p, np.maximum(dof, 1)))
+    return F, P
+
+
+def lagged_macro_screen(
+    panel: pd.DataFrame,
+    macro: pd.DataFrame | None = None,
+    value_cols: tuple[str, ...] = VALUE_COLS,
+    macro_cols: tuple[str, ...] = MACRO_COLS,
+    lags: tuple[int, ...] = LAGS,
+    min_obs: int = 6,
+) -> pd.DataFrame:
+    """
+    panel: 행정동_코드, 연도, 분기, value_cols (행정동 × 분기)
+    macro: 연도, 분기, macro_cols 분기표 (None이면 panel의 거시 컬럼 사용)
+      macro_cols가 하나도 없으면 FALLBACK_MACRO_COLS 중 있는 컬럼으로 검정, 그것도 없으면 ValueError
+    반환 (tidy): 행정동_코드, series, macro, lag, n, corr, corr_p, corr_q, granger_F, granger_p, granger_q
+      - lag 0: 동시점 상관 (Granger 없음), lag l ≥ 1: x_(t-l)과의 상관 + 차수 l Granger 검정
+    """
+    value_cols = [c for c in value_cols if c in panel.columns]
+    if macro is None:
+        candidates = [c for c in (*macro_cols, *FALLBACK_MACRO_COLS) if c in panel.columns]
+        macro = panel.groupby(["연도", "분기"], as_index=False)[candidates].first()
+    macro_cols = [c for c in macro_cols if c in macro.columns] or [c for c in FALLBACK_MACRO_COLS if c in macro.columns]
+    if not value_cols or not macro_cols:
+        raise ValueError(f"분석할 컬럼이 없습니다: value={value_cols}, macro={macro_cols}")
+
+    cube, codes, quarters = _panel_cube(panel, value_cols)
+    xlag = _macro_lags(macro, macro_cols, quarters, lags)
+    r, n, p_corr = lagged_correlation(cube, xlag, min_obs=min_obs)
+
+    orders = tuple(l for l in lags if l >= 1)
+    x0 = _macro_lags(macro, macro_cols, quarters, (0,))[0]
+    F, p_gr = granger_tests(cube, x0, orders)
+    G_F = np.full(r.shape, np.nan)
+    G_p = np.full(r.shape, np.nan)
+    for j, l in enumerate(orders):
+        G_F[:, :, list(lags).index(l)] = F[:, :, j]
+        G_p[:, :, list(lags).index(l)] = p_gr[:, :, j]
+
+    D, C, L, M = r.shape
+    idx = np.indices((D, C, L, M)).reshape(4, -1)
+    out = pd.DataFrame({
+        "행정동_코드": codes[idx[0]],
+        "series": np.asarray(value_cols)[idx[1]],
+        "macro": np.asarray(macro_cols)[idx[3]],
+        "lag": np.asarray(lags)[idx[2]],
+        "n": n.ravel().astype(int),
+        "corr": r.ravel(),
+        "corr_p": p_corr.ravel(),
+        "granger_F": G_F.ravel(),
+        "granger_p": G_p.ravel(),
+    })
+    out.insert(out.columns.get_loc("corr_p") + 1, "corr_q", fdr_bh(out["corr_p"].to_numpy()))
+    out["granger_q"] = fdr_bh(out["granger_p"].to_numpy())
+    return out
+
+
+def screen_summary(table: pd.DataFrame, alpha: float = 0.05) -> pd.DataFrame:
+    """(series, macro, lag)별 평균 상관, FDR 유의 행정동 비율"""
+    g = table.groupby(["series", "macro", "lag"])
+    return pd.DataFrame({
+        "평균_상관": g["corr"].mean(),
+        "상관_유의_비율": g["corr_q"].apply(lambda q: float((q < alpha).mean())),
+        "Granger_유의_비율": g["granger_q"].apply(lambda q: float((q < alpha).mean()) if q.notna().any() else np.nan),
+    }).reset_index()
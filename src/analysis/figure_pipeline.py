@@ -0,0 +1,120 @@
+"""
+그림 파이프라인: 집계 → 렌더 분리, 프로세스 풀 병렬 렌더 + 변경 없는 그림 건너뛰기
+- 그림 1개 = (렌더 함수, 집계 데이터, 파라미터): 렌더 함수는 집계 데이터만 받아 Figure 반환 (모듈 최상위 함수)
+- fingerprint = (렌더 함수·모듈 소스, 집계 데이터, 파라미터, dpi, 한글 폰트) → out_dir/_manifest.json에 PNG와 함께 기록
+- 재실행 시 fingerprint가 같고 PNG가 있으면 건너뜀
+- 남은 그림은 Agg 백엔드 워커 프로세스에서 동시 렌더·저장
+- 렌더 실패한 그림은 manifest 기록 후 RuntimeError로 한 번에 보고 (성공한 그림은 다음 실행에서 건너뜀)
+"""
+from __future__ import annotations
+
+import inspect
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+from src.config import get_n_jobs
+from src.data.cache import fingerprint
+
+MANIFEST = "_manifest.json"
+DPI = 120
+
+# 파일명: (렌더 함수, 집계 데이터, 파라미터)
+FigureSpec = tuple[Callable, object, dict]
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render_one(render: Callable, data, params: dict, path: str, dpi: int) -> str:
+    """렌더 함수 실행 → PNG 저장 (워커 프로세스 또는 메인 프로세스)"""
+    import matplotlib.pyplot as plt
+
+    from src.analysis.plot_style import apply_style
+
+    apply_style()
+    fig = render(data, **params)
+    try:
+        fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return path
+
+
+def figure_fingerprint(spec: FigureSpec, dpi: int = DPI, font: str | None = None) -> str:
+    render, data, params = spec
+    # 렌더 함수가 쓰는 모듈 헬퍼·상수 변경도 반영되도록 모듈 전체 소스 포함
+    module_src = inspect.getsource(inspect.getmodule(render))
+    return fingerprint(inspect.getsource(render), module_src, data, params, dpi, font)
+
+
+def render_figures(
+    figures: dict[str, FigureSpec],
+    out_dir: str | Path,
+    force: bool = False,
+    n_jobs: int | None = None,
+    dpi: int = DPI,
+) -> list[Path]:
+    """
+    figures: {파일명: (렌더 함수, 집계 데이터, 파라미터)}
+    force: fingerprint 일치해도 다시 렌더
+    반환: 새로 저장한 PNG 경로 목록 (건너뛴 그림 제외)
+    렌더 실패가 있으면 manifest 저장 후 RuntimeError (실패한 파일명 목록)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    from src.analysis.plot_style import resolve_font
+
+    font = resolve_font()
+    fps = {name: figure_fingerprint(spec, dpi, font) for name, spec in figures.items()}
+    todo = [n for n in figures if force or manifest.get(n) != fps[n] or not (out_dir / n).exists()]
+    skipped = len(figures) - len(todo)
+    if skipped:
+        print(f"  ({out_dir}) 변경 없는 그림 {skipped}개 건너뜀")
+
+    saved, failed = [], []
+
+    def _checkpoint(name: str) -> None:
+        manifest[name] = fps[name]
+        saved.append(out_dir / name)
+        print(f"저장: {out_dir / name}")
+
+    n_jobs = min(get_n_jobs(n_jobs), len(todo))
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as ex:
+            futures = {
+                ex.submit(_render_one, *figures[name], str(out_dir / name), dpi): name
+                for name in todo
+            }
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    fut.result()
+                    _checkpoint(name)
+                except Exception:
+                    print(f"  [{name}] 렌더 실패")
+                    traceback.print_exc()
+                    failed.append(name)
+    else:
+        for name in todo:
+            try:
+                _render_one(*figures[name], str(out_dir / name), dpi)
+                _checkpoint(name)
+            except Exception:
+                print(f"  [{name}] 렌더 실패")
+                traceback.print_exc()
+                failed.append(name)
+
+    if todo:
+        manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    if failed:
+        raise RuntimeError(f"그림 렌더 실패 ({out_dir}): {sorted(failed)}")
+    return saved
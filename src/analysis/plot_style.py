@@ -0,0 +1,64 @@
+"""
+플롯 공통 스타일: 한글 폰트 지연 결정
+- import 시에는 폰트 목록을 스캔하지 않음
+- apply_style(): 그림을 처음 그릴 때 호출 (프로세스당 1회만 적용, 이후 호출은 무시)
+- 선택한 폰트는 data/cache/plot_font.json에 저장 (matplotlib 버전 기준) → 다음 실행부터 스캔 생략
+- 저장된 폰트가 fontManager에 없거나 matplotlib 폰트 캐시(fontlist json)가 더 최근이면 다시 스캔
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from src.data.cache import CACHE_DIR
+
+KOREAN_FONTS = ("AppleGothic", "Nanum", "Malgun")
+FALLBACK_FONT = "DejaVu Sans"
+FONT_CACHE = CACHE_DIR / "plot_font.json"
+
+_applied = False
+
+
+def _fontlist_path() -> Path:
+    """matplotlib fontManager 캐시 파일 (폰트 설치·삭제 후 재생성됨)"""
+    import matplotlib
+    from matplotlib import font_manager as fm
+
+    return Path(matplotlib.get_cachedir()) / f"fontlist-v{fm.FontManager.__version__}.json"
+
+
+def resolve_font(refresh: bool = False) -> str:
+    """한글 폰트 이름 (저장된 선택이 유효하면 사용 → 아니면 fontManager 스캔 후 저장)"""
+    import matplotlib
+    from matplotlib import font_manager as fm
+
+    if not refresh and FONT_CACHE.exists():
+        cached = json.loads(FONT_CACHE.read_text())
+        fontlist = _fontlist_path()
+        stale = fontlist.exists() and fontlist.stat().st_mtime > FONT_CACHE.stat().st_mtime
+        if (
+            cached.get("matplotlib") == matplotlib.__version__
+            and not stale
+            and any(f.name == cached.get("font") for f in fm.fontManager.ttflist)
+        ):
+            return cached["font"]
+
+    font = next(
+        (f.name for f in fm.fontManager.ttflist if any(k in f.name for k in KOREAN_FONTS)),
+        FALLBACK_FONT,
+    )
+    FONT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    FONT_CACHE.write_text(json.dumps({"font": font, "matplotlib": matplotlib.__version__}, ensure_ascii=False))
+    return font
+
+
+def apply_style(refresh: bool = False) -> None:
+    """rcParams에 한글 폰트·마이너스 기호 설정 (refresh=True면 폰트 다시 스캔)"""
+    global _applied
+    if _applied and not refresh:
+        return
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["axes.unicode_minus"] = False
+    plt.rcParams["font.family"] = resolve_font(refresh)
+    _applied = True
@@ -1,33 +1,39 @@
-"""디저트 소비 데이터 시각화"""
+"""
+디저트 소비 데이터 시각화
+- 그림마다 집계(_agg_*) → 렌더(_render_*) 분리: 렌더는 작은 집계 결과만 받아 Figure 반환
+- plot_* 는 figure_pipeline.render_figures로 저장 (병렬 렌더, 집계·파라미터가 같으면 건너뜀)
+- 기본 시각화 집계는 사전 집계 큐브(data.cube) 슬라이스에서 계산 (행정동 패널을 넘기면 큐브로 변환)
+  행정동 값 = 선택 업종 평균 (aggregate_by_year_quarter_dong과 같은 기준)
+"""
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-plt.rcParams["axes.unicode_minus"] = False
-# 한글 폰트 (맥 기본)
-for f in fm.fontManager.ttflist:
-    if "AppleGothic" in f.name or "Nanum" in f.name or "Malgun" in f.name:
-        plt.rcParams["font.family"] = f.name
-        break
-else:
-    plt.rcParams["font.family"] = "DejaVu Sans"
+from src.analysis.figure_pipeline import render_figures
+from src.data.cube import build_cube, cube_slice
 
 
-def plot_monthly_trend(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/basic") -> None:
-    """월별(분기별) 디저트 매출 추이 - 5개년 (데이터는 분기 단위)"""
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+# ---------- 기본 시각화 ----------
 
-    # 분기 -> 대표 월 (3, 6, 9, 12)
-    q_to_month = {1: 3, 2: 6, 3: 9, 4: 12}
-    df = df.copy()
-    df["대표월"] = df["분기"].map(q_to_month)
-    df["년월"] = df["연도"].astype(str) + "-" + df["대표월"].astype(str).str.zfill(2)
+def _as_cube(data):
+    """행정동 패널(DataFrame) → 큐브, 큐브(build_cube/load_cube 결과)는 그대로"""
+    return build_cube(data) if isinstance(data, pd.DataFrame) else data
+
+
+def _dong_slice(cube, measures) -> pd.DataFrame:
+    return cube_slice(cube, measures, level="행정동", stat="mean")
 
-    agg = df.groupby(["연도", "분기", "년월"])["당월_매출_금액"].sum().reset_index()
+
+def _agg_monthly_trend(cube) -> pd.DataFrame:
+    # 분기 -> 대표 월 (3, 6, 9, 12)
+    agg = _dong_slice(cube, "당월_매출_금액").groupby(["연도", "분기"])["당월_매출_금액"].sum().reset_index()
+    agg["년월"] = agg["연도"].astype(str) + "-" + (agg["분기"] * 3).astype(str).str.zfill(2)
     agg["매출_억"] = agg["당월_매출_금액"] / 100_000_000
+    return agg[["년월", "매출_억"]]
+
 
+def _render_monthly_trend(agg: pd.DataFrame):
     fig, ax = plt.subplots(figsize=(16, 5))
     x = range(len(agg))
     ax.plot(x, agg["매출_억"], marker="o", color="#667eea", linewidth=2, markersize=5)
@@ -38,63 +44,50 @@ def plot_monthly_trend(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/
     ax.set_ylabel("매출 (억원)")
     ax.set_title("디저트(카페·제과점) 총 매출 추이 (2020~2024 분기별)")
     ax.grid(axis="y", alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(out_dir / "monthly_trend.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'monthly_trend.png'}")
+    fig.tight_layout()
+    return fig
 
 
-def plot_quarterly_trend(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/basic") -> None:
-    """연도·분기별 매출 추이 (라인)"""
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    df = df.copy()
-    df["연분기"] = df["연도"].astype(str) + "-Q" + df["분기"].astype(str)
-    agg = df.groupby("연분기")["당월_매출_금액"].sum().reset_index()
+def _agg_quarterly_trend(cube) -> pd.DataFrame:
+    agg = _dong_slice(cube, "당월_매출_금액").groupby("연분기")["당월_매출_금액"].sum().reset_index()
     agg["매출_억"] = agg["당월_매출_금액"] / 100_000_000
+    return agg[["연분기", "매출_억"]]
+
 
+def _render_quarterly_trend(agg: pd.DataFrame):
     fig, ax = plt.subplots(figsize=(14, 5))
     ax.plot(agg["연분기"], agg["매출_억"], marker="o", color="#667eea", linewidth=2, markersize=6)
     ax.fill_between(range(len(agg)), agg["매출_억"], alpha=0.3)
     ax.set_xlabel("연분기")
     ax.set_ylabel("매출 (억원)")
     ax.set_title("연분기별 디저트 총 매출 추이")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(out_dir / "quarterly_trend.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'quarterly_trend.png'}")
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
 
 
-def plot_top_districts(df: pd.DataFrame, n: int = 15, out_dir: Path | str = "outputs/figures/basic") -> None:
-    """매출 상위 행정동 (전체 기간 합계)"""
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+def _agg_top_districts(cube, n: int = 15) -> pd.Series:
+    agg = _dong_slice(cube, "당월_매출_금액").groupby("행정동_코드_명")["당월_매출_금액"].sum().sort_values(ascending=True).tail(n)
+    return agg / 100_000_000  # 억원
 
-    agg = df.groupby("행정동_코드_명")["당월_매출_금액"].sum().sort_values(ascending=True).tail(n)
-    agg = agg / 100_000_000  # 억원
 
+def _render_top_districts(agg: pd.Series, n: int = 15):
     fig, ax = plt.subplots(figsize=(10, 8))
-    bars = ax.barh(agg.index, agg.values, color="#10b981", alpha=0.8)
+    ax.barh(agg.index, agg.values, color="#10b981", alpha=0.8)
     ax.set_xlabel("매출 (억원)")
     ax.set_title(f"디저트 매출 상위 {n}개 행정동 (2020~2024 합계)")
-    plt.tight_layout()
-    plt.savefig(out_dir / "top_districts.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'top_districts.png'}")
+    fig.tight_layout()
+    return fig
 
 
-def plot_gender_ratio(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/basic") -> None:
-    """연도별 남성/여성 매출 비율"""
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    agg = df.groupby("연도").agg(
+def _agg_gender_ratio(cube) -> pd.DataFrame:
+    return _dong_slice(cube, ["남성_매출_금액", "여성_매출_금액"]).groupby("연도").agg(
         남성=("남성_매출_금액", "sum"),
         여성=("여성_매출_금액", "sum"),
     ).reset_index()
 
+
+def _render_gender_ratio(agg: pd.DataFrame):
     fig, ax = plt.subplots(figsize=(10, 5))
     x = range(len(agg))
     w = 0.35
@@ -106,76 +99,80 @@ def plot_gender_ratio(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/b
     ax.set_ylabel("매출 (억원)")
     ax.set_title("연도별 성별 디저트 매출")
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(out_dir / "gender_ratio.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'gender_ratio.png'}")
+    fig.tight_layout()
+    return fig
 
 
-def plot_preprocess_results(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/preprocess") -> None:
-    """전처리 결과 시각화 (preprocess.py 출력)"""
-    import seaborn as sns
+def plot_monthly_trend(data, out_dir: Path | str = "outputs/figures/basic") -> None:
+    """월별(분기별) 디저트 매출 추이 - 5개년 (데이터는 분기 단위)"""
+    render_figures({"monthly_trend.png": (_render_monthly_trend, _agg_monthly_trend(_as_cube(data)), {})}, out_dir)
 
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    df = df.dropna(subset=["lag1", "lag4"])
 
-    # 1. 디저트 비중 분포
+def plot_quarterly_trend(data, out_dir: Path | str = "outputs/figures/basic") -> None:
+    """연도·분기별 매출 추이 (라인)"""
+    render_figures({"quarterly_trend.png": (_render_quarterly_trend, _agg_quarterly_trend(_as_cube(data)), {})}, out_dir)
+
+
+def plot_top_districts(data, n: int = 15, out_dir: Path | str = "outputs/figures/basic") -> None:
+    """매출 상위 행정동 (전체 기간 합계)"""
+    render_figures({"top_districts.png": (_render_top_districts, _agg_top_districts(_as_cube(data), n), {"n": n})}, out_dir)
+
+
+def plot_gender_ratio(data, out_dir: Path | str = "outputs/figures/basic") -> None:
+    """연도별 남성/여성 매출 비율"""
+    render_figures({"gender_ratio.png": (_render_gender_ratio, _agg_gender_ratio(_as_cube(data)), {})}, out_dir)
+
+
+# ---------- 전처리 결과 ----------
+
+def _histogram(s: pd.Series, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """히스토그램은 (빈도, 구간 경계)만 넘겨 렌더"""
+    return np.histogram(s.dropna().to_numpy(dtype=float), bins=bins)
+
+
+def _render_hist(hist, color: str, xlabel: str, title: str, vline: float | None = None):
+    counts, edges = hist
     fig, ax = plt.subplots(figsize=(8, 4))
-    ax.hist(df["디저트_비중"], bins=50, color="#667eea", alpha=0.8, edgecolor="white")
-    ax.set_xlabel("디저트 비중")
+    ax.hist(edges[:-1], bins=edges, weights=counts, color=color, alpha=0.8, edgecolor="white")
+    if vline is not None:
+        ax.axvline(vline, color="gray", linestyle="--")
+    ax.set_xlabel(xlabel)
     ax.set_ylabel("빈도")
-    ax.set_title("디저트 비중 분포 (카페+제과점 / 전체 상권)")
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_dessert_ratio.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_dessert_ratio.png'}")
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
 
-    # 2. 원본 vs 로그 변환 (분포 비교)
+
+def _render_log_transform(hists):
+    raw, log = hists
     fig, axes = plt.subplots(1, 2, figsize=(12, 4))
-    axes[0].hist(df["당월_매출_금액"] / 1e8, bins=50, color="#667eea", alpha=0.8)
+    axes[0].hist(raw[1][:-1], bins=raw[1], weights=raw[0], color="#667eea", alpha=0.8)
     axes[0].set_xlabel("당월 매출 (억원)")
     axes[0].set_ylabel("빈도")
     axes[0].set_title("원본 매출")
-    axes[1].hist(df["log_당월_매출_금액"], bins=50, color="#10b981", alpha=0.8)
+    axes[1].hist(log[1][:-1], bins=log[1], weights=log[0], color="#10b981", alpha=0.8)
     axes[1].set_xlabel("log(매출+1)")
     axes[1].set_ylabel("빈도")
     axes[1].set_title("로그 변환 후")
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_log_transform.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_log_transform.png'}")
+    fig.tight_layout()
+    return fig
+
 
-    # 3. lag1 vs 당월 매출 (산점도)
+def _render_lag1_scatter(sample: pd.DataFrame):
     fig, ax = plt.subplots(figsize=(6, 6))
-    sample = df.sample(min(2000, len(df)), random_state=42)
-    ax.scatter(sample["lag1"] / 1e8, sample["당월_매출_금액"] / 1e8, alpha=0.3, s=10, c="#667eea")
+    ax.scatter(sample["lag1"], sample["당월_매출_금액"], alpha=0.3, s=10, c="#667eea")
     ax.set_xlabel("lag1 (전분기 매출, 억원)")
     ax.set_ylabel("당월 매출 (억원)")
     ax.set_title("전분기 매출 vs 당월 매출")
-    ax.plot([0, sample["당월_매출_금액"].max() / 1e8], [0, sample["당월_매출_금액"].max() / 1e8], "r--", alpha=0.5, label="y=x")
+    top = sample["당월_매출_금액"].max()
+    ax.plot([0, top], [0, top], "r--", alpha=0.5, label="y=x")
     ax.legend()
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_lag1_scatter.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_lag1_scatter.png'}")
+    fig.tight_layout()
+    return fig
 
-    # 4. 성장률 분포
-    fig, ax = plt.subplots(figsize=(8, 4))
-    gr = df["성장률"].clip(-0.5, 0.5)
-    ax.hist(gr, bins=60, color="#f59e0b", alpha=0.8, edgecolor="white")
-    ax.axvline(0, color="gray", linestyle="--")
-    ax.set_xlabel("성장률 (전분기 대비)")
-    ax.set_ylabel("빈도")
-    ax.set_title("성장률 분포 (±50%로 클리핑)")
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_growth_rate.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_growth_rate.png'}")
 
-    # 5. 계절성 (분기별 month_sin, month_cos)
+def _render_seasonality(q_mean: pd.DataFrame):
     fig, axes = plt.subplots(1, 2, figsize=(10, 4))
-    q_mean = df.groupby("분기")[["month_sin", "month_cos"]].mean()
     axes[0].bar(q_mean.index, q_mean["month_sin"], color="#8b5cf6", alpha=0.8)
     axes[0].set_xlabel("분기")
     axes[0].set_ylabel("month_sin 평균")
@@ -184,22 +181,65 @@ def plot_preprocess_results(df: pd.DataFrame, out_dir: Path | str = "outputs/fig
     axes[1].set_xlabel("분기")
     axes[1].set_ylabel("month_cos 평균")
     axes[1].set_title("분기별 month_cos")
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_seasonality.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_seasonality.png'}")
+    fig.tight_layout()
+    return fig
+
+
+def _render_corr_heatmap(corr: pd.DataFrame, title: str):
+    import seaborn as sns
 
-    # 6. 파생 변수 상관행렬
-    cols = ["당월_매출_금액", "디저트_비중", "log_당월_매출_금액", "lag1", "lag4", "성장률", "month_sin", "month_cos"]
-    cols = [c for c in cols if c in df.columns]
-    corr = df[cols].corr()
     fig, ax = plt.subplots(figsize=(8, 7))
     sns.heatmap(corr, annot=True, fmt=".2f", cmap="RdYlBu_r", center=0, ax=ax, vmin=-0.5, vmax=1)
-    ax.set_title("전처리 변수 상관행렬")
-    plt.tight_layout()
-    plt.savefig(out_dir / "preprocess_correlation.png", dpi=120, bbox_inches="tight")
-    plt.close()
-    print(f"저장: {out_dir / 'preprocess_correlation.png'}")
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+
+def preprocess_figures(df: pd.DataFrame) -> dict:
+    """전처리 결과 그림 6개의 (렌더 함수, 집계, 파라미터)"""
+    df = df.dropna(subset=["lag1", "lag4"])
+    sample = df.sample(min(2000, len(df)), random_state=42)[["lag1", "당월_매출_금액"]] / 1e8
+    cols = ["당월_매출_금액", "디저트_비중", "log_당월_매출_금액", "lag1", "lag4", "성장률", "month_sin", "month_cos"]
+    cols = [c for c in cols if c in df.columns]
+
+    return {
+        # 1. 디저트 비중 분포
+        "preprocess_dessert_ratio.png": (
+            _render_hist, _histogram(df["디저트_비중"], 50),
+            {"color": "#667eea", "xlabel": "디저트 비중", "title": "디저트 비중 분포 (카페+제과점 / 전체 상권)"},
+        ),
+        # 2. 원본 vs 로그 변환 (분포 비교)
+        "preprocess_log_transform.png": (
+            _render_log_transform,
+            (_histogram(df["당월_매출_금액"] / 1e8, 50), _histogram(df["log_당월_매출_금액"], 50)),
+            {},
+        ),
+        # 3. lag1 vs 당월 매출 (산점도)
+        "preprocess_lag1_scatter.png": (_render_lag1_scatter, sample, {}),
+        # 4. 성장률 분포
+        "preprocess_growth_rate.png": (
+            _render_hist, _histogram(df["성장률"].clip(-0.5, 0.5), 60),
+            {"color": "#f59e0b", "xlabel": "성장률 (전분기 대비)", "title": "성장률 분포 (±50%로 클리핑)", "vline": 0},
+        ),
+        # 5. 계절성 (분기별 month_sin, month_cos)
+        "preprocess_seasonality.png": (
+            _render_seasonality, df.groupby("분기")[["month_sin", "month_cos"]].mean(), {},
+        ),
+        # 6. 파생 변수 상관행렬
+        "preprocess_correlation.png": (
+            _render_corr_heatmap, df[cols].corr(), {"title": "전처리 변수 상관행렬"},
+        ),
+    }
+
+
+def plot_preprocess_results(
+    df: pd.DataFrame,
+    out_dir: Path | str = "outputs/figures/preprocess",
+    force: bool = False,
+    n_jobs: int | None = None,
+) -> None:
+    """전처리 결과 시각화 (preprocess.py 출력)"""
+    render_figures(preprocess_figures(df), out_dir, force=force, n_jobs=n_jobs)
 
 
 def plot_kmeans_clusters(
@@ -207,27 +247,14 @@ def plot_kmeans_clusters(
     n_clusters: int = 3,
     out_dir: Path | str = "outputs/figures/ml",
 ) -> None:
-    """k-means 군집 결과: 군집별 평균 디저트 비중 추이 시각화"""
-    from sklearn.cluster import KMeans
-    from sklearn.preprocessing import StandardScaler
-
-    from src.data.preprocess import create_cluster_features
+    """k-means 군집 결과: 군집별 평균 디저트 비중 추이 시각화 (군집 라벨은 assign_clusters 캐시 재사용)"""
+    from src.analysis.plot_style import apply_style
+    from src.models.clustering import assign_clusters
 
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    cluster_df = create_cluster_features(df)
-    feat_cols = ["매출_mean", "매출_std", "성장률_mean", "디저트_비중_mean"]
-    X = cluster_df[feat_cols].fillna(0)
-    X_scaled = StandardScaler().fit_transform(X)
-
-    km = KMeans(n_clusters=n_clusters, random_state=42)
-    cluster_df["cluster"] = km.fit_predict(X_scaled)
-
-    # 군집 라벨 -> 이름
-    cluster_df["cluster_name"] = cluster_df["cluster"].map(
-        lambda c: ["고소비 안정형", "저소비 변동형", "성장형"][c % 3]
-    )
+    cluster_df = assign_clusters(df, n_clusters=n_clusters)
 
     # 원본 df에 군집 병합
     df_merged = df.merge(
@@ -245,6 +272,7 @@ def plot_kmeans_clusters(
     )
     trend["연분기"] = trend["연도"].astype(str) + "-Q" + trend["분기"].astype(str)
 
+    apply_style()
     fig, ax = plt.subplots(figsize=(12, 5))
     for name in trend["cluster_name"].unique():
         sub = trend[trend["cluster_name"] == name]
@@ -260,8 +288,16 @@ def plot_kmeans_clusters(
     print(f"저장: {out_dir / 'kmeans_cluster_trend.png'}")
 
 
-def plot_all(df: pd.DataFrame, out_dir: Path | str = "outputs/figures/basic") -> None:
-    """모든 시각화 생성"""
-    plot_monthly_trend(df, out_dir=out_dir)
-    plot_top_districts(df, out_dir=out_dir)
-    plot_gender_ratio(df, out_dir=out_dir)
+def plot_all(
+    data,
+    out_dir: Path | str = "outputs/figures/basic",
+    force: bool = False,
+    n_jobs: int | None = None,
+) -> None:
+    """모든 시각화 생성 (data: 큐브 또는 행정동 패널, 큐브 슬라이스 집계 후 한 번에 병렬 렌더)"""
+    cube = _as_cube(data)
+    render_figures({
+        "monthly_trend.png": (_render_monthly_trend, _agg_monthly_trend(cube), {}),
+        "top_districts.png": (_render_top_districts, _agg_top_districts(cube), {"n": 15}),
+        "gender_ratio.png": (_render_gender_ratio, _agg_gender_ratio(cube), {}),
+    }, out_dir, force=force, n_jobs=n_jobs)
@@ -0,0 +1,74 @@
+"""
+파이프라인 공통 설정
+- 코어 예산: 병렬 작업 수 (환경변수 ML_N_JOBS, 기본: CPU 코어 수)
+- 정밀도: 피처 저장소·설계 행렬 dtype (환경변수 ML_PRECISION=float32|float64, 기본 float64)
+  OLS 해·VIF·FE 회귀 등 수치적으로 필요한 곳은 항상 float64로 올려 계산
+- MLP 학습 방식: full (전체 행렬 fit) | stream (feature store 미니배치) (환경변수 ML_MLP_MODE, 기본 full)
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+_PRECISIONS = ("float32", "float64")
+_MLP_MODES = ("full", "stream")
+_precision: str | None = None
+
+
+def get_n_jobs(n_jobs: int | None = None) -> int:
+    """
+    병렬 작업 수 결정.
+    n_jobs=None → ML_N_JOBS 환경변수, 없으면 CPU 코어 수
+    n_jobs<0 → CPU 코어 수 + 1 + n_jobs (-1 = 전체 코어)
+    """
+    cpu = os.cpu_count() or 1
+    if n_jobs is None:
+        n_jobs = int(os.environ.get("ML_N_JOBS", cpu))
+    if n_jobs < 0:
+        n_jobs = cpu + 1 + n_jobs
+    return max(1, n_jobs)
+
+
+def get_precision() -> str:
+    """현재 정밀도: set_precision 값 → ML_PRECISION 환경변수 → float64"""
+    p = _precision or os.environ.get("ML_PRECISION", "float64")
+    if p not in _PRECISIONS:
+        raise ValueError(f"ML_PRECISION은 {_PRECISIONS} 중 하나: {p}")
+    return p
+
+
+def set_precision(precision: str | None) -> str:
+    """정밀도 변경 (None: 환경변수/기본값으로 복귀). 이전 값 반환."""
+    global _precision
+    prev = get_precision()
+    if precision is not None and precision not in _PRECISIONS:
+        raise ValueError(f"precision은 {_PRECISIONS} 중 하나: {precision}")
+    _precision = precision
+    return prev
+
+
+@contextmanager
+def precision(p: str | None):
+    """with precision("float32"): 블록 안에서만 정밀도 변경, 끝나면 이전 설정으로 복귀 (미설정이면 다시 환경변수 기준)"""
+    global _precision
+    prev = _precision
+    set_precision(p)
+    try:
+        yield
+    finally:
+        _precision = prev
+
+
+def get_dtype() -> np.dtype:
+    """설계 행렬 dtype"""
+    return np.dtype(get_precision())
+
+
+def get_mlp_mode(mode: str | None = None) -> str:
+    """MLP 학습 방식: mode 인자 → ML_MLP_MODE 환경변수 → full"""
+    mode = mode or os.environ.get("ML_MLP_MODE", "full")
+    if mode not in _MLP_MODES:
+        raise ValueError(f"ML_MLP_MODE는 {_MLP_MODES} 중 하나: {mode}")
+    return mode
@@ -0,0 +1,87 @@
+"""
+캐시 유틸: 입력 fingerprint + 전처리 패널(feature store) 저장/재사용
+- fingerprint: DataFrame·배열·파라미터를 묶어 짧은 해시
+- files_fingerprint: 원본 파일 이름·크기·수정시각 (내용 재해시 없이 변경 감지)
+- load_or_build: key가 같으면 pickle 재사용, 아니면 빌드 후 저장
+"""
+from __future__ import annotations
+
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path("data/cache")
+
+
+def _update(h, obj) -> None:
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(str(obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(str((obj.dtype, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for o in obj:
+            _update(h, o)
+        h.update(b"]")
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=str):
+            _update(h, k)
+            _update(h, obj[k])
+        h.update(b"}")
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*parts, length: int = 16) -> str:
+    """여러 입력을 묶은 sha256 해시 (앞 length자리)"""
+    h = hashlib.sha256()
+    for p in parts:
+        _update(h, p)
+    return h.hexdigest()[:length]
+
+
+def files_fingerprint(paths: list[str | Path], patterns: tuple[str, ...] = ("*.csv", "*.xlsx", "*.xls")) -> str:
+    """파일/폴더 목록의 (이름, 크기, 수정시각) 해시. 폴더는 patterns로 하위 파일 탐색."""
+    stats = []
+    for p in map(Path, paths):
+        files = sorted(f for pat in patterns for f in p.glob(pat)) if p.is_dir() else [p]
+        for f in files:
+            if f.exists():
+                st = f.stat()
+                stats.append((str(f), st.st_size, st.st_mtime_ns))
+    return fingerprint(stats)
+
+
+def load_or_build(
+    name: str,
+    key: str,
+    build_fn: Callable[[], object],
+    cache_dir: str | Path = CACHE_DIR,
+):
+    """
+    cache_dir/{name}_{key}.pkl 이 있으면 로드, 없으면 build_fn() 결과 저장 후 반환.
+    같은 name의 이전 key 파일은 삭제 (오래된 캐시 누적 방지).
+    """
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{name}_{key}.pkl"
+    if path.exists():
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    obj = build_fn()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for old in cache_dir.glob(f"{name}_{'?' * len(key)}.pkl"):
+        old.unlink()
+    with open(path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return obj
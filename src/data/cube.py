@@ -0,0 +1,200 @@
+"""
+사전 집계 큐브 (분기 × 행정동 × 업종): 측정값별 합계·건수 + 자치구·서울 roll-up
+- 원본(업종 컬럼 있음) 또는 행정동 패널(업종 없음 → 단일 업종 "전체") 1회 스캔으로 생성
+- 셀 키 = (분기, 행정동, 업종) → bincount 1회/측정값, 자치구(행정동_코드 앞 5자리)·서울은 큐브에서 합산
+- 행정동 축 = (행정동_코드, 행정동_코드_명) 쌍: 이름이 바뀐 동은 이름별로 별도 행 (원본 groupby와 동일)
+- 캐시 파일: cube_{업종·측정값 sub-key}_{원본·코드 fingerprint}.npz (같은 sub-key의 이전 파일만 교체)
+- 저장: 배열별 columnar npz ("{수준}/{sum|count}/{측정값}") → np.load는 접근한 배열만 읽음
+- cube_slice: 필요한 수준·측정값·업종만 꺼내 작은 tidy 표로 (플롯·노트북 질의용)
+"""
+from __future__ import annotations
+
+import inspect
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, files_fingerprint, fingerprint
+
+CUBE_DIR = CACHE_DIR / "cube"
+CUBE_MEASURES = ["당월_매출_금액", "당월_매출_건수", "남성_매출_금액", "여성_매출_금액"]
+LEVELS = ("행정동", "자치구", "서울")
+
+
+def _quarter_key(df: pd.DataFrame) -> np.ndarray:
+    """연도*4 + 분기-1 (연도·분기가 없으면 기준_년분기_코드에서 파싱)"""
+    if "연도" in df.columns and "분기" in df.columns:
+        return df["연도"].to_numpy(dtype=int) * 4 + df["분기"].to_numpy(dtype=int) - 1
+    code = df["기준_년분기_코드"].astype(str)
+    return code.str[:4].astype(int).to_numpy() * 4 + code.str[-1].astype(int).to_numpy() - 1
+
+
+def build_cube(
+    df: pd.DataFrame,
+    measures: list[str] | None = None,
+    industry_col: str | None = None,
+    gu_len: int = 5,
+) -> dict:
+    """
+    df: 원본 상권 데이터(서비스_업종_코드_명 포함) 또는 행정동 × 분기 패널
+    measures: 합산할 수치 컬럼 (기본 CUBE_MEASURES 중 있는 것)
+    반환: {"quarters", "codes", "names", "gu", "industries", "measures",
+           "{수준}/sum/{측정값}", "{수준}/count/{측정값}"} - 행정동 (T, D, I), 자치구 (T, G, I), 서울 (T, I)
+    codes, names: 행정동 축 (코드, 이름) 쌍 - 이름이 바뀐 동은 코드가 여러 번 나옴
+    count = 측정값이 결측이 아닌 원본 행 수 (mean = sum / count)
+    """
+    from .load_dessert import INDUSTRY_COL
+
+    industry_col = industry_col or INDUSTRY_COL
+    measures = [m for m in (measures or CUBE_MEASURES) if m in df.columns]
+
+    quarters, t = np.unique(_quarter_key(df), return_inverse=True)
+    code = df["행정동_코드"].astype(str)
+    name = df["행정동_코드_명"].fillna("").astype(str) if "행정동_코드_명" in df.columns else code
+    dong = pd.DataFrame({"code": code.to_numpy(dtype=str), "name": name.to_numpy(dtype=str)}).groupby(["code", "name"])
+    d = dong.ngroup().to_numpy()
+    pairs = dong.size().index
+    codes = pairs.get_level_values("code").to_numpy(dtype=str)
+    names = pairs.get_level_values("name").to_numpy(dtype=str)
+    if industry_col in df.columns:
+        i, industries = pd.factorize(df[industry_col].fillna("미분류"), sort=True)
+    else:
+        i, industries = np.zeros(len(df), dtype=int), ["전체"]
+    T, D, I = len(quarters), len(codes), len(industries)
+
+    gu, g = np.unique(pd.Series(codes).str[:gu_len].to_numpy(dtype=str), return_inverse=True)
+    onehot = np.eye(len(gu))[g].T  # (G, D)
+
+    cube = {
+        "quarters": quarters,
+        "codes": codes,
+        "names": names,
+        "gu": gu,
+        "industries": np.asarray(industries, dtype=str),
+        "measures": np.asarray(measures, dtype=str),
+    }
+    flat = (t * D + d) * I + i
+    for m in measures:
+        v = df[m].to_numpy(dtype=float)
+        ok = ~np.isnan(v)
+        for stat, w in (("sum", np.where(ok, v, 0.0)), ("count", ok.astype(float))):
+            dong = np.bincount(flat, weights=w, minlength=T * D * I).reshape(T, D, I)
+            cube[f"행정동/{stat}/{m}"] = dong
+            cube[f"자치구/{stat}/{m}"] = np.einsum("gd,tdi->tgi", onehot, dong)
+            cube[f"서울/{stat}/{m}"] = dong.sum(axis=1)
+    return cube
+
+
+def save_cube(cube: dict, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **cube)
+    return path
+
+
+def load_cube(path: str | Path):
+    """npz 큐브 열기 (배열은 접근할 때 읽음)"""
+    return np.load(path, allow_pickle=False)
+
+
+def _code_fingerprint() -> str:
+    """큐브를 만드는 코드 (cube.py, load_dessert.py) 소스 해시 - 집계 방식이 바뀌면 캐시 무효화"""
+    from . import load_dessert
+
+    return fingerprint(inspect.getsource(sys.modules[__name__]), inspect.getsource(load_dessert))
+
+
+def _cached_cube(build_fn, sub: str, key: str, cache_dir: str | Path):
+    """cube_{sub}_{key}.npz가 있으면 로드, 없으면 build_fn() 저장 (같은 sub의 이전 파일만 삭제)"""
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"cube_{sub}_{key}.npz"
+    if path.exists():
+        return load_cube(path)
+
+    cube = build_fn()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for old in cache_dir.glob(f"cube_{sub}_*.npz"):
+        old.unlink()
+    save_cube(cube, path)
+    return load_cube(path)
+
+
+def load_or_build_cube(
+    raw_data_dir: str | Path = "data/raw",
+    industries: list[str] | None = None,
+    measures: list[str] | None = None,
+    cache_dir: str | Path = CUBE_DIR,
+):
+    """
+    원본 로드 → (industries만 필터) → build_cube, (원본 파일, 코드) fingerprint 기준 npz 캐시
+    industries: 업종명 목록 (예: DESSERT_CATEGORIES), None이면 전체 업종
+    업종·측정값 조합마다 캐시 파일이 따로 유지됨
+    """
+    from .load_dessert import INDUSTRY_COL, load_raw_data
+
+    def _build():
+        raw = load_raw_data(raw_data_dir)
+        if industries is not None:
+            raw = raw[raw[INDUSTRY_COL].isin(industries)]
+        return build_cube(raw, measures=measures)
+
+    sub = fingerprint("raw", str(raw_data_dir), industries, measures, length=8)
+    key = fingerprint(files_fingerprint([raw_data_dir]), _code_fingerprint())
+    return _cached_cube(_build, sub, key, cache_dir)
+
+
+def load_or_build_panel_cube(
+    path: str | Path,
+    measures: list[str] | None = None,
+    cache_dir: str | Path = CUBE_DIR,
+):
+    """행정동 패널 CSV (예: data/processed/dessert_ml_ready.csv) → build_cube, (파일, 코드) fingerprint 기준 캐시"""
+    sub = fingerprint("panel", str(path), measures, length=8)
+    key = fingerprint(files_fingerprint([path]), _code_fingerprint())
+    return _cached_cube(lambda: build_cube(pd.read_csv(path), measures=measures), sub, key, cache_dir)
+
+
+def cube_slice(
+    cube,
+    measures: str | list[str] = "당월_매출_금액",
+    level: str = "행정동",
+    stat: str = "sum",
+    industries: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    큐브 → tidy 표: 연도, 분기, 연분기, node[, 행정동_코드_명], 측정값 컬럼들
+    level: "행정동" | "자치구" | "서울"
+    stat: "sum" | "count" | "mean" (선택 업종 합계 기준 sum / count)
+    industries: 합산할 업종 (None이면 전체)
+    """
+    if level not in LEVELS:
+        raise ValueError(f"level은 {LEVELS} 중 하나: {level}")
+    measures = [measures] if isinstance(measures, str) else list(measures)
+    all_ind = cube["industries"]
+    sel = np.isin(all_ind, industries) if industries is not None else np.ones(len(all_ind), dtype=bool)
+
+    quarters = cube["quarters"]
+    nodes = {"행정동": cube["codes"], "자치구": cube["gu"], "서울": np.array(["서울"])}[level]
+    out = pd.DataFrame({
+        "연도": np.repeat(quarters // 4, len(nodes)),
+        "분기": np.repeat(quarters % 4 + 1, len(nodes)),
+        "node": np.tile(nodes, len(quarters)),
+    })
+    labels = np.char.add(np.char.add((quarters // 4).astype(str), "-Q"), (quarters % 4 + 1).astype(str))
+    out.insert(2, "연분기", np.repeat(labels, len(nodes)))
+    if level == "행정동":
+        out["행정동_코드_명"] = np.tile(cube["names"], len(quarters))
+
+    for m in measures:
+        parts = {}
+        for s in ("sum", "count") if stat == "mean" else (stat,):
+            arr = cube[f"{level}/{s}/{m}"][..., sel].sum(axis=-1)
+            parts[s] = arr.reshape(-1)
+        if stat == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[m] = np.where(parts["count"] > 0, parts["sum"] / parts["count"], np.nan)
+        else:
+            out[m] = parts[stat]
+    return out
@@ -0,0 +1,81 @@
+"""
+디스크 feature store: 피처·타겟 행렬을 raw 바이너리(+ json 메타)로 저장, memmap으로 chunk 스트리밍
+- 청크(DataFrame) 단위로 이어 쓰기 → 메모리보다 큰 패널(상권·월 단위)도 저장 가능
+- 컬럼: feature_cols + [target, "_t"] (_t = 연도*4 + 분기-1, 시간 기준 분할용)
+- 메타에 입력 fingerprint 기록 → 같은 입력이면 다시 쓰지 않음
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_precision
+from src.data.cache import fingerprint
+from src.models.cv import period_key
+
+FEATURE_DIR = Path("data/cache/features")
+
+
+def write_feature_store(
+    frames: pd.DataFrame | Iterable[pd.DataFrame],
+    feature_cols: list[str],
+    path: str | Path,
+    target_col: str = "target",
+    dtype: str | None = None,
+    key: str | None = None,
+) -> Path:
+    """
+    DataFrame(또는 청크 iterable) → path.bin + path.json
+    결측 행(피처·타겟)은 저장하지 않음. dtype 기본: 설정 정밀도 (config.get_precision)
+    key: 입력 fingerprint (DataFrame이면 자동 계산) - path.json의 key와 같으면 쓰지 않고 path 반환
+    """
+    dtype = dtype or get_precision()
+    path = Path(path)
+    if isinstance(frames, pd.DataFrame):
+        key = key or fingerprint(frames[list(feature_cols) + [target_col, "연도", "분기"]], feature_cols, target_col)
+        frames = [frames]
+    if key is not None:
+        key = fingerprint(key, dtype)
+        meta_path = path.with_suffix(".json")
+        if meta_path.exists() and path.with_suffix(".bin").exists():
+            if json.loads(meta_path.read_text()).get("key") == key:
+                return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    cols = list(feature_cols) + [target_col, "_t"]
+    n_rows = 0
+    with open(path.with_suffix(".bin"), "wb") as f:
+        for chunk in frames:
+            chunk = chunk.dropna(subset=list(feature_cols) + [target_col])
+            block = np.column_stack([
+                chunk[feature_cols + [target_col]].to_numpy(dtype=dtype),
+                period_key(chunk, unit="quarter").astype(dtype),
+            ])
+            f.write(np.ascontiguousarray(block).tobytes())
+            n_rows += len(block)
+
+    meta = {"columns": cols, "n_rows": n_rows, "dtype": dtype, "key": key}
+    path.with_suffix(".json").write_text(json.dumps(meta, ensure_ascii=False))
+    return path
+
+
+def open_feature_store(path: str | Path) -> tuple[np.memmap, list[str]]:
+    """저장된 feature store를 memmap (읽기 전용)으로 열기 → (행렬, 컬럼명)"""
+    path = Path(path)
+    meta = json.loads(path.with_suffix(".json").read_text())
+    shape = (meta["n_rows"], len(meta["columns"]))
+    M = np.memmap(path.with_suffix(".bin"), dtype=meta["dtype"], mode="r", shape=shape)
+    return M, meta["columns"]
+
+
+def iter_chunks(M: np.ndarray, chunk_rows: int = 100_000, order: np.ndarray | None = None) -> Iterator[np.ndarray]:
+    """행 chunk 순회 (order: chunk 시작 순서, 셔플용). 각 chunk만 메모리에 올림."""
+    starts = np.arange(0, len(M), chunk_rows)
+    if order is not None:
+        starts = starts[order]
+    for s in starts:
+        yield np.asarray(M[s:s + chunk_rows])
@@ -7,6 +7,17 @@ from pathlib import Path
 # 서울시 상권분석 서비스 기준 - 디저트 업종 (카페, 제과점)
 DESSERT_CATEGORIES = ["제과점", "커피-음료"]  # 실제 컬럼값 기준
 
+# 업종 그룹 (preprocess.add_category_shares 기본값): 그룹명 → 서비스_업종_코드_명 목록
+INDUSTRY_GROUPS = {
+    "디저트": DESSERT_CATEGORIES,
+    "커피": ["커피-음료"],
+    "제과": ["제과점"],
+    "한식": ["한식음식점"],
+    "외국식": ["중식음식점", "일식음식점", "양식음식점"],
+    "분식_패스트푸드": ["분식전문점", "패스트푸드점"],
+    "주점_치킨": ["호프-간이주점", "치킨전문점"],
+}
+
 # 업종 컬럼명
 INDUSTRY_COL = "서비스_업종_코드_명"
 
@@ -6,49 +6,138 @@ import pandas as pd
 from pathlib import Path
 
 
+def sales_matrix(
+    raw: pd.DataFrame,
+    value_col: str = "당월_매출_금액",
+    industry_col: str | None = None,
+) -> dict:
+    """
+    raw → (행정동, 연도, 분기) × 업종 매출 행렬 (dense, 1회 피벗)
+    반환: {"keys": 행 키 DataFrame (행정동_코드, 연도, 분기), "industries": 업종명 배열, "M": (행, 업종) 매출}
+    업종 결측 행도 별도 열로 포함 → 행 합계 = 전체 상권 매출
+    """
+    from .load_dessert import INDUSTRY_COL
+
+    industry_col = industry_col or INDUSTRY_COL
+    code = raw["기준_년분기_코드"].astype(str)
+    keys = pd.DataFrame({
+        "행정동_코드": raw["행정동_코드"].to_numpy(),
+        "연도": code.str[:4].astype(int).to_numpy(),
+        "분기": code.str[-1].astype(int).to_numpy(),
+    })
+    grouped = keys.groupby(list(keys.columns), sort=True)
+    row = grouped.ngroup().to_numpy()
+    col, industries = pd.factorize(raw[industry_col], use_na_sentinel=False)
+
+    n_rows, n_cols = grouped.ngroups, len(industries)
+    values = np.nan_to_num(raw[value_col].to_numpy(dtype=float))
+    M = np.bincount(row * n_cols + col, weights=values, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+    return {
+        "keys": grouped.size().reset_index()[list(keys.columns)],
+        "industries": np.asarray(industries, dtype=object),
+        "M": M,
+    }
+
+
+def category_shares(sm: dict, groups: dict[str, list[str]], suffix: str = "_비중") -> pd.DataFrame:
+    """
+    업종 그룹별 매출 비중 = (그룹 업종 열 합) / (전체 열 합), 행렬곱 1회
+    groups: {그룹명: 업종명 목록} (예: load_dessert.INDUSTRY_GROUPS)
+    반환: keys + {그룹명}{suffix} 컬럼
+    """
+    names = list(groups)
+    G = np.zeros((len(sm["industries"]), len(names)))
+    for j, name in enumerate(names):
+        G[:, j] = np.isin(sm["industries"], groups[name])
+    total = sm["M"].sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.nan_to_num((sm["M"] @ G) / total).clip(0, 1)
+    out = sm["keys"].copy()
+    out[[f"{n}{suffix}" for n in names]] = shares
+    return out
+
+
+def load_sales_matrix(raw_data_dir: str | Path = "data/raw") -> dict:
+    """raw 로드 + sales_matrix (원본 파일 fingerprint 기준 캐시)"""
+    from .cache import files_fingerprint, load_or_build
+    from .load_dessert import load_raw_data
+
+    return load_or_build(
+        "sales_matrix",
+        files_fingerprint([raw_data_dir]),
+        lambda: sales_matrix(load_raw_data(raw_data_dir)),
+    )
+
+
 def add_dessert_ratio(
     df: pd.DataFrame,
     raw_data_dir: str | Path = "data/raw",
 ) -> pd.DataFrame:
     """
     디저트 비중 = (카페+제과점 매출 합계) / 전체 상권 매출
-    행정동×분기 단위
+    행정동×분기 단위 (업종 매출 행렬에서 계산)
     """
-    from .load_dessert import load_raw_data, DESSERT_CATEGORIES, INDUSTRY_COL
-
-    raw = load_raw_data(raw_data_dir)
-    raw["연도"] = raw["기준_년분기_코드"].astype(str).str[:4].astype(int)
-    raw["분기"] = raw["기준_년분기_코드"].astype(str).str[-1].astype(int)
-
-    # 전체 매출 (행정동×연도×분기)
-    total = (
-        raw.groupby(["행정동_코드", "연도", "분기"])["당월_매출_금액"]
-        .sum()
-        .reset_index()
-        .rename(columns={"당월_매출_금액": "전체_매출"})
-    )
-
-    # 디저트 매출 합계
-    dessert = (
-        raw[raw[INDUSTRY_COL].isin(DESSERT_CATEGORIES)]
-        .groupby(["행정동_코드", "연도", "분기"])["당월_매출_금액"]
-        .sum()
-        .reset_index()
-        .rename(columns={"당월_매출_금액": "디저트_매출"})
-    )
-
-    ratio_df = total.merge(dessert, on=["행정동_코드", "연도", "분기"])
-    ratio_df["디저트_비중"] = (ratio_df["디저트_매출"] / ratio_df["전체_매출"]).fillna(0).clip(0, 1)
+    from .load_dessert import DESSERT_CATEGORIES
 
-    df = df.merge(
-        ratio_df[["행정동_코드", "연도", "분기", "디저트_비중"]],
-        on=["행정동_코드", "연도", "분기"],
-        how="left",
-    )
+    ratio_df = category_shares(load_sales_matrix(raw_data_dir), {"디저트": DESSERT_CATEGORIES})
+    df = df.merge(ratio_df, on=["행정동_코드", "연도", "분기"], how="left")
     df["디저트_비중"] = df["디저트_비중"].fillna(0)
     return df
 
 
+def _panel_shift(df: pd.DataFrame, cols: list[str], k: int) -> np.ndarray:
+    """
+    (행정동_코드, 연도, 분기) 정렬된 df에서 cols를 k행 shift (k>0: lag, k<0: lead)
+    행정동 경계를 넘으면 NaN. groupby.shift와 동일, 여러 컬럼을 한 번에 처리.
+    """
+    codes = df["행정동_코드"].to_numpy()
+    values = df[cols].to_numpy(dtype=float)
+    n = len(df)
+    out = np.full(values.shape, np.nan)
+    a = abs(k)
+    if a >= n:
+        return out
+    same = codes[a:] == codes[:-a]
+    if k > 0:
+        out[a:][same] = values[:-a][same]
+    else:
+        out[:-a][same] = values[a:][same]
+    return out
+
+
+def add_category_shares(
+    df: pd.DataFrame,
+    groups: dict[str, list[str]] | None = None,
+    raw_data_dir: str | Path = "data/raw",
+    lags: tuple[int, ...] = (1, 4),
+    horizons: tuple[int, ...] = (1,),
+) -> pd.DataFrame:
+    """
+    여러 업종 그룹 비중 + lag + 미래 타겟을 한 번에 추가
+    - {그룹}_비중, lag{l}_{그룹}_비중, target_{그룹} (h=1) / target_{그룹}_h{h}
+    groups 기본: load_dessert.INDUSTRY_GROUPS
+    """
+    from .load_dessert import INDUSTRY_GROUPS
+
+    groups = groups or INDUSTRY_GROUPS
+    shares = category_shares(load_sales_matrix(raw_data_dir), groups)
+    share_cols = [f"{g}_비중" for g in groups]
+
+    df = df.drop(columns=[c for c in share_cols if c in df.columns])
+    df = df.merge(shares, on=["행정동_코드", "연도", "분기"], how="left")
+    df[share_cols] = df[share_cols].fillna(0)
+    df = df.sort_values(["행정동_코드", "연도", "분기"]).reset_index(drop=True)
+
+    new = {}
+    for lag in lags:
+        for g, v in zip(groups, _panel_shift(df, share_cols, lag).T):
+            new[f"lag{lag}_{g}_비중"] = v
+    for h in horizons:
+        for g, v in zip(groups, _panel_shift(df, share_cols, -h).T):
+            new[f"target_{g}" if h == 1 else f"target_{g}_h{h}"] = v
+    return pd.concat([df, pd.DataFrame(new, index=df.index)], axis=1)
+
+
 def add_log_transform(df: pd.DataFrame, cols: list[str] | None = None) -> pd.DataFrame:
     """log(x + 1) 변환 - 분산 안정화"""
     df = df.copy()
@@ -157,6 +246,22 @@ def add_target(
     return df
 
 
+def add_multi_horizon_targets(
+    df: pd.DataFrame,
+    value_col: str = "디저트_비중",
+    horizons: tuple[int, ...] = (1, 2, 3, 4),
+    prefix: str = "target_h",
+) -> pd.DataFrame:
+    """
+    다중 horizon 타겟: h분기 뒤 값 (target_h1 = add_target의 target)
+    정렬 1회 + 배열 shift로 모든 horizon을 한 번에 생성 (행정동 경계를 넘으면 NaN)
+    """
+    df = df.sort_values(["행정동_코드", "연도", "분기"]).reset_index(drop=True)
+    for h in horizons:
+        df[f"{prefix}{h}"] = _panel_shift(df, [value_col], -h)[:, 0]
+    return df
+
+
 def add_delta_targets(
     df: pd.DataFrame,
     ratio_col: str = "디저트_비중",
@@ -0,0 +1,150 @@
+"""
+공간 이웃 피처: 행정동 인접 행렬 (희소, 행 정규화)
+- 인접 목록 CSV (행정동_코드, 이웃_행정동_코드) 또는 경계 파일(GeoJSON/SHP, geopandas 필요)
+- 파일이 없으면 공간 피처 생략. district_fallback=True일 때만 같은 자치구(행정동_코드 앞 5자리)
+  행정동을 이웃으로 간주 (대체 근사, 반환 source="district")
+- 정규화 인접 행렬은 data/cache/spatial에 save_npz로 캐시 (원본 파일 fingerprint 기준)
+- 공간 lag: 행정동 × 분기 패널 행렬 V (D × T·C)에 대해 W @ V 한 번 (결측은 이웃 중 관측된 값으로 재정규화)
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, files_fingerprint, fingerprint
+
+ADJACENCY_PATH = Path("data/adjacency.csv")
+SPATIAL_CACHE_DIR = CACHE_DIR / "spatial"
+
+
+def _edges_from_csv(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    edges = pd.read_csv(path, dtype=str)
+    return edges.iloc[:, 0].to_numpy(), edges.iloc[:, 1].to_numpy()
+
+
+def _edges_from_boundary(path: Path, code_col: str = "adm_cd") -> tuple[np.ndarray, np.ndarray]:
+    """경계 파일 → 경계가 맞닿는(queen) 행정동 쌍"""
+    try:
+        import geopandas as gpd
+    except ImportError:
+        raise ImportError("경계 파일 인접 계산에는 geopandas 필요: pip install geopandas")
+
+    gdf = gpd.read_file(path)[[code_col, "geometry"]]
+    pairs = gpd.sjoin(gdf, gdf, predicate="touches")
+    return pairs[f"{code_col}_left"].astype(str).to_numpy(), pairs[f"{code_col}_right"].astype(str).to_numpy()
+
+
+def _district_edges(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """대체 근사: 같은 자치구(앞 5자리) 행정동끼리 이웃"""
+    gu = pd.Series(codes).str[:5].to_numpy()
+    i, j = np.nonzero(gu[:, None] == gu[None, :])
+    return codes[i], codes[j]
+
+
+def build_adjacency(codes, src: np.ndarray, dst: np.ndarray):
+    """
+    간선 목록 → 대칭·행 정규화 희소 행렬 (codes 순서, 자기 자신 제외)
+    이웃이 없는 행정동은 행이 모두 0
+    """
+    from scipy import sparse
+
+    codes = np.asarray(codes).astype(str)
+    pos = pd.Series(np.arange(len(codes)), index=codes)
+    keep = np.isin(src, codes) & np.isin(dst, codes) & (src != dst)
+    i = pos[src[keep]].to_numpy()
+    j = pos[dst[keep]].to_numpy()
+    A = sparse.coo_matrix((np.ones(len(i)), (i, j)), shape=(len(codes), len(codes))).tocsr()
+    A = ((A + A.T) > 0).astype(float)
+    deg = np.asarray(A.sum(axis=1)).ravel()
+    inv = np.divide(1.0, deg, out=np.zeros_like(deg), where=deg > 0)
+    return sparse.diags(inv) @ A
+
+
+def load_adjacency(
+    codes,
+    path: str | Path | None = None,
+    code_col: str = "adm_cd",
+    cache_dir: str | Path = SPATIAL_CACHE_DIR,
+    district_fallback: bool = False,
+) -> dict:
+    """
+    codes: 패널의 행정동_코드 목록
+    path: 인접 목록 CSV 또는 경계 파일 (기본 data/adjacency.csv)
+    district_fallback: 파일이 없을 때 같은 자치구 대체 근사 사용 (False면 FileNotFoundError)
+    반환: {"codes": 정렬된 코드 (문자열), "W": 행 정규화 csr, "source": "file" | "district"}
+    """
+    from scipy import sparse
+
+    codes = np.unique(np.asarray(codes).astype(str))
+    path = Path(path) if path else ADJACENCY_PATH
+    if not path.exists() and not district_fallback:
+        raise FileNotFoundError(f"인접 파일이 없습니다: {path} (같은 자치구 대체 근사는 district_fallback=True)")
+    source = "file" if path.exists() else "district"
+    key = fingerprint(codes, files_fingerprint([path]) if path.exists() else source)
+
+    cache_dir = Path(cache_dir)
+    npz = cache_dir / f"adjacency_{key}.npz"
+    if npz.exists():
+        return {"codes": codes, "W": sparse.load_npz(npz).tocsr(), "source": source}
+
+    if source == "district":
+        print(f"  (인접 파일 없음: {path} → 같은 자치구 행정동을 이웃으로 사용)")
+        src, dst = _district_edges(codes)
+    elif path.suffix.lower() == ".csv":
+        src, dst = _edges_from_csv(path)
+    else:
+        src, dst = _edges_from_boundary(path, code_col)
+
+    W = build_adjacency(codes, src.astype(str), dst.astype(str))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for old in cache_dir.glob("adjacency_*.npz"):
+        old.unlink()
+    sparse.save_npz(npz, W)
+    return {"codes": codes, "W": W, "source": source}
+
+
+def add_spatial_lags(
+    df: pd.DataFrame,
+    cols: tuple[str, ...] = ("lag1_비중", "성장률"),
+    adjacency: dict | None = None,
+    prefix: str = "sp_",
+    path: str | Path | None = None,
+    district_fallback: bool = False,
+) -> pd.DataFrame:
+    """
+    이웃 평균 피처: sp_{col} = 같은 분기 이웃 행정동의 col 평균 (관측된 이웃만)
+    모든 분기·컬럼을 (행정동 × 분기·컬럼) 행렬 1개로 묶어 희소 행렬곱 2회 (합, 관측 수)
+    인접 파일이 없고 district_fallback=False면 공간 피처 없이 df 그대로 반환
+    """
+    cols = [c for c in cols if c in df.columns]
+    if not cols:
+        return df
+    if adjacency is None:
+        adj_path = Path(path) if path else ADJACENCY_PATH
+        if not adj_path.exists() and not district_fallback:
+            print(f"  (인접 파일 없음: {adj_path} → 공간 피처 생략, 같은 자치구 대체 근사는 district_fallback=True)")
+            return df
+        adjacency = load_adjacency(df["행정동_코드"], path=path, district_fallback=district_fallback)
+    W = adjacency["W"]
+
+    d = pd.Index(adjacency["codes"]).get_indexer(df["행정동_코드"].astype(str))
+    t_codes, t = np.unique(df["연도"].to_numpy() * 4 + df["분기"].to_numpy(), return_inverse=True)
+    D, T, C = len(adjacency["codes"]), len(t_codes), len(cols)
+
+    known = d >= 0  # 인접 행렬에 없는 행정동 → NaN
+    V = np.full((D, T, C), np.nan)
+    V[d[known], t[known]] = df[cols].to_numpy(dtype=float)[known]
+    V = V.reshape(D, T * C)
+    observed = ~np.isnan(V)
+    total = W @ np.where(observed, V, 0.0)
+    weight = W @ observed.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        S = np.where(weight > 0, total / weight, np.nan).reshape(D, T, C)
+
+    out = np.full((len(df), C), np.nan)
+    out[known] = S[d[known], t[known]]
+    df = df.copy()
+    df[[f"{prefix}{c}" for c in cols]] = out
+    return df
@@ -0,0 +1,109 @@
+"""
+행정동 군집 할당 (공유 + 캐시)
+- 군집 피처(create_cluster_features) fingerprint 당 한 번만 적합, 중심·라벨을 npz로 저장
+- plot_kmeans_clusters, exp4_cluster_models 등은 저장된 라벨을 재사용
+- 대규모 패널: MiniBatchKMeans 모드
+- k 탐색: k별 병렬 적합 + 샘플링 실루엣 점수
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.data.cache import CACHE_DIR, fingerprint
+
+CLUSTER_FEATURES = ["매출_mean", "매출_std", "성장률_mean", "디저트_비중_mean"]
+CLUSTER_NAMES = ["고소비 안정형", "저소비 변동형", "성장형"]
+
+
+def _make_kmeans(n_clusters: int, method: str, random_state: int):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if method == "minibatch":
+        return MiniBatchKMeans(n_clusters=n_clusters, batch_size=1024, random_state=random_state)
+    return KMeans(n_clusters=n_clusters, random_state=random_state)
+
+
+def _scaled_features(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    """행정동 단위 군집 피처 + 표준화 행렬"""
+    from sklearn.preprocessing import StandardScaler
+    from src.data.preprocess import create_cluster_features
+
+    cluster_df = create_cluster_features(df)
+    X = StandardScaler().fit_transform(cluster_df[CLUSTER_FEATURES].fillna(0))
+    return cluster_df, X
+
+
+def assign_clusters(
+    df: pd.DataFrame,
+    n_clusters: int = 3,
+    method: str = "kmeans",
+    random_state: int = 42,
+    cache_dir: str | Path = CACHE_DIR / "clusters",
+) -> pd.DataFrame:
+    """
+    행정동별 군집 라벨.
+    method: "kmeans" (기본) 또는 "minibatch" (MiniBatchKMeans, 대규모 패널)
+    반환: create_cluster_features 결과 + cluster, cluster_name 컬럼
+    캐시: cache_dir/clusters_{fingerprint}.npz (codes, labels, centers)
+    """
+    cluster_df, X = _scaled_features(df)
+    codes = cluster_df["행정동_코드"].to_numpy()
+    key = fingerprint(codes, X, n_clusters, method, random_state)
+    path = Path(cache_dir) / f"clusters_{key}.npz"
+
+    if path.exists():
+        with np.load(path) as z:
+            labels = z["labels"]
+    else:
+        km = _make_kmeans(n_clusters, method, random_state)
+        labels = km.fit_predict(X)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 병렬 실험이 동시에 쓰더라도 깨진 파일이 보이지 않도록 임시 파일 → 교체
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, codes=codes, labels=labels, centers=km.cluster_centers_)
+        os.replace(tmp, path)
+
+    cluster_df["cluster"] = labels
+    cluster_df["cluster_name"] = cluster_df["cluster"].map(lambda c: CLUSTER_NAMES[c % len(CLUSTER_NAMES)])
+    return cluster_df
+
+
+def _fit_k(X: np.ndarray, k: int, method: str, random_state: int, sample_size: int | None) -> dict:
+    """k 하나 적합 + 실루엣 (프로세스 워커용)"""
+    from sklearn.metrics import silhouette_score
+
+    km = _make_kmeans(k, method, random_state)
+    labels = km.fit_predict(X)
+    n = len(X) if sample_size is None else min(sample_size, len(X))
+    sil = silhouette_score(X, labels, sample_size=n, random_state=random_state)
+    return {"k": k, "inertia": km.inertia_, "silhouette": sil}
+
+
+def cluster_k_sweep(
+    df: pd.DataFrame,
+    ks: range | list[int] = range(2, 9),
+    method: str = "kmeans",
+    random_state: int = 42,
+    sample_size: int | None = 2000,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """
+    k 후보별 inertia·실루엣 점수 (k별 프로세스 병렬).
+    sample_size: 실루엣 계산 샘플 수 (O(n²) 비용 제한, None이면 전체)
+    """
+    _, X = _scaled_features(df)
+    ks = list(ks)
+    args = ([X] * len(ks), ks, [method] * len(ks), [random_state] * len(ks), [sample_size] * len(ks))
+    n_jobs = min(get_n_jobs(n_jobs), len(ks))
+    if n_jobs == 1:
+        rows = list(map(_fit_k, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            rows = list(ex.map(_fit_k, *args))
+    return pd.DataFrame(rows)
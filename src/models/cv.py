@@ -0,0 +1,40 @@
+"""
+시계열 교차검증 fold 정의 (expanding window)
+- unit="year": 2021→2022, 2021~2022→2023, ... (exp3와 같은 연 단위 롤링)
+- unit="quarter": 분기 단위 (다음 분기 1개를 test)
+fold = (train 위치, test 위치, 라벨) - 위치는 df 기준 정수 인덱스(iloc)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def period_key(df: pd.DataFrame, unit: str = "year") -> np.ndarray:
+    """시간 정렬 키: 연도 또는 연도*4 + (분기-1)"""
+    if unit == "year":
+        return df["연도"].to_numpy(dtype=np.int64)
+    return df["연도"].to_numpy(dtype=np.int64) * 4 + df["분기"].to_numpy(dtype=np.int64) - 1
+
+
+def period_label(key: int, unit: str = "year") -> str:
+    return str(key) if unit == "year" else f"{key // 4}Q{key % 4 + 1}"
+
+
+def expanding_folds(
+    df: pd.DataFrame,
+    unit: str = "year",
+    min_train: int = 1,
+) -> list[tuple[np.ndarray, np.ndarray, str]]:
+    """
+    확장 윈도우 fold: i번째 기간을 test, 그 이전 전체를 train.
+    min_train: 첫 fold의 최소 train 기간 수
+    """
+    key = period_key(df, unit)
+    periods = np.unique(key)
+    folds = []
+    for i in range(min_train, len(periods)):
+        train_idx = np.flatnonzero(key < periods[i])
+        test_idx = np.flatnonzero(key == periods[i])
+        folds.append((train_idx, test_idx, period_label(periods[i], unit)))
+    return folds
@@ -11,13 +11,16 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet
+from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from typing import Callable
 
+from src.config import get_dtype
+from src.models.predict import predict_chunked
+
 
 def _prepare(df: pd.DataFrame, cols: list[str], target: str = "target"):
     sub = df[[c for c in cols if c in df.columns] + [target]].dropna()
@@ -32,11 +35,12 @@ def exp1_vif_tracks(
     train_df: pd.DataFrame,
     test_df: pd.DataFrame,
     base_cols: list[str],
+    l1_ratios: tuple[float, ...] = (0.1, 0.5, 0.9),
 ) -> pd.DataFrame:
     """
     Track A: lag1_비중만 (lag4_비중 제거)
     Track B: PCA 2 comp on high-VIF vars
-    Track C: Ridge, Lasso, ElasticNet
+    Track C: Ridge, Lasso, ElasticNet - alpha(·l1_ratio) 그리드 경로를 train 롤링 fold로 평가해 선택
     """
     rows = []
 
@@ -46,7 +50,7 @@ def exp1_vif_tracks(
         X_tr, y_tr = _prepare(train_df, cols_a)
         X_te, y_te = _prepare(test_df, cols_a)
         lr = LinearRegression().fit(X_tr, y_tr)
-        pred = lr.predict(X_te)
+        pred = predict_chunked(lr, X_te)
         rows.append({"실험": "VIF_TrackA_lag1만", "RMSE": np.sqrt(mean_squared_error(y_te, pred)), "R2": r2_score(y_te, pred)})
 
     # Track B: PCA
@@ -64,23 +68,48 @@ def exp1_vif_tracks(
         X_tr_comb = np.hstack([X_tr_pca, X_tr.iloc[:, idx_other].values])
         X_te_comb = np.hstack([X_te_pca, X_te.iloc[:, idx_other].values])
         lr = LinearRegression().fit(X_tr_comb, y_tr)
-        pred = lr.predict(X_te_comb)
+        pred = predict_chunked(lr, X_te_comb)
         rows.append({"실험": "VIF_TrackB_PCA2", "RMSE": np.sqrt(mean_squared_error(y_te, pred)), "R2": r2_score(y_te, pred)})
 
-    # Track C: Ridge, Lasso, ElasticNet
-    X_tr, y_tr = _prepare(train_df, base_cols)
+    # Track C: Ridge, Lasso, ElasticNet - 정규화 경로 + train 내부 롤링 fold로 alpha 선택
+    from src.models.cv import expanding_folds
+    from src.models.linear import enet_path_coefs, regularization_path_cv, ridge_path
+
+    cols = [c for c in base_cols if c in train_df.columns]
+    sub_tr = train_df.dropna(subset=cols + ["target"])
+    X_tr, y_tr = sub_tr[cols].to_numpy(dtype=float), sub_tr["target"].to_numpy(dtype=float)
     X_te, y_te = _prepare(test_df, base_cols)
     scaler = StandardScaler()
     X_tr_s = scaler.fit_transform(X_tr)
-    X_te_s = scaler.transform(X_te)
-    for name, m in [
-        ("VIF_TrackC_Ridge", Ridge(alpha=1.0)),
-        ("VIF_TrackC_Lasso", Lasso(alpha=0.001)),
-        ("VIF_TrackC_ElasticNet", ElasticNet(alpha=0.001, l1_ratio=0.5)),
-    ]:
-        m.fit(X_tr_s, y_tr)
-        pred = m.predict(X_te_s)
-        rows.append({"실험": name, "RMSE": np.sqrt(mean_squared_error(y_te, pred)), "R2": r2_score(y_te, pred)})
+    X_te_s = scaler.transform(X_te.to_numpy(dtype=float))
+    folds = expanding_folds(sub_tr, unit="year")
+
+    # (이름, family, alpha 그리드, l1_ratio 후보, fold가 없을 때 기본값)
+    tracks = [
+        ("VIF_TrackC_Ridge", "ridge", np.logspace(-3, 5, 30), (0.0,), (1.0, 0.0)),
+        ("VIF_TrackC_Lasso", "enet", np.logspace(-6, -1, 30), (1.0,), (0.001, 1.0)),
+        ("VIF_TrackC_ElasticNet", "enet", np.logspace(-6, -1, 30), l1_ratios, (0.001, 0.5)),
+    ]
+    for name, family, alphas, l1s, default in tracks:
+        cv_rmse = np.nan
+        alpha, l1 = default
+        if folds:
+            path = regularization_path_cv(X_tr, y_tr, folds, family, alphas, l1s)
+            cv = path.groupby(["alpha", "l1_ratio"])["RMSE"].mean()
+            (alpha, l1), cv_rmse = cv.idxmin(), cv.min()
+        if family == "ridge":
+            coef, b0 = ridge_path(X_tr_s, y_tr, [alpha])
+        else:
+            coef, b0 = enet_path_coefs(X_tr_s, y_tr, [alpha], l1)
+        pred = X_te_s @ coef[0] + b0[0]
+        rows.append({
+            "실험": name,
+            "RMSE": np.sqrt(mean_squared_error(y_te, pred)),
+            "R2": r2_score(y_te, pred),
+            "alpha": alpha,
+            "l1_ratio": l1 if family == "enet" else np.nan,
+            "cv_RMSE": cv_rmse,
+        })
 
     return pd.DataFrame(rows)
 
@@ -108,14 +137,14 @@ def exp2_two_stage(
         return {"stage1_R2": np.nan, "stage2_R2": np.nan, "물가_계수": {}}
 
     m1 = LinearRegression().fit(common_tr[lag_cols], common_tr["target"])
-    resid_tr = common_tr["target"].values - m1.predict(common_tr[lag_cols])
-    resid_te = common_te["target"].values - m1.predict(common_te[lag_cols])
+    resid_tr = common_tr["target"].values - predict_chunked(m1, common_tr[lag_cols])
+    resid_te = common_te["target"].values - predict_chunked(m1, common_te[lag_cols])
 
     m2 = LinearRegression().fit(common_tr[infl_cols], resid_tr)
     coef = dict(zip(infl_cols, m2.coef_))
     return {
-        "stage1_R2": r2_score(common_te["target"], m1.predict(common_te[lag_cols])),
-        "stage2_R2": r2_score(resid_te, m2.predict(common_te[infl_cols])),
+        "stage1_R2": r2_score(common_te["target"], predict_chunked(m1, common_te[lag_cols])),
+        "stage2_R2": r2_score(resid_te, predict_chunked(m2, common_te[infl_cols])),
         "물가_계수": coef,
     }
 
@@ -145,7 +174,7 @@ def exp3_rolling_cv(
             continue
         m = model_fn()
         m.fit(X_tr, y_tr)
-        pred = m.predict(X_te)
+        pred = predict_chunked(m, X_te)
         folds.append({
             "train_years": f"{min(train_years)}~{max(train_years)}",
             "test_year": test_year,
@@ -164,50 +193,69 @@ def exp3_rolling_cv(
 
 # ---------- 4) 군집별 모델 ----------
 
+def group_models(
+    df: pd.DataFrame,
+    base_cols: list[str],
+    group_col: str,
+    min_rows: int = 100,
+    test_year: int = 2024,
+    coef_col: str = "물가상승률",
+) -> pd.DataFrame:
+    """
+    그룹(군집/자치구/행정동)별 선형회귀를 한 번의 배치 OLS로 적합·평가.
+    그룹별 train(<test_year) / test(>=test_year) R2와 coef_col 계수(물가_계수) 반환.
+    """
+    from src.models.linear import grouped_ols, grouped_predict
+
+    cols = [c for c in base_cols if c in df.columns]
+    sub = df.dropna(subset=cols + ["target", group_col])
+    g = sub[group_col].to_numpy()
+    is_test = (sub["연도"] >= test_year).to_numpy()
+
+    n_total = pd.Series(g).value_counts()
+    keep = np.isin(g, n_total[n_total >= min_rows].index)
+    X = sub[cols].to_numpy(dtype=float)
+    y = sub["target"].to_numpy(dtype=float)
+
+    tr = keep & ~is_test
+    te = keep & is_test
+    if not tr.any() or not te.any():
+        return pd.DataFrame()
+    fit = grouped_ols(X[tr], y[tr], g[tr])
+    pred = grouped_predict(fit, X[te], g[te])
+
+    # 그룹별 R2 = 1 - SSE/SST (test 그룹 평균 기준)
+    labels, gi = np.unique(g[te], return_inverse=True)
+    n_te = np.bincount(gi)
+    y_te = y[te]
+    mean_te = np.bincount(gi, weights=y_te) / n_te
+    sse = np.bincount(gi, weights=(y_te - pred) ** 2)
+    sst = np.bincount(gi, weights=(y_te - mean_te[gi]) ** 2)
+
+    fit_idx = np.searchsorted(fit["groups"], labels)
+    j = cols.index(coef_col) if coef_col in cols else None
+    return pd.DataFrame({
+        group_col: labels,
+        "n_train": fit["n"][fit_idx],
+        "n_test": n_te,
+        "R2": 1 - sse / sst,
+        "물가_계수": fit["coef"][fit_idx, j] if j is not None else np.nan,
+    })
+
+
 def exp4_cluster_models(
     df: pd.DataFrame,
     base_cols: list[str],
     n_clusters: int = 3,
 ) -> pd.DataFrame:
     """
-    k-means 군집별로 모델 학습, 물가 계수 비교
+    k-means 군집별로 모델 학습, 물가 계수 비교 (군집 라벨은 assign_clusters 캐시 재사용)
     """
-    from sklearn.cluster import KMeans
-    from src.data.preprocess import create_cluster_features
-
-    cluster_df = create_cluster_features(df)
-    feat_cols = ["매출_mean", "매출_std", "성장률_mean", "디저트_비중_mean"]
-    X_cl = cluster_df[feat_cols].fillna(0)
-    km = KMeans(n_clusters=n_clusters, random_state=42)
-    cluster_df["cluster"] = km.fit_predict(StandardScaler().fit_transform(X_cl))
+    from src.models.clustering import assign_clusters
 
+    cluster_df = assign_clusters(df, n_clusters=n_clusters)
     df_merged = df.merge(cluster_df[["행정동_코드", "cluster"]], on="행정동_코드", how="left")
-    rows = []
-    for c in range(n_clusters):
-        sub = df_merged[df_merged["cluster"] == c].dropna(subset=base_cols + ["target"])
-        if len(sub) < 100:
-            continue
-        train = sub[sub["연도"] < 2024]
-        test = sub[sub["연도"] >= 2024]
-        if len(test) == 0:
-            continue
-        X_tr, y_tr = _prepare(train, base_cols)
-        X_te, y_te = _prepare(test, base_cols)
-        lr = LinearRegression().fit(X_tr, y_tr)
-        pred = lr.predict(X_te)
-        try:
-            coef_idx = base_cols.index("물가상승률")
-            물가_계수 = lr.coef_[coef_idx]
-        except (ValueError, IndexError):
-            물가_계수 = np.nan
-        rows.append({
-            "cluster": c,
-            "n_train": len(train),
-            "n_test": len(test),
-            "R2": r2_score(y_te, pred),
-            "물가_계수": 물가_계수,
-        })
-    return pd.DataFrame(rows)
+    return group_models(df_merged, base_cols, group_col="cluster", min_rows=100)
 
 
 # ---------- 5) MLP 개선 ----------
@@ -222,6 +270,8 @@ def exp5_mlp_improved(
     """
     X_tr, y_tr = _prepare(train_df, base_cols)
     X_te, y_te = _prepare(test_df, base_cols)
+    # MLP는 설정 정밀도(float32 가능)로, 나머지 실험(OLS 계열)은 float64 유지
+    X_tr, X_te = X_tr.astype(get_dtype()), X_te.astype(get_dtype())
     scaler = StandardScaler()
     X_tr_s = scaler.fit_transform(X_tr)
     X_te_s = scaler.transform(X_te)
@@ -238,7 +288,7 @@ def exp5_mlp_improved(
         random_state=42,
     )
     mlp.fit(X_tr_s, y_tr)
-    pred = mlp.predict(X_te_s)
+    pred = predict_chunked(mlp, X_te_s)
     return {
         "RMSE": np.sqrt(mean_squared_error(y_te, pred)),
         "MAE": mean_absolute_error(y_te, pred),
@@ -283,6 +333,6 @@ def exp6_interaction_redesign(
         X_tr, y_tr = _prepare(train_df, cols)
         X_te, y_te = _prepare(test_df, cols)
         lr = LinearRegression().fit(X_tr, y_tr)
-        pred = lr.predict(X_te)
+        pred = predict_chunked(lr, X_te)
         rows.append({"상호작용": name, "RMSE": np.sqrt(mean_squared_error(y_te, pred)), "R2": r2_score(y_te, pred)})
     return pd.DataFrame(rows)
@@ -6,9 +6,13 @@
 """
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
+from src.config import get_n_jobs
+
 
 def fit_fe_model(
     df: pd.DataFrame,
@@ -22,6 +26,7 @@ def fit_fe_model(
     행정동 고정효과 (+ 선택: 시간 FE)
     time_fe=False: 행정동 FE만 (안정적, 권장)
     time_fe=True: 행정동 + 시간 FE (대용량 시 수치 불안정 가능)
+    cov_type 표준오차가 NaN이거나 실패하면 HC1로 대체 → model.cov_type_used, model.cov_fallback(사유)에 기록
     """
     try:
         import statsmodels.formula.api as smf
@@ -60,6 +65,7 @@ def fit_fe_model(
     if len(d) < 50:
         return None
 
+    fallback = None
     try:
         if cov_type == "cluster":
             model = smf.ols(formula, data=d).fit(
@@ -69,34 +75,193 @@ def fit_fe_model(
         else:
             model = smf.ols(formula, data=d).fit(cov_type=cov_type)
         if np.any(np.isnan(model.bse)):
-            model = smf.ols(formula, data=d).fit(cov_type="HC1")
-    except Exception:
+            fallback = f"{cov_type} 표준오차 NaN"
+    except Exception as e:
+        fallback = f"{cov_type} 표준오차 실패: {e}"
+    if fallback is not None:
         model = smf.ols(formula, data=d).fit(cov_type="HC1")
+    # 실제 사용된 표준오차 종류와 대체 사유 (None이면 요청한 cov_type 그대로)
+    model.cov_type_used = "HC1" if fallback else cov_type
+    model.cov_fallback = fallback
+    # 예측용 FE 룩업은 적합 시점에 한 번만 추출
+    model.fe_scorer = build_fe_scorer(model)
     return model
 
 
-def predict_fe_model(model, df: pd.DataFrame, train_df: pd.DataFrame) -> np.ndarray:
+def _time_key(df: pd.DataFrame) -> np.ndarray:
+    """(연도, 분기) → 정수 키 (연도*4 + 분기). 문자열 't' 생성 없이 비교용."""
+    return df["연도"].to_numpy(dtype=np.int64) * 4 + df["분기"].to_numpy(dtype=np.int64)
+
+
+def build_fe_scorer(model) -> dict | None:
+    """
+    적합된 FE 모델에서 예측용 배열 추출 (1회).
+    - codes/alpha: 정렬된 행정동 코드와 행정동 효과(절편 포함)
+    - t_keys/tau: 정렬된 시간 키와 시간 효과 (time_fe=True 일 때만)
+    - slope_cols/beta: 더미 외 회귀계수
+    """
+    if model is None:
+        return None
+
+    params = model.params
+    frame = model.model.data.frame
+    intercept = params.get("Intercept", 0.0)
+
+    codes = np.sort(frame["행정동_코드"].unique())
+    alpha = intercept + np.array(
+        [params.get(f"C(행정동_코드)[T.{c}]", 0.0) for c in codes], dtype=float
+    )
+
+    t_keys, tau = None, None
+    if any(str(n).startswith("C(t)") for n in params.index):
+        t_str = frame["t"].unique()
+        tau_map = {t: params.get(f"C(t)[T.{t}]", 0.0) for t in t_str}
+        keys = np.array([int(t[:4]) * 4 + int(t[-1]) for t in t_str], dtype=np.int64)
+        order = np.argsort(keys)
+        t_keys = keys[order]
+        tau = np.array([tau_map[t] for t in t_str], dtype=float)[order]
+
+    slope_cols = [n for n in params.index if "C(" not in str(n) and n != "Intercept"]
+    return {
+        "codes": codes,
+        "alpha": alpha,
+        "t_keys": t_keys,
+        "tau": tau,
+        "slope_cols": slope_cols,
+        "beta": params[slope_cols].to_numpy(dtype=float),
+    }
+
+
+def _lookup(sorted_keys: np.ndarray, values: np.ndarray, query: np.ndarray):
+    """정렬 키 배열에서 query 위치 탐색 → (값, train에 존재 여부 마스크)"""
+    idx = np.searchsorted(sorted_keys, query)
+    idx = np.clip(idx, 0, len(sorted_keys) - 1)
+    known = sorted_keys.take(idx) == query
+    return values.take(idx), known
+
+
+def score_fe(scorer: dict | None, df: pd.DataFrame) -> np.ndarray:
+    """
+    FE 예측 (벡터화): X @ beta + alpha[행정동] (+ tau[시간]).
+    train에 없던 행정동(또는 시간)은 NaN.
+    """
+    if scorer is None:
+        return np.full(len(df), np.nan)
+
+    X = df[scorer["slope_cols"]].to_numpy(dtype=float)
+    pred = X @ scorer["beta"]
+
+    alpha, known = _lookup(scorer["codes"], scorer["alpha"], df["행정동_코드"].to_numpy())
+    pred += alpha
+    if scorer["t_keys"] is not None:
+        tau, known_t = _lookup(scorer["t_keys"], scorer["tau"], _time_key(df))
+        pred += tau
+        known &= known_t
+    pred[~known] = np.nan
+    return pred
+
+
+def predict_fe_model(model, df: pd.DataFrame, train_df: pd.DataFrame | None = None) -> np.ndarray:
     """
     FE 모델 예측: 새 데이터에 대해.
-    보통 행정동/시간 더미가 train에 없으면 예측 불가 → train과 동일한 행정동·시간만 사용.
+    행정동/시간 효과는 train에서 추정된 것만 존재 → train에 없는 행정동·시간은 NaN.
+    train_df: 하위호환용 인자 (효과는 모델에서 직접 추출하므로 사용하지 않음)
     """
     if model is None:
         return np.full(len(df), np.nan)
 
-    d = df.copy()
-    d["t"] = d["연도"].astype(str) + "Q" + d["분기"].astype(str)
+    scorer = getattr(model, "fe_scorer", None) or build_fe_scorer(model)
+    return score_fe(scorer, df)
 
-    # train에 있는 행정동·t 조합만 유효
-    train_ids = set(zip(train_df["행정동_코드"], train_df["연도"], train_df["분기"]))
-    d["_in_train"] = d.apply(
-        lambda r: (r["행정동_코드"], r["연도"], r["분기"]) in train_ids, axis=1
-    )
 
-    try:
-        pred = model.predict(d)
-    except Exception:
-        pred = np.full(len(d), np.nan)
-    return np.asarray(pred)
+# ---------- Wild cluster bootstrap ----------
+
+# Webb 6점 가중치: 군집 수가 적을 때(분기 ~20개) Rademacher보다 안정적
+_WEBB_WEIGHTS = np.array([-np.sqrt(1.5), -1.0, -np.sqrt(0.5), np.sqrt(0.5), 1.0, np.sqrt(1.5)])
+_BOOT_WEIGHTS = ("webb", "rademacher")
+
+
+def _bootstrap_chunk(S: np.ndarray, n_rep: int, seed: np.random.SeedSequence, weights: str) -> np.ndarray:
+    """replicate 묶음: 군집 가중치 W (G × n_rep) → 계수 편차 S @ W (프로세스 워커용)"""
+    rng = np.random.default_rng(seed)
+    G = S.shape[1]
+    if weights == "webb":
+        W = rng.choice(_WEBB_WEIGHTS, size=(G, n_rep))
+    else:
+        W = rng.choice(np.array([-1.0, 1.0]), size=(G, n_rep))
+    return (S @ W).T
+
+
+def wild_cluster_bootstrap(
+    model,
+    cols: list[str] | None = None,
+    cluster: str = "t",
+    n_boot: int = 9999,
+    weights: str = "webb",
+    seed: int = 42,
+    n_jobs: int | None = None,
+    chunk_size: int = 1000,
+) -> pd.DataFrame:
+    """
+    FE 계수의 wild cluster bootstrap (unrestricted, 잔차 × 군집 가중치).
+
+    β* − β̂ = P (û ⊙ w_g),  P = 적합 시 계산된 (X'X)⁻¹X' (model.model.pinv_wexog)
+    → 군집별 기여 S_g = P[:, g] û_g 를 한 번 계산하면 replicate 당 S @ w (행렬-벡터 곱)
+
+    - cluster: 군집 컬럼 (기본 "t" = 분기, 행정동_코드 등)
+    - weights: "webb" (권장, 군집 수 적을 때) 또는 "rademacher"
+    - replicate는 chunk_size 단위로 나눠 프로세스 풀에서 실행.
+      chunk별 시드는 SeedSequence.spawn → n_jobs와 무관하게 결과 재현
+    반환: 변수, 계수, boot_se, p-value(H0: β=0), 95% 백분위 CI
+    """
+    if weights not in _BOOT_WEIGHTS:
+        raise ValueError(f"weights는 {_BOOT_WEIGHTS} 중 하나: {weights}")
+    if model is None:
+        return pd.DataFrame()
+
+    names = list(model.model.exog_names)
+    cols = cols or [n for n in names if "C(" not in str(n) and n != "Intercept"]
+    cols = [c for c in cols if c in names]
+    rows = [names.index(c) for c in cols]
+
+    P = model.model.pinv_wexog[rows]
+    resid = np.asarray(model.resid, dtype=float)
+    g = np.unique(model.model.data.frame[cluster].to_numpy(), return_inverse=True)[1]
+    n_g = g.max() + 1
+    S = np.vstack([np.bincount(g, weights=p * resid, minlength=n_g) for p in P])
+
+    sizes = [chunk_size] * (n_boot // chunk_size)
+    if n_boot % chunk_size:
+        sizes.append(n_boot % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = ([S] * len(sizes), sizes, seeds, [weights] * len(sizes))
+
+    n_jobs = min(get_n_jobs(n_jobs), len(sizes))
+    if n_jobs == 1:
+        chunks = list(map(_bootstrap_chunk, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            chunks = list(ex.map(_bootstrap_chunk, *args))
+    delta = np.vstack(chunks)
+
+    beta = model.params[cols].to_numpy(dtype=float)
+    pval = (1 + (np.abs(delta) >= np.abs(beta)).sum(axis=0)) / (n_boot + 1)
+    lo, hi = np.quantile(delta, [0.025, 0.975], axis=0)
+    return pd.DataFrame({
+        "변수": cols,
+        "계수": beta,
+        "boot_se": delta.std(axis=0, ddof=1),
+        "p-value": pval,
+        "CI_2.5%": beta + lo,
+        "CI_97.5%": beta + hi,
+        "유의성": [_sig_stars(p) for p in pval],
+        "n_clusters": n_g,
+        "n_boot": n_boot,
+    })
+
+
+def _sig_stars(pval: float) -> str:
+    return "***" if pval < 0.01 else "**" if pval < 0.05 else "*" if pval < 0.1 else ""
 
 
 def fe_summary_table(model, exclude_dummies: bool = True) -> pd.DataFrame:
@@ -110,6 +275,180 @@ def fe_summary_table(model, exclude_dummies: bool = True) -> pd.DataFrame:
             continue
         se = model.bse.get(name, np.nan)
         pval = model.pvalues.get(name, np.nan)
-        sig = "***" if pval < 0.01 else "**" if pval < 0.05 else "*" if pval < 0.1 else ""
-        rows.append({"변수": name, "계수": coef, "표준오차": se, "p-value": pval, "유의성": sig})
+        rows.append({"변수": name, "계수": coef, "표준오차": se, "p-value": pval, "유의성": _sig_stars(pval)})
     return pd.DataFrame(rows)
+
+
+# ---------- 스펙 그리드 (공유 demeaned 행렬) ----------
+
+def _group_demean(M: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """그룹(정수 코드)별 평균 제거 - 컬럼별 bincount"""
+    counts = np.bincount(codes, minlength=n_groups)
+    out = np.empty_like(M)
+    for j in range(M.shape[1]):
+        means = np.bincount(codes, weights=M[:, j], minlength=n_groups) / counts
+        out[:, j] = M[:, j] - means[codes]
+    return out
+
+
+def demean_panel(
+    M: np.ndarray,
+    entity: np.ndarray,
+    time: np.ndarray | None = None,
+    tol: float = 1e-10,
+    max_iter: int = 1000,
+) -> np.ndarray:
+    """
+    within 변환: 행정동 평균 제거 (+ 시간 평균 교대 제거 = 2-way FE).
+    불균형 패널은 수렴할 때까지 교대 투영 반복.
+    """
+    ent_codes, ent_idx = np.unique(entity, return_inverse=True)
+    Z = _group_demean(M, ent_idx, len(ent_codes))
+    if time is None:
+        return Z
+    t_codes, t_idx = np.unique(time, return_inverse=True)
+    for _ in range(max_iter):
+        Z_new = _group_demean(_group_demean(Z, t_idx, len(t_codes)), ent_idx, len(ent_codes))
+        done = np.max(np.abs(Z_new - Z)) < tol
+        Z = Z_new
+        if done:
+            break
+    return Z
+
+
+def _fit_demeaned(
+    Z: np.ndarray,
+    col_idx: dict,
+    spec: dict,
+    n_absorbed: int,
+    groups: dict,
+    raw_norm: np.ndarray,
+) -> pd.DataFrame:
+    """공유 demeaned 행렬 Z의 슬라이스로 한 스펙 적합 (OLS + HC1/cluster/nonrobust SE)"""
+    from scipy import stats
+
+    regs = [c for c in spec["regressors"] if c in col_idx]
+    X = Z[:, [col_idx[c] for c in regs]]
+    y = Z[:, col_idx[spec["target"]]]
+
+    # FE에 흡수된 변수 (예: 2-way FE에서 시간 공통 변수) → 계수 NaN
+    kept = np.linalg.norm(X, axis=0) > 1e-8 * raw_norm[[col_idx[c] for c in regs]]
+    X = X[:, kept]
+    n, k = X.shape
+    dof = n - k - n_absorbed
+
+    XtX_inv = np.linalg.pinv(X.T @ X)
+    beta = XtX_inv @ (X.T @ y)
+    resid = y - X @ beta
+
+    cov_type = spec.get("cov_type", "HC1")
+    if cov_type == "cluster":
+        g = groups[spec.get("cov_groups", "행정동_코드")]
+        n_g = g.max() + 1
+        scores = np.zeros((n_g, k))
+        np.add.at(scores, g, X * resid[:, None])
+        meat = scores.T @ scores
+        meat *= n_g / (n_g - 1) * (n - 1) / dof
+    elif cov_type == "nonrobust":
+        meat = (X.T @ X) * (resid @ resid / dof)
+    else:
+        meat = (X * resid[:, None] ** 2).T @ X * (n / dof)
+    cov = XtX_inv @ meat @ XtX_inv
+
+    r2_within = 1 - (resid @ resid) / (y @ y)
+    coef = np.full(len(regs), np.nan)
+    se = np.full(len(regs), np.nan)
+    coef[kept] = beta
+    se[kept] = np.sqrt(np.diag(cov))
+    # nonrobust: t(잔차 자유도) (statsmodels OLS와 동일), robust: 정규 근사
+    if cov_type == "nonrobust":
+        pval = 2 * stats.t.sf(np.abs(coef / se), df=dof)
+    else:
+        pval = 2 * stats.norm.sf(np.abs(coef / se))
+    return pd.DataFrame({
+        "spec": spec.get("name", spec["target"]),
+        "변수": regs,
+        "계수": coef,
+        "표준오차": se,
+        "p-value": pval,
+        "유의성": [_sig_stars(p) for p in pval],
+        "n": n,
+        "R2_within": r2_within,
+    })
+
+
+def fit_fe_grid(
+    df: pd.DataFrame,
+    specs: list[dict],
+    common_sample: bool = False,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """
+    여러 FE 스펙을 한 번에 적합.
+    specs: [{"name", "target", "regressors", "fe": "entity"|"twoway", "cov_type", "cov_groups"}, ...]
+
+    - 표본이 같은 스펙끼리 target·regressors 합집합을 한 번만 within 변환 (표본 × FE 종류별 1회)
+    - 각 스펙은 공유 행렬의 컬럼 슬라이스로 OLS (스레드 병렬, numpy가 GIL 해제)
+    - common_sample=False (기본): 스펙마다 자기 컬럼의 결측만 제거 (단독 적합과 같은 표본)
+      common_sample=True: 모든 스펙 컬럼 합집합의 결측 제거 후 공통 표본 → 스펙 간 계수 비교용
+    반환: 스펙별 계수표를 세로로 쌓은 DataFrame (n: 스펙별 표본 수)
+    """
+    cols = []
+    for sp in specs:
+        for c in [sp["target"]] + list(sp["regressors"]):
+            if c in df.columns and c not in cols:
+                cols.append(c)
+    specs = [sp for sp in specs if sp["target"] in cols]
+    if not specs:
+        return pd.DataFrame()
+
+    col_pos = {c: i for i, c in enumerate(cols)}
+    observed = df[cols].notna().to_numpy()
+
+    # 스펙별 표본 마스크 → 같은 표본끼리 묶음
+    samples: dict[bytes, tuple[np.ndarray, list[dict]]] = {}
+    for sp in specs:
+        if common_sample:
+            mask = observed.all(axis=1)
+        else:
+            use = [col_pos[c] for c in [sp["target"]] + list(sp["regressors"]) if c in col_pos]
+            mask = observed[:, use].all(axis=1)
+        samples.setdefault(mask.tobytes(), (mask, []))[1].append(sp)
+
+    jobs = []
+    for mask, sample_specs in samples.values():
+        if mask.sum() < 50:
+            continue
+        d = df[mask]
+        # 이 표본에서 결측 없는 컬럼만 변환 (다른 스펙 전용 컬럼의 NaN 제외)
+        sub_cols = [c for c in cols if observed[mask, col_pos[c]].all()]
+        M = d[sub_cols].to_numpy(dtype=float)
+        entity = d["행정동_코드"].to_numpy()
+        time = _time_key(d)
+        col_idx = {c: i for i, c in enumerate(sub_cols)}
+        raw_norm = np.linalg.norm(M - M.mean(axis=0), axis=0)
+        groups = {}
+        for g in {sp.get("cov_groups", "행정동_코드") for sp in sample_specs if sp.get("cov_type") == "cluster"}:
+            key = time if g == "t" else d[g].to_numpy()
+            groups[g] = np.unique(key, return_inverse=True)[1]
+
+        n_entity = len(np.unique(entity))
+        n_time = len(np.unique(time))
+        shared = {}
+        for fe in {sp.get("fe", "entity") for sp in sample_specs}:
+            if fe == "twoway":
+                shared[fe] = (demean_panel(M, entity, time), n_entity + n_time - 1)
+            else:
+                shared[fe] = (demean_panel(M, entity), n_entity)
+        for sp in sample_specs:
+            Z, n_absorbed = shared[sp.get("fe", "entity")]
+            jobs.append((Z, col_idx, sp, n_absorbed, groups, raw_norm))
+    if not jobs:
+        return pd.DataFrame()
+
+    # 입력 specs 순서대로 출력
+    order = {id(sp): i for i, sp in enumerate(specs)}
+    jobs.sort(key=lambda j: order[id(j[2])])
+    with ThreadPoolExecutor(max_workers=get_n_jobs(n_jobs)) as ex:
+        tables = list(ex.map(lambda j: _fit_demeaned(*j), jobs))
+    return pd.concat(tables, ignore_index=True)
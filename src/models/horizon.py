@@ -0,0 +1,118 @@
+"""
+다중 horizon 예측 (h = 1~4분기 뒤 디저트 비중)
+- 타겟: preprocess.add_multi_horizon_targets (target_h1..h4, 패널 1회 처리)
+- direct: horizon별 모델을 스레드 풀에서 병렬 학습 (각 horizon은 해당 타겟이 있는 행만 사용)
+- test_year: 타겟 분기 (행 분기 + h)가 test 구간에 들어가는 학습 행은 horizon별로 제외 (누수 방지)
+- multi_output: 모든 horizon 타겟이 있는 행으로 다중출력 모델 1개 (LR/DT/RF/MLP/XGB 지원)
+- predict_horizons: 모든 행정동 × horizon 예측을 한 번에 (wide: pred_h1..)
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.models.predict import predict_chunked
+
+HORIZONS = (1, 2, 3, 4)
+
+
+def _target_cols(horizons, prefix: str) -> list[str]:
+    return [f"{prefix}{h}" for h in horizons]
+
+
+def fit_horizons(
+    train_df: pd.DataFrame,
+    feature_cols: list[str],
+    name: str = "RandomForest",
+    horizons: tuple[int, ...] = HORIZONS,
+    params: dict | None = None,
+    multi_output: bool = False,
+    prefix: str = "target_h",
+    test_year: int | None = None,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    name: train.make_model 모델명
+    test_year: test 시작 연도 (time_split과 동일) - 행 분기 + h ≥ test 시작 분기인 행은 h 타겟 학습에서 제외
+    반환: {"models": {h: 모델} (direct) 또는 {"all": 모델} (multi_output), "horizons", "feature_cols", "multi_output"}
+    """
+    from src.models.train import build_estimator, fit_dtype, single_thread_params
+
+    targets = _target_cols(horizons, prefix)
+    dtype = fit_dtype(name)
+    key = train_df["연도"].to_numpy() * 4 + train_df["분기"].to_numpy() - 1
+    boundary = np.inf if test_year is None else test_year * 4
+
+    if multi_output:
+        sub = train_df[key + max(horizons) < boundary].dropna(subset=feature_cols + targets)
+        model = build_estimator(name, params)
+        model.fit(sub[feature_cols].to_numpy(dtype=dtype), sub[targets].to_numpy(dtype=float))
+        models = {"all": model}
+    else:
+        def _fit(h_col):
+            h, col = h_col
+            sub = train_df[key + h < boundary].dropna(subset=feature_cols + [col])
+            # horizon별 모델은 스레드 풀에서 동시 학습 → 모델 내부 병렬은 끔
+            model = build_estimator(name, single_thread_params(name, params))
+            model.fit(sub[feature_cols].to_numpy(dtype=dtype), sub[col].to_numpy(dtype=float))
+            return h, model
+
+        with ThreadPoolExecutor(max_workers=min(len(horizons), get_n_jobs(n_jobs))) as ex:
+            models = dict(ex.map(_fit, zip(horizons, targets)))
+
+    return {
+        "models": models,
+        "name": name,
+        "horizons": tuple(horizons),
+        "feature_cols": feature_cols,
+        "multi_output": multi_output,
+    }
+
+
+def predict_horizons(fit: dict, df: pd.DataFrame, n_jobs: int | None = None) -> pd.DataFrame:
+    """
+    df의 (피처 결측 없는) 모든 행 × horizon 예측
+    반환: 행정동_코드, 연도, 분기, pred_h1..pred_hH
+    """
+    from src.models.train import fit_dtype
+
+    cols = fit["feature_cols"]
+    sub = df.dropna(subset=cols)
+    X = sub[cols].to_numpy(dtype=fit_dtype(fit["name"]))
+    out = sub[["행정동_코드", "연도", "분기"]].reset_index(drop=True)
+    pred_cols = [f"pred_h{h}" for h in fit["horizons"]]
+
+    if fit["multi_output"]:
+        P = predict_chunked(fit["models"]["all"], X, n_jobs=n_jobs)
+    else:
+        P = np.empty((len(X), len(fit["horizons"])))
+        for j, h in enumerate(fit["horizons"]):
+            predict_chunked(fit["models"][h], X, n_jobs=n_jobs, out=P[:, j])
+    out[pred_cols] = P
+    return out
+
+
+def evaluate_horizons(fit: dict, test_df: pd.DataFrame, prefix: str = "target_h") -> pd.DataFrame:
+    """horizon별 RMSE, MAE, R2 (각 horizon 타겟이 있는 행 기준)"""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    pred = predict_horizons(fit, test_df)
+    sub = test_df.dropna(subset=fit["feature_cols"]).reset_index(drop=True)
+    rows = []
+    for h in fit["horizons"]:
+        y = sub[f"{prefix}{h}"].to_numpy(dtype=float)
+        p = pred[f"pred_h{h}"].to_numpy()
+        ok = ~np.isnan(y)
+        if ok.sum() == 0:
+            continue
+        rows.append({
+            "horizon": h,
+            "n": int(ok.sum()),
+            "RMSE": np.sqrt(mean_squared_error(y[ok], p[ok])),
+            "MAE": mean_absolute_error(y[ok], p[ok]),
+            "R2": r2_score(y[ok], p[ok]),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,162 @@
+"""
+선형대수 기반 고속 회귀 유틸
+- grouped_ols: 그룹별 OLS를 한 번의 배치 solve로 (군집/자치구/행정동별 모델)
+- multi_ols: 여러 타겟(Y의 열)을 한 번의 다중 우변 최소제곱으로
+- ridge_path / enet_path_coefs / regularization_path_cv: 정규화 경로 (alpha 그리드 전체를 한 번에)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def _batched_solve(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """A (G×p×p) x = b (G×p) 배치 풀이. 특이 행렬이 있으면 pinv로 대체."""
+    try:
+        return np.linalg.solve(A, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum("gij,gj->gi", np.linalg.pinv(A), b)
+
+
+def grouped_ols(
+    X: np.ndarray,
+    y: np.ndarray,
+    groups: np.ndarray,
+    fit_intercept: bool = True,
+    min_size: int | None = None,
+) -> dict:
+    """
+    그룹별 OLS 일괄 적합.
+    - 그룹별 XᵀX (G×p×p), Xᵀy (G×p)를 bincount로 누적 → np.linalg.solve 1회 (3-D 배치)
+    - min_size 미만 그룹은 계수 NaN (기본: 변수 수 + 1)
+    반환: {"groups", "coef" (G×k), "intercept" (G,), "n" (G,)}
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    labels, g = np.unique(groups, return_inverse=True)
+    G = len(labels)
+
+    # 매출(~1e8)과 비중(~0.1) 스케일 차이로 XᵀX 조건수가 폭증 → 전역 표준화 후 풀고 되돌림
+    mu = X.mean(axis=0) if fit_intercept else np.zeros(X.shape[1])
+    sd = X.std(axis=0)
+    sd[sd == 0] = 1.0
+    Xs = (X - mu) / sd
+    Xa = np.column_stack([np.ones(len(X)), Xs]) if fit_intercept else Xs
+    p = Xa.shape[1]
+    counts = np.bincount(g, minlength=G)
+
+    XtX = np.empty((G, p, p))
+    for i in range(p):
+        for j in range(i, p):
+            XtX[:, i, j] = XtX[:, j, i] = np.bincount(g, weights=Xa[:, i] * Xa[:, j], minlength=G)
+    Xty = np.column_stack([np.bincount(g, weights=Xa[:, i] * y, minlength=G) for i in range(p)])
+
+    min_size = p + 1 if min_size is None else min_size
+    ok = counts >= min_size
+    beta = np.full((G, p), np.nan)
+    if ok.any():
+        beta[ok] = _batched_solve(XtX[ok], Xty[ok])
+
+    if fit_intercept:
+        coef = beta[:, 1:] / sd
+        intercept = beta[:, 0] - coef @ mu
+    else:
+        coef, intercept = beta / sd, np.zeros(G)
+    return {"groups": labels, "coef": coef, "intercept": intercept, "n": counts}
+
+
+def grouped_predict(fit: dict, X: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """grouped_ols 결과로 예측 (적합에 없던 그룹은 NaN)"""
+    X = np.asarray(X, dtype=float)
+    labels = fit["groups"]
+    idx = np.clip(np.searchsorted(labels, groups), 0, len(labels) - 1)
+    known = labels[idx] == groups
+    pred = np.einsum("ij,ij->i", X, fit["coef"][idx]) + fit["intercept"][idx]
+    pred[~known] = np.nan
+    return pred
+
+
+def multi_ols(X: np.ndarray, Y: np.ndarray, fit_intercept: bool = True) -> dict:
+    """
+    다중 타겟 OLS: 같은 설계 행렬 X에 대해 Y (n×T)의 모든 열을 lstsq 1회로 풀이
+    (grouped_ols와 같이 전역 표준화 후 풀고 되돌림)
+    반환: {"coef" (k×T), "intercept" (T,)}
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    mu = X.mean(axis=0) if fit_intercept else np.zeros(X.shape[1])
+    ym = Y.mean(axis=0) if fit_intercept else np.zeros(Y.shape[1])
+    sd = X.std(axis=0)
+    sd[sd == 0] = 1.0
+    beta = np.linalg.lstsq((X - mu) / sd, Y - ym, rcond=None)[0]
+    coef = beta / sd[:, None]
+    return {"coef": coef, "intercept": ym - mu @ coef}
+
+
+# ---------- 정규화 경로 ----------
+
+def ridge_path(X: np.ndarray, y: np.ndarray, alphas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ridge 닫힌 해 경로: 중심화 X의 SVD 1회 → 모든 alpha에 대해
+    w(α) = V diag(s / (s² + α)) Uᵀ y   (sklearn Ridge와 같은 목적함수)
+    반환: coefs (n_alphas × p), intercepts (n_alphas,)
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    x_mean, y_mean = X.mean(axis=0), y.mean()
+    U, s, Vt = np.linalg.svd(X - x_mean, full_matrices=False)
+    Uty = U.T @ (y - y_mean)
+    d = s / (s ** 2 + alphas[:, None])
+    coefs = (d * Uty) @ Vt
+    return coefs, y_mean - coefs @ x_mean
+
+
+def enet_path_coefs(
+    X: np.ndarray,
+    y: np.ndarray,
+    alphas: np.ndarray,
+    l1_ratio: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ElasticNet/Lasso 경로 (sklearn enet_path: 큰 alpha부터 warm start 좌표하강).
+    l1_ratio=1.0 → Lasso. 반환 순서는 입력 alphas 순서와 같음.
+    """
+    from sklearn.linear_model import enet_path
+
+    alphas = np.asarray(alphas, dtype=float)
+    order = np.argsort(alphas)[::-1]
+    x_mean, y_mean = X.mean(axis=0), y.mean()
+    _, coefs, _ = enet_path(X - x_mean, y - y_mean, l1_ratio=l1_ratio, alphas=alphas[order])
+    coefs = coefs.T[np.argsort(order)]
+    return coefs, y_mean - coefs @ x_mean
+
+
+def regularization_path_cv(
+    X: np.ndarray,
+    y: np.ndarray,
+    folds: list[tuple[np.ndarray, np.ndarray, str]],
+    family: str,
+    alphas: np.ndarray,
+    l1_ratios: tuple[float, ...] = (1.0,),
+) -> pd.DataFrame:
+    """
+    fold마다 경로 1회 계산 → 경로 위 모든 (alpha, l1_ratio)를 test fold에서 평가.
+    family: "ridge" (SVD 닫힌 해) 또는 "enet" (l1_ratio=1.0 이면 Lasso)
+    X는 fold train 기준으로 표준화 (exp1 Track C의 StandardScaler와 동일).
+    반환: family, alpha, l1_ratio, fold, RMSE (long format)
+    """
+    alphas = np.asarray(alphas, dtype=float)
+    rows = []
+    for train_idx, test_idx, label in folds:
+        mu = X[train_idx].mean(axis=0)
+        sd = X[train_idx].std(axis=0)
+        sd[sd == 0] = 1.0
+        X_tr, X_te = (X[train_idx] - mu) / sd, (X[test_idx] - mu) / sd
+        for l1 in (l1_ratios if family == "enet" else (0.0,)):
+            if family == "ridge":
+                coefs, b0 = ridge_path(X_tr, y[train_idx], alphas)
+            else:
+                coefs, b0 = enet_path_coefs(X_tr, y[train_idx], alphas, l1)
+            pred = X_te @ coefs.T + b0
+            rmse = np.sqrt(((pred - y[test_idx, None]) ** 2).mean(axis=0))
+            rows.append(pd.DataFrame({"family": family, "alpha": alphas, "l1_ratio": l1, "fold": label, "RMSE": rmse}))
+    return pd.concat(rows, ignore_index=True)
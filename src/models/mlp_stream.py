@@ -0,0 +1,94 @@
+"""
+MLP 스트리밍 학습: feature store(memmap)에서 chunk 단위로 읽어 partial_fit
+- 1패스: StandardScaler.partial_fit
+- epoch마다: chunk 순서 셔플 → chunk 내부는 MLPRegressor.partial_fit (batch_size 미니배치)
+- 검증: 마지막 분기를 hold-out, epoch별 RMSE로 early stopping (최적 가중치 복원)
+- epoch별 소요 시간 기록
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import iter_chunks, open_feature_store
+
+
+def train_mlp_streaming(
+    store_path: str | Path,
+    hidden_layer_sizes: tuple[int, ...] = (64, 32),
+    alpha: float = 0.001,
+    batch_size: int = 256,
+    max_epochs: int = 200,
+    patience: int = 20,
+    chunk_rows: int = 100_000,
+    random_state: int = 42,
+) -> dict:
+    """
+    store_path: write_feature_store로 만든 feature store (2개 이상 분기, 아니면 ValueError)
+    반환: {"model", "scaler", "feature_cols", "history" (epoch, loss, val_RMSE, seconds), "best_epoch", "val_RMSE"}
+    """
+    from sklearn.neural_network import MLPRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    M, cols = open_feature_store(store_path)
+    n_feat = len(cols) - 2  # 마지막 두 컬럼: target, _t
+    first_t = min(chunk[:, -1].min() for chunk in iter_chunks(M, chunk_rows))
+    last_t = max(chunk[:, -1].max() for chunk in iter_chunks(M, chunk_rows))
+    if first_t == last_t:
+        raise ValueError("스트리밍 MLP는 2개 이상 분기가 필요 (마지막 분기는 검증용 hold-out)")
+
+    scaler = StandardScaler()
+    for chunk in iter_chunks(M, chunk_rows):
+        train = chunk[chunk[:, -1] < last_t]
+        if len(train):
+            scaler.partial_fit(train[:, :n_feat])
+
+    mlp = MLPRegressor(
+        hidden_layer_sizes=hidden_layer_sizes,
+        activation="relu",
+        solver="adam",
+        alpha=alpha,
+        batch_size=batch_size,
+        random_state=random_state,
+    )
+    rng = np.random.default_rng(random_state)
+    n_chunks = int(np.ceil(len(M) / chunk_rows))
+
+    history, best, best_rmse, wait = [], None, np.inf, 0
+    for epoch in range(1, max_epochs + 1):
+        t0 = time.perf_counter()
+        for chunk in iter_chunks(M, chunk_rows, order=rng.permutation(n_chunks)):
+            train = chunk[chunk[:, -1] < last_t]
+            if len(train):
+                mlp.partial_fit(scaler.transform(train[:, :n_feat]), train[:, n_feat])
+
+        sse, n_val = 0.0, 0
+        for chunk in iter_chunks(M, chunk_rows):
+            val = chunk[chunk[:, -1] == last_t]
+            if len(val):
+                pred = mlp.predict(scaler.transform(val[:, :n_feat]))
+                sse += ((val[:, n_feat] - pred) ** 2).sum()
+                n_val += len(val)
+        val_rmse = np.sqrt(sse / n_val)
+        history.append({"epoch": epoch, "loss": mlp.loss_, "val_RMSE": val_rmse, "seconds": time.perf_counter() - t0})
+
+        if val_rmse < best_rmse:
+            best_rmse, wait = val_rmse, 0
+            best = ([w.copy() for w in mlp.coefs_], [b.copy() for b in mlp.intercepts_], epoch)
+        else:
+            wait += 1
+            if wait >= patience:
+                break
+
+    mlp.coefs_, mlp.intercepts_, best_epoch = best
+    return {
+        "model": mlp,
+        "scaler": scaler,
+        "feature_cols": cols[:n_feat],
+        "history": pd.DataFrame(history),
+        "best_epoch": best_epoch,
+        "val_RMSE": best_rmse,
+    }
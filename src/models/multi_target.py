@@ -0,0 +1,94 @@
+"""
+다중 타겟 학습: 업종 그룹별 다음 분기 비중 여러 개를 한 번에 비교
+- 설계 행렬 1개를 모든 타겟이 공유 (피처 구성·행 선택 1회)
+- LinearRegression: linear.multi_ols (다중 우변 lstsq 1회)
+- DecisionTree / RandomForest / XGBoost: 다중출력 fit 1회
+  (sklearn 트리는 분기 기준이 타겟 평균이라 타겟별 모델과 다를 수 있음 → multi_output=False로 타겟별 학습 가능,
+   XGBoost는 타겟마다 트리를 따로 키우므로 타겟별 모델과 같은 구조)
+- MLP 등 나머지: 타겟별 모델을 스레드 풀에서 병렬 학습
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.models.linear import multi_ols
+from src.models.predict import predict_chunked
+
+MULTI_OUTPUT_MODELS = {"DecisionTree", "RandomForest", "XGBoost"}
+
+
+def _metrics(Y: np.ndarray, P: np.ndarray) -> dict[str, np.ndarray]:
+    """타겟(열)별 RMSE, MAE, R2 (벡터화)"""
+    err = Y - P
+    ss_tot = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+    return {
+        "RMSE": np.sqrt((err ** 2).mean(axis=0)),
+        "MAE": np.abs(err).mean(axis=0),
+        "R2": 1 - (err ** 2).sum(axis=0) / np.where(ss_tot == 0, np.nan, ss_tot),
+    }
+
+
+def train_multi_target(
+    train_df: pd.DataFrame,
+    test_df: pd.DataFrame,
+    feature_cols: list[str],
+    targets: list[str],
+    models: tuple[str, ...] = ("LinearRegression", "DecisionTree", "RandomForest", "XGBoost", "MLP"),
+    params: dict | None = None,
+    multi_output: bool = True,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    targets: 타겟 컬럼 목록 (예: add_category_shares의 target_{그룹})
+    행: 피처와 모든 타겟이 있는 행 (타겟 간 공통)
+    반환: {"table": target, model, RMSE, MAE, R2 (long), "models": {모델명: 모델 또는 {타겟: 모델}}, "pred": {모델명: (n_test, T)}}
+    """
+    from src.models.train import build_estimator, fit_dtype, single_thread_params
+
+    params = params or {}
+    cols = feature_cols + targets
+    tr = train_df.dropna(subset=cols)
+    te = test_df.dropna(subset=cols)
+    X_tr64 = tr[feature_cols].to_numpy(dtype=float)
+    X_te64 = te[feature_cols].to_numpy(dtype=float)
+    Y_tr = tr[targets].to_numpy(dtype=float)
+    Y_te = te[targets].to_numpy(dtype=float)
+
+    fitted, preds = {}, {}
+    for name in models:
+        dtype = fit_dtype(name)
+        X_tr, X_te = X_tr64.astype(dtype, copy=False), X_te64.astype(dtype, copy=False)
+
+        if name == "LinearRegression":
+            fit = multi_ols(X_tr, Y_tr)
+            fitted[name] = fit
+            preds[name] = X_te @ fit["coef"] + fit["intercept"]
+        elif multi_output and name in MULTI_OUTPUT_MODELS:
+            model = build_estimator(name, params.get(name))
+            model.fit(X_tr, Y_tr)
+            fitted[name] = model
+            preds[name] = predict_chunked(model, X_te).reshape(len(X_te), len(targets))
+        else:
+            def _fit(j):
+                # 타겟별 모델은 스레드 풀에서 동시 학습 → 모델 내부 병렬은 끔
+                model = build_estimator(name, single_thread_params(name, params.get(name)))
+                model.fit(X_tr, Y_tr[:, j])
+                return model
+
+            with ThreadPoolExecutor(max_workers=get_n_jobs(n_jobs)) as ex:
+                per_target = list(ex.map(_fit, range(len(targets))))
+            fitted[name] = dict(zip(targets, per_target))
+            P = np.empty((len(X_te), len(targets)))
+            for j, model in enumerate(per_target):
+                predict_chunked(model, X_te, out=P[:, j])
+            preds[name] = P
+
+    rows = []
+    for name, P in preds.items():
+        m = _metrics(Y_te, P)
+        rows.append(pd.DataFrame({"target": targets, "model": name, **m}))
+    return {"table": pd.concat(rows, ignore_index=True), "models": fitted, "pred": preds}
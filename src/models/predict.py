@@ -0,0 +1,65 @@
+"""
+청크 단위 예측 (메모리 상한)
+- 행을 chunk_size씩 잘라 예측 → 미리 할당한 출력 배열에 기록
+- 중간 배열(트리 leaf 값·MLP 은닉층·스케일링 결과)은 청크 크기로 제한
+- 청크는 스레드 풀로 분산: sklearn 트리/포레스트·XGBoost·BLAS(선형·MLP) 예측은 GIL을 해제
+  → 피크 메모리 ≈ n_jobs × 청크 중간 배열 (전체 행 수와 무관)
+- 모델 자체가 병렬 예측하면 (XGBoost 등 n_jobs ≠ 1) 청크는 순차 실행 (스레드 과다 구독 방지)
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+
+# 기본 청크 크기 (행). 환경변수 ML_PREDICT_CHUNK로 조정
+DEFAULT_CHUNK_SIZE = int(os.environ.get("ML_PREDICT_CHUNK", 65536))
+
+
+def predict_chunked(
+    model,
+    X: np.ndarray | pd.DataFrame,
+    chunk_size: int | None = None,
+    n_jobs: int | None = None,
+    transform: Callable | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    model.predict(X)를 청크 단위로 실행.
+    transform: 청크별 입력 변환 (예: scaler.transform) - 전체 스케일 행렬을 만들지 않음
+    out: 결과를 쓸 배열 (없으면 첫 청크 결과 모양으로 할당)
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    if getattr(model, "n_jobs", None) not in (None, 1):
+        n_jobs = 1
+    n = len(X)
+    is_frame = isinstance(X, pd.DataFrame)
+
+    def _predict(start: int) -> np.ndarray:
+        part = X.iloc[start:start + chunk_size] if is_frame else X[start:start + chunk_size]
+        if transform is not None:
+            part = transform(part)
+        return np.asarray(model.predict(part))
+
+    if n == 0:
+        return out if out is not None else np.empty(0)
+
+    first = _predict(0)
+    if out is None:
+        out = np.empty((n,) + first.shape[1:], dtype=np.float64)
+    out[:len(first)] = first
+    starts = range(chunk_size, n, chunk_size)
+    if not starts:
+        return out
+
+    def _write(start: int) -> None:
+        out[start:start + chunk_size] = _predict(start)
+
+    with ThreadPoolExecutor(max_workers=get_n_jobs(n_jobs)) as ex:
+        list(ex.map(_write, starts))
+    return out
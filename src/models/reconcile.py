@@ -0,0 +1,195 @@
+"""
+계층 예측 조정 (행정동 → 자치구 → 서울)
+- 합산 행렬 S (희소, (1 + 구 + 동) × 동): 행정동_코드 앞 5자리 = 자치구
+- 모든 수준 실측: Y_all = S @ Y_동 (분기 전체를 열로 한 번에), 매출은 큐브 sum (업종 합계, 가법적)
+- 기본 예측: 행정동 비중 예측 모델 (train_and_evaluate) → 비중 × 전체 업종 매출 = 디저트 매출
+  상위 수준은 노드 비중 (직전 분기 매출 가중 평균) × 노드 전체 매출
+- 조정: Ỹ = S (Sᵀ W⁻¹ S)⁻¹ Sᵀ W⁻¹ Ŷ - 모든 분기(열)를 희소 solve 1회로
+  W: ols = I / wls_struct = 하위 동 수 / mint_diag = 노드별 학습 분기 예측 오차 분산 (MinT 대각 근사)
+- 조정 결과는 모든 수준에서 합이 맞음 (동 합 = 구, 구 합 = 서울)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+LEVELS = ("서울", "자치구", "행정동")
+
+
+def summing_matrix(codes, gu_len: int = 5) -> dict:
+    """
+    행정동_코드 → 합산 행렬
+    반환: {"S": csr ((1+G+D) × D), "labels": DataFrame(level, node), "bottom": 정렬된 행정동 코드}
+    """
+    from scipy import sparse
+
+    bottom = np.unique(np.asarray(codes).astype(str))
+    gu_labels, gu = np.unique(pd.Series(bottom).str[:gu_len].to_numpy(), return_inverse=True)
+    D, G = len(bottom), len(gu_labels)
+
+    rows = np.concatenate([np.zeros(D, dtype=int), 1 + gu, 1 + G + np.arange(D)])
+    cols = np.tile(np.arange(D), 3)
+    S = sparse.csr_matrix((np.ones(3 * D), (rows, cols)), shape=(1 + G + D, D))
+    labels = pd.DataFrame({
+        "level": [LEVELS[0]] + [LEVELS[1]] * G + [LEVELS[2]] * D,
+        "node": ["서울"] + list(gu_labels) + list(bottom),
+    })
+    return {"S": S, "labels": labels, "bottom": bottom}
+
+
+def panel_to_matrix(df: pd.DataFrame, value_col: str, bottom: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """패널 → (동 × 분기) 행렬 (결측은 0으로 합산), 분기 키 (연도*4 + 분기-1)"""
+    d = pd.Index(bottom).get_indexer(df["행정동_코드"].astype(str))
+    t_keys, t = np.unique(df["연도"].to_numpy() * 4 + df["분기"].to_numpy() - 1, return_inverse=True)
+    Y = np.zeros((len(bottom), len(t_keys)))
+    ok = d >= 0
+    np.add.at(Y, (d[ok], t[ok]), np.nan_to_num(df[value_col].to_numpy(dtype=float)[ok]))
+    return Y, t_keys
+
+
+def reconcile(
+    Yhat: np.ndarray,
+    S,
+    method: str = "mint_diag",
+    residuals: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Ŷ (노드 × 분기) → 조정 예측 Ỹ (같은 모양, 모든 수준 합 일치)
+    method: "ols" | "wls_struct" | "mint_diag" (residuals 필요: 노드별 학습 잔차)
+    """
+    from scipy import sparse
+    from scipy.sparse.linalg import spsolve
+
+    if method == "ols":
+        w = np.ones(S.shape[0])
+    elif method == "wls_struct":
+        w = np.asarray(S.sum(axis=1)).ravel()
+    elif method == "mint_diag":
+        if residuals is None:
+            raise ValueError("mint_diag에는 residuals (노드 × 분기 학습 잔차)가 필요합니다")
+        w = np.nanmean(residuals ** 2, axis=1)
+        w = np.where(np.isfinite(w) & (w > 0), w, np.nanmax(w))
+    else:
+        raise ValueError(f"알 수 없는 method: {method}")
+
+    Winv = sparse.diags(1.0 / w)
+    StW = (S.T @ Winv).tocsr()
+    A = (StW @ S).tocsc()
+    cols = ~np.isnan(Yhat).any(axis=0)
+    out = np.full_like(Yhat, np.nan)
+    if cols.any():
+        bottom = spsolve(A, StW @ Yhat[:, cols])
+        out[:, cols] = S @ bottom.reshape(S.shape[1], -1)
+    return out
+
+
+def _sales_matrix(cube, bottom: np.ndarray, industries: list[str] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """큐브 → (동 × 분기) 당월_매출_금액 합계 행렬 (industries 합산, None이면 전체 업종), 분기 키"""
+    from src.data.cube import cube_slice
+
+    tab = cube_slice(cube, "당월_매출_금액", "행정동", "sum", industries).rename(columns={"node": "행정동_코드"})
+    return panel_to_matrix(tab, "당월_매출_금액", bottom)
+
+
+def share_forecasts(
+    df: pd.DataFrame,
+    model,
+    feature_cols: list[str],
+    bottom: np.ndarray,
+    t_keys: np.ndarray,
+    transform=None,
+    share_col: str = "디저트_비중",
+) -> np.ndarray:
+    """
+    행 (동, t)의 다음 분기 비중 예측 → (동 × 분기) 행렬, 열 = 예측 대상 분기 t+1
+    피처 결측 행은 현재 비중 (naive), 그래도 없는 동은 같은 분기 예측 평균
+    """
+    from src.config import get_dtype
+    from src.models.predict import predict_chunked
+
+    X = df[feature_cols]
+    ok = X.notna().all(axis=1).to_numpy()
+    share = df[share_col].to_numpy(dtype=float).copy()
+    if ok.any():
+        share[ok] = predict_chunked(model, X[ok].astype(get_dtype()), transform=transform)
+
+    d = pd.Index(bottom).get_indexer(df["행정동_코드"].astype(str))
+    key = df["연도"].to_numpy() * 4 + df["분기"].to_numpy() - 1 + 1
+    t = np.searchsorted(t_keys, key)
+    keep = (d >= 0) & (t < len(t_keys)) & (t_keys[np.minimum(t, len(t_keys) - 1)] == key)
+    out = np.full((len(bottom), len(t_keys)), np.nan)
+    out[d[keep], t[keep]] = share[keep]
+
+    cols = ~np.isnan(out).all(axis=0)
+    with np.errstate(invalid="ignore"):
+        fill = np.nanmean(out[:, cols], axis=0)
+    out[:, cols] = np.where(np.isnan(out[:, cols]), fill, out[:, cols])
+    return out
+
+
+def reconcile_panel(
+    df: pd.DataFrame,
+    model,
+    feature_cols: list[str],
+    transform=None,
+    cube=None,
+    test_year: int = 2024,
+    method: str = "mint_diag",
+    gu_len: int = 5,
+) -> dict:
+    """
+    행정동 비중 예측 → 수준별 디저트 매출 기본 예측 + 조정 예측 + 수준별 성능표 (test 분기)
+    df: 행정동 × 분기 패널 (feature_cols, 디저트_비중), model: 학습된 비중 모델 (MLP면 transform=scaler.transform)
+    cube: 전체 업종 당월_매출_금액 큐브 (None이면 load_or_build_cube)
+    반환: {"table": level, method(base/조정), RMSE, MAPE, "base", "reconciled", "actual", "labels", "quarters"}
+    """
+    from src.data.cube import load_or_build_cube
+    from src.data.load_dessert import DESSERT_CATEGORIES
+
+    if cube is None:
+        cube = load_or_build_cube(measures=["당월_매출_금액"])
+    h = summing_matrix(df["행정동_코드"], gu_len=gu_len)
+    S = h["S"]
+    total, t_keys = _sales_matrix(cube, h["bottom"])
+    dessert, _ = _sales_matrix(cube, h["bottom"], DESSERT_CATEGORIES)
+    share = share_forecasts(df, model, feature_cols, h["bottom"], t_keys, transform=transform)
+
+    # 노드 비중 = 직전 분기 전체 매출 가중 평균 (예측 시점에 알려진 가중치) → × 노드 전체 매출
+    prev = np.concatenate([np.full((len(h["bottom"]), 1), np.nan), total[:, :-1]], axis=1)
+    num = np.asarray(S @ np.nan_to_num(share * prev))
+    den = np.asarray(S @ np.nan_to_num(prev))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        node_share = np.where(den > 0, num / den, np.asarray(S @ share) / np.asarray(S.sum(axis=1)))
+    node_share[:, np.isnan(share).all(axis=0)] = np.nan
+    Yhat = node_share * np.asarray(S @ total)
+
+    Y_all = np.asarray(S @ dessert)
+    n_train = int((t_keys // 4 < test_year).sum())
+    resid = np.full_like(Yhat, np.nan)
+    resid[:, :n_train] = Yhat[:, :n_train] - Y_all[:, :n_train]
+    Ytil = reconcile(Yhat, S, method=method, residuals=resid)
+
+    test = slice(n_train, None)
+    rows = []
+    for level in LEVELS:
+        idx = np.flatnonzero(h["labels"]["level"].to_numpy() == level)
+        actual = Y_all[idx, test]
+        for name, P in (("base", Yhat), (method, Ytil)):
+            err = actual - P[idx, test]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ape = np.abs(err) / np.where(actual == 0, np.nan, np.abs(actual))
+            rows.append({
+                "level": level,
+                "method": name,
+                "RMSE": float(np.sqrt(np.nanmean(err ** 2))),
+                "MAPE": float(np.nanmean(ape)),
+            })
+
+    return {
+        "table": pd.DataFrame(rows),
+        "base": Yhat,
+        "reconciled": Ytil,
+        "actual": Y_all,
+        "labels": h["labels"],
+        "quarters": t_keys,
+    }
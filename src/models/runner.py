@@ -0,0 +1,130 @@
+"""
+실험 오케스트레이터: exp1~exp6 선언 + 병렬·재개 가능 실행
+- 실험마다 입력(컨텍스트 키)과 결과 CSV를 선언
+- fingerprint = (experiments 및 의존 모듈 소스, 입력 데이터, 파라미터) 해시 → 결과 CSV와 함께 manifest에 기록
+- 재실행 시 fingerprint가 같은 실험은 건너뜀 (중간 실패 후 재개)
+- 남은 실험은 프로세스 풀에서 동시 실행, 끝나는 대로 체크포인트
+"""
+from __future__ import annotations
+
+import importlib
+import inspect
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.data.cache import fingerprint
+
+# name: (함수명, 입력 컨텍스트 키, 추가 kwargs, 결과 CSV)
+EXPERIMENTS = {
+    "exp1": ("exp1_vif_tracks", ("train_df", "test_df", "base_cols"), {}, "exp1_vif_tracks.csv"),
+    "exp2": ("exp2_two_stage", ("train_df", "test_df", "lag_cols", "infl_cols"), {}, "exp2_two_stage.csv"),
+    "exp3": ("exp3_rolling_cv", ("df", "base_cols"), {}, "exp3_rolling_cv.csv"),
+    "exp4": ("exp4_cluster_models", ("df", "base_cols"), {"n_clusters": 3}, "exp4_cluster_models.csv"),
+    "exp5": ("exp5_mlp_improved", ("train_df", "test_df", "base_cols"), {}, "exp5_mlp_improved.csv"),
+    "exp6": ("exp6_interaction_redesign", ("train_df", "test_df", "base_cols"), {}, "exp6_interaction_redesign.csv"),
+}
+
+# fingerprint에 소스를 포함할 모듈 (experiments와 실험이 호출하는 src.models 모듈)
+SOURCE_MODULES = (
+    "src.models.experiments",
+    "src.models.train",
+    "src.models.linear",
+    "src.models.cv",
+    "src.models.clustering",
+    "src.models.predict",
+)
+
+MANIFEST = "_manifest.json"
+
+
+def _to_frame(result) -> pd.DataFrame:
+    """실험 반환값 → CSV 저장용 DataFrame (dict 값은 문자열로 평탄화)"""
+    if isinstance(result, pd.DataFrame):
+        return result
+    flat = {k: str(v) if isinstance(v, dict) else v for k, v in result.items()}
+    return pd.DataFrame([flat])
+
+
+def _run_one(func_name: str, args: list, kwargs: dict) -> pd.DataFrame:
+    """워커 프로세스에서 실험 1개 실행"""
+    from src.models import experiments
+
+    return _to_frame(getattr(experiments, func_name)(*args, **kwargs))
+
+
+def experiment_fingerprints(context: dict, names: list[str] | None = None) -> dict:
+    """실험별 fingerprint (입력 데이터는 컨텍스트 키별로 한 번만 해시)"""
+    names = names or list(EXPERIMENTS)
+    # 헬퍼(_prepare 등)·학습/CV/선형 모듈 변경도 반영되도록 모듈 전체 소스를 해시
+    module_src = [inspect.getsource(importlib.import_module(m)) for m in SOURCE_MODULES]
+    input_fp = {}
+    out = {}
+    for name in names:
+        func_name, inputs, kwargs, _ = EXPERIMENTS[name]
+        for k in inputs:
+            if k not in input_fp:
+                input_fp[k] = fingerprint(context[k])
+        out[name] = fingerprint(module_src, func_name, [input_fp[k] for k in inputs], kwargs)
+    return out
+
+
+def run_experiments(
+    context: dict,
+    out_dir: str | Path = "outputs/experiments",
+    only: list[str] | None = None,
+    force: bool = False,
+    n_jobs: int | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    context: {"df", "train_df", "test_df", "base_cols", "lag_cols", "infl_cols"}
+    only: 실행할 실험 이름 (예: ["exp4"]), None이면 전체
+    force: fingerprint 일치해도 재실행
+    반환: {실험 이름: 결과 DataFrame} (캐시된 결과 포함)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    names = only or list(EXPERIMENTS)
+    unknown = [n for n in names if n not in EXPERIMENTS]
+    if unknown:
+        raise ValueError(f"알 수 없는 실험: {unknown} (가능: {list(EXPERIMENTS)})")
+
+    fps = experiment_fingerprints(context, names)
+    results, todo = {}, []
+    for name in names:
+        csv = out_dir / EXPERIMENTS[name][3]
+        if not force and manifest.get(name) == fps[name] and csv.exists():
+            print(f"  [{name}] 캐시 사용 ({fps[name]})")
+            results[name] = pd.read_csv(csv)
+        else:
+            todo.append(name)
+
+    def _checkpoint(name: str, frame: pd.DataFrame) -> None:
+        frame.to_csv(out_dir / EXPERIMENTS[name][3], index=False)
+        manifest[name] = fps[name]
+        manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+        results[name] = frame
+        print(f"  [{name}] 완료 → {EXPERIMENTS[name][3]}")
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(get_n_jobs(n_jobs), len(todo))) as ex:
+            futures = {}
+            for name in todo:
+                func_name, inputs, kwargs, _ = EXPERIMENTS[name]
+                futures[ex.submit(_run_one, func_name, [context[k] for k in inputs], kwargs)] = name
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    _checkpoint(name, fut.result())
+                except Exception:
+                    print(f"  [{name}] 실패 (다음 실행 시 이 실험부터 재개)")
+                    traceback.print_exc()
+
+    return {n: results[n] for n in names if n in results}
@@ -0,0 +1,173 @@
+"""
+CPI 시나리오 엔진 (what-if 예측)
+- 입력: 거시변수 대안 경로 {컬럼: (S, H) 배열} - S개 시나리오 × 기준 분기까지의 최근 H분기
+  (CPI, inflation_mom, expected_inflation, 물가상승률/CPI_qoq 직접 지정 가능 - 둘은 같은 값으로 전파)
+- 분기 거시 이력(T)을 (S, T)로 broadcast 후 마지막 H분기만 교체
+  → CPI_qoq·물가상승률·infl_shock_*·exp_shock_ma(·_lag1)를 배열 연산으로 재계산
+    (add_cpi, add_inflation_shocks와 같은 정의: 직전 window분기 평균/표준편차 기준)
+- 기준 분기의 행정동 피처 (D, F)에 시나리오별 거시 피처를 덮어써 (S × D, F) 행렬 구성
+  물가_x_lag1비중 = 물가상승률(시나리오) × lag1_비중(행정동)
+- predict_chunked 한 번으로 전체 시나리오 × 행정동 예측
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.models.predict import predict_chunked
+
+MACRO_COLS = ["CPI", "inflation_mom", "expected_inflation", "CPI_qoq", "물가상승률"]
+SHOCK_COLS = ["infl_shock_ma", "infl_shock_z", "infl_accel", "exp_shock_ma"]
+
+
+def macro_history(df: pd.DataFrame) -> pd.DataFrame:
+    """패널 → 분기별 거시변수 이력 (연도, 분기 정렬)"""
+    cols = [c for c in MACRO_COLS if c in df.columns]
+    return (
+        df.drop_duplicates(["연도", "분기"])[["연도", "분기"] + cols]
+        .sort_values(["연도", "분기"])
+        .reset_index(drop=True)
+    )
+
+
+def shift_path(history: pd.DataFrame, col: str, deltas, horizon: int = 1) -> dict[str, np.ndarray]:
+    """
+    기준 경로 + 충격: 마지막 horizon분기의 col 값에 deltas(시나리오별)를 더한 (S, H) 경로
+    예) shift_path(h, "물가상승률", np.linspace(-0.01, 0.01, 1001))  # ±1%p, 1001개 시나리오
+    """
+    base = history[col].to_numpy(dtype=float)[-horizon:]
+    deltas = np.asarray(deltas, dtype=float).reshape(-1, 1)
+    return {col: base[None, :] + deltas}
+
+
+def _rolling_prev(x: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """(S, T) → 직전 window분기 평균·표준편차(ddof=1) (S, T), 앞 window분기는 NaN"""
+    mean = np.full_like(x, np.nan)
+    std = np.full_like(x, np.nan)
+    if x.shape[1] > window:
+        w = sliding_window_view(x, window, axis=1)[:, :-1]
+        mean[:, window:] = w.mean(axis=-1)
+        std[:, window:] = w.std(axis=-1, ddof=1)
+    return mean, std
+
+
+def _shift1(x: np.ndarray) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+def scenario_macro(
+    history: pd.DataFrame,
+    paths: dict[str, np.ndarray],
+    window: int = 4,
+) -> dict[str, np.ndarray]:
+    """
+    이력 + 대안 경로 → 시나리오별 거시 피처 전체 이력 {컬럼: (S, T)}
+    paths의 각 배열: (S, H) 또는 (H,) (모든 시나리오 공통)
+    """
+    paths = {c: np.atleast_2d(np.asarray(v, dtype=float)) for c, v in paths.items()}
+    S = max((v.shape[0] for v in paths.values()), default=1)
+    T = len(history)
+
+    m = {}
+    for c in [c for c in MACRO_COLS if c in history.columns or c in paths]:
+        base = history[c].to_numpy(dtype=float) if c in history.columns else np.full(T, np.nan)
+        x = np.repeat(base[None, :], S, axis=0)
+        if c in paths:
+            x[:, T - paths[c].shape[1]:] = paths[c]
+        m[c] = x
+
+    # add_cpi / build_macro_quarterly 정의: CPI_qoq = CPI 분기 변화율, 물가상승률 = CPI_qoq (없으면 mom/100)
+    # 물가상승률만 지정하면 CPI_qoq와 CPI 수준(지정 분기 연쇄)에 전파 → 충격 피처도 같은 경로로 재계산
+    if "물가상승률" in paths and "CPI_qoq" not in paths and "CPI_qoq" in history.columns:
+        m["CPI_qoq"] = m["물가상승률"]
+        if "CPI" in m and "CPI" not in paths:
+            for k in range(max(T - paths["물가상승률"].shape[1], 1), T):
+                m["CPI"][:, k] = m["CPI"][:, k - 1] * (1 + m["CPI_qoq"][:, k])
+    if "CPI" in paths and "CPI_qoq" not in paths:
+        m["CPI_qoq"] = m["CPI"] / _shift1(m["CPI"]) - 1
+    if "물가상승률" not in paths:
+        if "CPI_qoq" in m and "CPI_qoq" in history.columns:
+            m["물가상승률"] = m["CPI_qoq"]
+        elif "inflation_mom" in paths:
+            m["물가상승률"] = m["inflation_mom"] / 100
+
+    # add_inflation_shocks 정의
+    q = m["CPI_qoq"] if "CPI_qoq" in m and "CPI_qoq" in history.columns else m["물가상승률"]
+    mean, std = _rolling_prev(q, window)
+    m["infl_shock_ma"] = q - mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m["infl_shock_z"] = np.where(std == 0, np.nan, (q - mean) / std)
+    m["infl_accel"] = q - _shift1(q)
+    if "expected_inflation" in m:
+        e_mean, _ = _rolling_prev(m["expected_inflation"], window)
+        m["exp_shock_ma"] = m["expected_inflation"] - e_mean
+    for c in [c for c in SHOCK_COLS if c in m]:
+        m[f"{c}_lag1"] = _shift1(m[c])
+    return m
+
+
+def run_scenarios(
+    model,
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    paths: dict[str, np.ndarray],
+    score_quarter: tuple[int, int] | None = None,
+    transform=None,
+    window: int = 4,
+    chunk_size: int | None = None,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    model: feature_cols로 학습된 모델 (MLP 등은 transform=scaler.transform)
+    score_quarter: 기준 분기 (연도, 분기), 기본: 패널 마지막 분기. paths는 이 분기까지의 최근 H분기.
+    반환: {"pred": (S, D), "base": (D,) 기준 경로 예측, "codes": 행정동_코드 (D,)}
+    """
+    history = macro_history(df)
+    if score_quarter is not None:
+        keep = (history["연도"] * 4 + history["분기"]) <= score_quarter[0] * 4 + score_quarter[1]
+        history = history[keep].reset_index(drop=True)
+    y, q = history[["연도", "분기"]].iloc[-1]
+
+    rows = df[(df["연도"] == y) & (df["분기"] == q)]
+    macro_feats = [
+        c for c in feature_cols
+        if c in MACRO_COLS or c in SHOCK_COLS or c.removesuffix("_lag1") in SHOCK_COLS or c == "물가_x_lag1비중"
+    ]
+    dong_feats = [c for c in feature_cols if c not in macro_feats]
+    rows = rows.dropna(subset=dong_feats)
+    B = rows[feature_cols].to_numpy(dtype=float)
+    lag1 = rows["lag1_비중"].fillna(0).to_numpy(dtype=float) if "lag1_비중" in rows.columns else None
+
+    def _score(p: dict) -> np.ndarray:
+        m = scenario_macro(history, p, window)
+        S = next(iter(m.values())).shape[0]
+        X = np.repeat(B[None, :, :], S, axis=0)
+        for j, c in enumerate(feature_cols):
+            if c == "물가_x_lag1비중":
+                X[:, :, j] = np.nan_to_num(m["물가상승률"][:, -1])[:, None] * lag1[None, :]
+            elif c in macro_feats and c in m:
+                X[:, :, j] = m[c][:, -1][:, None]
+        pred = predict_chunked(model, X.reshape(-1, len(feature_cols)),
+                               chunk_size=chunk_size, n_jobs=n_jobs, transform=transform)
+        return pred.reshape(S, len(B))
+
+    return {
+        "pred": _score(paths),
+        "base": _score({})[0],
+        "codes": rows["행정동_코드"].to_numpy(),
+    }
+
+
+def scenario_table(result: dict, names: list | None = None) -> pd.DataFrame:
+    """run_scenarios 결과 → long 형식 (scenario, 행정동_코드, pred, diff = 기준 대비 차이)"""
+    S, D = result["pred"].shape
+    names = np.asarray(names if names is not None else np.arange(S))
+    return pd.DataFrame({
+        "scenario": np.repeat(names, D),
+        "행정동_코드": np.tile(result["codes"], S),
+        "pred": result["pred"].ravel(),
+        "diff": (result["pred"] - result["base"][None, :]).ravel(),
+    })
@@ -0,0 +1,215 @@
+"""
+하이퍼파라미터 탐색: successive halving (분기 expanding window fold)
+- rung 0: 모든 후보를 최근 min_resource개 fold(또는 트리 수)로 평가
+- 상위 1/eta만 다음 rung으로, 자원(fold 수 또는 트리 수)은 eta배
+- resource="folds": 최근 n개 fold는 rung 간 포함 관계 → 이전 rung 점수를 재사용, 새 fold만 학습
+- (후보 × fold) 작업을 프로세스 풀에서 실행. 워커는 X, y를 initializer로 한 번만 받고
+  fold 행렬(슬라이스, XGBoost는 양자화 행렬)을 워커 안에 캐시해 재사용
+"""
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.models.predict import predict_chunked
+
+# 탐색 공간 (그리드 → 후보 목록)
+SEARCH_SPACES = {
+    "DecisionTree": {"max_depth": [4, 6, 8, 10, 14, None], "min_samples_leaf": [1, 5, 20, 50]},
+    "RandomForest": {
+        "max_depth": [6, 10, 14, None],
+        "min_samples_leaf": [1, 5, 20],
+        "max_features": [1.0, 0.5, "sqrt"],
+    },
+    "XGBoost": {
+        "max_depth": [3, 4, 6, 8],
+        "learning_rate": [0.03, 0.1, 0.3],
+        "min_child_weight": [1, 5, 20],
+        "subsample": [0.8, 1.0],
+    },
+    "MLP": {
+        "hidden_layer_sizes": [(32,), (64, 32), (128, 64), (64, 32, 16)],
+        "alpha": [1e-4, 1e-3, 1e-2, 1e-1],
+        "learning_rate_init": [1e-3, 1e-2],
+    },
+}
+
+# 워커 전역 (initializer로 설정)
+_W: dict = {}
+
+
+def _grid(space: dict) -> list[dict]:
+    keys = list(space)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(space[k] for k in keys))]
+
+
+def _init_worker(X, y, key, feature_cols):
+    _W.clear()
+    _W.update({"X": X, "y": y, "key": key, "feature_cols": feature_cols, "slices": {}, "pm": None})
+
+
+def _fold_slices(period: int):
+    """분기 period를 test로 하는 fold의 (X_tr, y_tr, X_te, y_te) - 워커 캐시"""
+    if period not in _W["slices"]:
+        key = _W["key"]
+        tr, te = key < period, key == period
+        _W["slices"][period] = (_W["X"][tr], _W["y"][tr], _W["X"][te], _W["y"][te])
+    return _W["slices"][period]
+
+
+def _eval_job(job) -> tuple[int, int, float, int | None]:
+    """(후보 id, fold 위치) 1개 학습·평가 → test RMSE, 사용한 트리 수 (XGBoost: best_iteration + 1)"""
+    name, cfg_id, params, period_pos, n_trees = job
+    periods = np.unique(_W["key"])
+
+    if name == "XGBoost":
+        from src.models.xgb_model import build_panel_matrix, fit_fold
+
+        if _W["pm"] is None:
+            df = pd.DataFrame(_W["X"], columns=_W["feature_cols"]).assign(
+                target=_W["y"], 연도=_W["key"] // 4, 분기=_W["key"] % 4 + 1
+            )
+            _W["pm"] = build_panel_matrix(df, _W["feature_cols"], n_jobs=1)
+        rounds = n_trees or 1000
+        r = fit_fold(_W["pm"], (period_pos - 1, period_pos), params, num_boost_round=rounds)
+        return cfg_id, period_pos, r["RMSE"], r["best_iteration"] + 1
+
+    from src.models.train import build_estimator
+
+    if n_trees:
+        params = {**params, "n_estimators": n_trees}
+    if name == "RandomForest":
+        params = {**params, "n_jobs": 1}
+    model = build_estimator(name, params)
+    X_tr, y_tr, X_te, y_te = _fold_slices(periods[period_pos])
+    model.fit(X_tr, y_tr)
+    pred = predict_chunked(model, X_te, n_jobs=1)
+    return cfg_id, period_pos, float(np.sqrt(np.mean((y_te - pred) ** 2))), n_trees
+
+
+def successive_halving(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    name: str,
+    space: dict | None = None,
+    eta: int = 3,
+    resource: str = "folds",
+    min_resource: int = 1,
+    max_resource: int | None = None,
+    min_train: int = 4,
+    max_candidates: int | None = None,
+    target_col: str = "target",
+    random_state: int = 42,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    name: train.make_model 모델명 (DecisionTree, RandomForest, XGBoost, MLP)
+    resource: "folds" (rung마다 최근 fold 수 eta배) / "trees" (RF·XGB 트리 수 eta배, fold는 전체)
+    min_resource: rung 0 자원 (fold 수 또는 트리 수), max_resource: 상한 (기본: 전체 fold / 트리 1000)
+    max_candidates: 후보가 많을 때 무작위 추출 개수
+    반환: {"best_params", "best_RMSE", "history" (rung, config, params, resource, RMSE)}
+    resource="trees"의 n_estimators: RF는 마지막 rung 트리 수, XGBoost는 마지막 rung fold들의
+      early stopping best_iteration + 1 중앙값 (최종 학습은 early stopping 없이 이 트리 수로 fit)
+    """
+    from src.models.cv import period_key
+    from src.models.train import fit_dtype
+
+    candidates = _grid(space or SEARCH_SPACES[name])
+    if max_candidates and len(candidates) > max_candidates:
+        rng = np.random.default_rng(random_state)
+        candidates = [candidates[i] for i in sorted(rng.choice(len(candidates), max_candidates, replace=False))]
+
+    sub = df.dropna(subset=feature_cols + [target_col])
+    X = sub[feature_cols].to_numpy(dtype=fit_dtype(name))
+    y = sub[target_col].to_numpy(dtype=float)
+    key = period_key(sub, unit="quarter")
+    # test 분기 위치: min_train 이후 (XGBoost는 직전 분기를 early stopping에 쓰므로 +1)
+    n_periods = len(np.unique(key))
+    first = min_train + (1 if name == "XGBoost" else 0)
+    fold_pos = list(range(first, n_periods))
+    if resource == "folds":
+        max_resource = min(max_resource or len(fold_pos), len(fold_pos))
+    else:
+        max_resource = max_resource or 1000
+
+    alive = list(range(len(candidates)))
+    scores: dict[tuple[int, int, int | None], float] = {}
+    used_trees: dict[tuple[int, int, int | None], int | None] = {}
+    history = []
+    res = min_resource
+    n_workers = get_n_jobs(n_jobs)
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(X, y, key, feature_cols)
+    ) as ex:
+        rung = 0
+        while True:
+            res = min(res, max_resource)
+            if resource == "folds":
+                folds, n_trees = fold_pos[-res:], None
+            else:
+                folds, n_trees = fold_pos, res
+            jobs = [
+                (name, c, candidates[c], f, n_trees)
+                for c in alive
+                for f in folds
+                if (c, f, n_trees) not in scores
+            ]
+            for c, f, rmse, used in ex.map(_eval_job, jobs, chunksize=max(1, len(jobs) // (4 * n_workers))):
+                scores[(c, f, n_trees)] = rmse
+                used_trees[(c, f, n_trees)] = used
+
+            mean_rmse = {c: np.mean([scores[(c, f, n_trees)] for f in folds]) for c in alive}
+            for c in alive:
+                history.append({
+                    "rung": rung, "config": c, "params": candidates[c],
+                    "resource": res, "RMSE": mean_rmse[c],
+                })
+            alive = sorted(alive, key=mean_rmse.get)
+            if len(alive) == 1 or res >= max_resource:
+                break
+            alive = alive[:max(1, int(np.ceil(len(alive) / eta)))]
+            res *= eta
+            rung += 1
+
+    best = alive[0]
+    best_params = dict(candidates[best])
+    if resource == "trees":
+        best_params["n_estimators"] = int(np.median([used_trees[(best, f, n_trees)] for f in folds]))
+    return {
+        "best_params": best_params,
+        "best_RMSE": mean_rmse[best],
+        "history": pd.DataFrame(history),
+    }
+
+
+def search_all(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    models: tuple[str, ...] = ("DecisionTree", "RandomForest", "XGBoost", "MLP"),
+    **kwargs,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    여러 모델 탐색 → (train_and_evaluate(params=...)에 넘길 {모델명: best_params}, 요약표)
+    RF·XGB는 트리 수를 자원으로 사용
+    """
+    best, rows = {}, []
+    for name in models:
+        kw = dict(kwargs)
+        if name in ("RandomForest", "XGBoost"):
+            kw.setdefault("resource", "trees")
+            if kw["resource"] == "trees":
+                kw.setdefault("min_resource", 25 if name == "RandomForest" else 50)
+                kw.setdefault("max_resource", 200 if name == "RandomForest" else 1000)
+        r = successive_halving(df, feature_cols, name, **kw)
+        best[name] = r["best_params"]
+        rows.append({
+            "model": name,
+            "n_candidates": int((r["history"]["rung"] == 0).sum()),
+            "best_RMSE": r["best_RMSE"],
+            "best_params": r["best_params"],
+        })
+    return best, pd.DataFrame(rows)
@@ -0,0 +1,165 @@
+"""
+OOF(out-of-fold) 예측 캐시 + 스태킹 앙상블
+- 분기 expanding window fold마다 base 모델 OOF 예측을 저장
+  캐시 파일: {모델명}_{모델 fingerprint}.npz, 항목: fold 라벨 → 예측 배열
+  모델 fingerprint = (모델명, 정밀도, 파라미터, 피처, 데이터) → 새 모델 추가 시 그 모델의 CV만 실행
+- 메타 학습기(NNLS / Ridge)는 캐시된 OOF 행렬로만 학습 (base 모델 재학습 없음)
+- stacking_cv: 메타 학습기도 fold 순서대로 (이전 fold OOF로 학습 → 다음 fold 평가)
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.data.cache import CACHE_DIR, fingerprint
+from src.models.cv import expanding_folds
+from src.models.predict import predict_chunked
+
+OOF_DIR = CACHE_DIR / "oof"
+BASE_MODELS = ("LinearRegression", "DecisionTree", "RandomForest", "XGBoost", "MLP")
+
+
+def _fit_predict(name: str, params: dict | None, X_tr, y_tr, X_te) -> np.ndarray:
+    from src.models.train import build_estimator, single_thread_params
+
+    # fold는 스레드 풀에서 동시에 학습 → 모델 내부 병렬은 끔
+    model = build_estimator(name, single_thread_params(name, params))
+    model.fit(X_tr, y_tr)
+    return predict_chunked(model, X_te, n_jobs=1)
+
+
+def oof_predictions(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    name: str,
+    params: dict | None = None,
+    target_col: str = "target",
+    min_train: int = 4,
+    cache_dir: str | Path = OOF_DIR,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """
+    base 모델 1개의 분기 fold OOF 예측 (캐시에 없는 fold만 학습)
+    반환: df(결측 제거) 인덱스 기준 DataFrame [fold, pred] - 어떤 fold에도 test가 아닌 행은 제외
+    """
+    from src.models.train import DEFAULT_PARAMS, fit_dtype
+
+    sub = df.dropna(subset=feature_cols + [target_col])
+    X = sub[feature_cols].to_numpy(dtype=fit_dtype(name))
+    y = sub[target_col].to_numpy(dtype=float)
+    folds = expanding_folds(sub, unit="quarter", min_train=min_train)
+
+    model_fp = fingerprint(
+        name,
+        str(X.dtype),
+        {**DEFAULT_PARAMS.get(name, {}), **(params or {})},
+        feature_cols,
+        sub[feature_cols + [target_col, "연도", "분기"]],
+    )
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{name}_{model_fp}.npz"
+    cached = {}
+    if path.exists():
+        with np.load(path) as z:
+            cached = dict(z)
+
+    todo = [f for f in folds if f[2] not in cached]
+    if todo:
+        def _run(fold):
+            train_idx, test_idx, label = fold
+            return label, _fit_predict(name, params, X[train_idx], y[train_idx], X[test_idx])
+
+        with ThreadPoolExecutor(max_workers=get_n_jobs(n_jobs)) as ex:
+            cached.update(ex.map(_run, todo))
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        np.savez(path, **cached)
+
+    parts = [
+        pd.DataFrame({"fold": label, "pred": cached[label]}, index=sub.index[test_idx])
+        for _, test_idx, label in folds
+    ]
+    return pd.concat(parts)
+
+
+def oof_matrix(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    models: dict | tuple = BASE_MODELS,
+    target_col: str = "target",
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    models: 모델명 목록 또는 {모델명: 파라미터}
+    반환: 행 = OOF 행, 컬럼 = fold, target, 모델별 예측
+    """
+    if not isinstance(models, dict):
+        models = {m: None for m in models}
+    out = None
+    for name, params in models.items():
+        o = oof_predictions(df, feature_cols, name, params, target_col=target_col, **kwargs)
+        if out is None:
+            out = o[["fold"]].assign(target=df.loc[o.index, target_col])
+        out[name] = o["pred"]
+    return out
+
+
+def fit_stacker(P: np.ndarray, y: np.ndarray, method: str = "nnls", alpha: float = 1.0) -> dict:
+    """
+    메타 학습기
+    - nnls: 비음수 가중치, 절편 없음 (합 제약 없이 블렌딩)
+    - ridge: 절편 포함 L2 회귀 (가중치 부호 제약 없음)
+    """
+    if method == "nnls":
+        from scipy.optimize import nnls
+
+        w, _ = nnls(P, y)
+        return {"method": method, "weights": w, "intercept": 0.0}
+    if method == "ridge":
+        Pm, ym = P.mean(axis=0), y.mean()
+        Pc = P - Pm
+        w = np.linalg.solve(Pc.T @ Pc + alpha * np.eye(P.shape[1]), Pc.T @ (y - ym))
+        return {"method": method, "weights": w, "intercept": float(ym - Pm @ w)}
+    raise ValueError(f"method는 'nnls' 또는 'ridge': {method}")
+
+
+def predict_stacker(stacker: dict, P: np.ndarray) -> np.ndarray:
+    return P @ stacker["weights"] + stacker["intercept"]
+
+
+def stacking_cv(
+    oof: pd.DataFrame,
+    method: str = "nnls",
+    min_folds: int = 2,
+    alpha: float = 1.0,
+) -> dict:
+    """
+    OOF 행렬로 메타 학습기 평가: fold f는 f 이전 fold OOF로 메타 학습 후 예측
+    반환: {"table": fold별 RMSE (base 모델 + stack), "stacker": 전체 OOF로 학습한 최종 메타 학습기}
+    """
+    base = [c for c in oof.columns if c not in ("fold", "target")]
+    labels = list(dict.fromkeys(oof["fold"]))  # fold 순서 유지
+    P = oof[base].to_numpy(dtype=float)
+    y = oof["target"].to_numpy(dtype=float)
+    fold = oof["fold"].to_numpy()
+
+    rows = []
+    for i in range(min_folds, len(labels)):
+        tr = np.isin(fold, labels[:i])
+        te = fold == labels[i]
+        st = fit_stacker(P[tr], y[tr], method, alpha)
+        row = {"fold": labels[i]}
+        for j, name in enumerate(base):
+            row[name] = np.sqrt(np.mean((y[te] - P[te, j]) ** 2))
+        row["Stack"] = np.sqrt(np.mean((y[te] - predict_stacker(st, P[te])) ** 2))
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    if len(table):
+        table = pd.concat([table, table.drop(columns="fold").mean().to_frame().T.assign(fold="평균")])
+    stacker = fit_stacker(P, y, method, alpha)
+    stacker["models"] = base
+    return {"table": table.reset_index(drop=True), "stacker": stacker}
@@ -2,16 +2,15 @@
 ML 학습 파이프라인: LR, DT, RF, XGB, MLP 비교
 타겟: 다음 분기 디저트 비중 (현재 비중 제외, lag_비중만 사용)
 """
+import copy
+
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.neural_network import MLPRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+from src.config import get_dtype, get_mlp_mode, get_n_jobs, get_precision, precision
+from src.models.predict import predict_chunked
 
 # 타겟 유출 방지: 현재 디저트_비중 제외, lag_비중만 사용
 FEATURE_COLS_BASE = [
@@ -29,13 +28,85 @@ FEATURE_COLS_EXTRA = [
     "물가_x_lag1비중",
     "expected_inflation",  # 기대인플레이션율 (엑셀 전처리 시)
 ]  # CPI 있을 때 추가
+FEATURE_COLS_SPATIAL = [
+    "sp_lag1_비중",  # 이웃 행정동 lag1_비중 평균 (data.spatial.add_spatial_lags)
+    "sp_성장률",  # 이웃 행정동 성장률 평균
+]  # 인접 정보 있을 때 추가
+
+# permutation importance 블록: 같은 블록 피처는 함께 섞음 (상관된 피처끼리 서로 대체되는 효과 제거)
+FEATURE_GROUPS = {
+    "물가": FEATURE_COLS_EXTRA,
+    "lag_매출": ["lag1", "lag4"],
+    "lag_비중": ["lag1_비중", "lag4_비중"],
+    "계절성": ["month_sin", "month_cos"],
+    "공간": FEATURE_COLS_SPATIAL,
+}
+
+
+# 모델별 기본 하이퍼파라미터 (search.successive_halving 결과로 덮어쓸 수 있음)
+DEFAULT_PARAMS = {
+    "LinearRegression": {},
+    "DecisionTree": {"max_depth": 10, "random_state": 42},
+    "RandomForest": {"n_estimators": 100, "max_depth": 10, "random_state": 42},
+    "XGBoost": {"n_estimators": 100, "max_depth": 6, "random_state": 42},
+    "MLP": {"hidden_layer_sizes": (64, 32), "activation": "relu", "max_iter": 500, "random_state": 42},
+}
+
+
+# 입력 스케일링이 필요한 모델 (fold 학습 시 StandardScaler 파이프라인으로 감쌈)
+SCALED_MODELS = {"MLP"}
+
+# 자체 스레드 병렬(n_jobs)을 쓰는 모델 - 스레드/프로세스 풀 워커 안에서는 1로 고정
+THREADED_MODELS = {"RandomForest", "XGBoost"}
+
+
+def make_model(name: str, params: dict | None = None):
+    """모델 이름 + 파라미터(DEFAULT_PARAMS 위에 덮어씀) → 미학습 estimator"""
+    kw = {**DEFAULT_PARAMS.get(name, {}), **(params or {})}
+    if name == "LinearRegression":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**kw)
+    if name == "DecisionTree":
+        from sklearn.tree import DecisionTreeRegressor
+        return DecisionTreeRegressor(**kw)
+    if name == "RandomForest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(**kw)
+    if name == "XGBoost":
+        import xgboost as xgb
+        return xgb.XGBRegressor(**{"n_jobs": get_n_jobs(), **kw})
+    if name == "MLP":
+        from sklearn.neural_network import MLPRegressor
+        return MLPRegressor(**kw)
+    raise ValueError(f"알 수 없는 모델: {name}")
+
+
+def build_estimator(name: str, params: dict | None = None):
+    """make_model + 스케일링 필요 모델(SCALED_MODELS)은 StandardScaler 파이프라인으로 감싼 estimator"""
+    model = make_model(name, params)
+    if name in SCALED_MODELS:
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        model = make_pipeline(StandardScaler(), model)
+    return model
+
+
+def single_thread_params(name: str, params: dict | None = None) -> dict | None:
+    """풀 워커 안에서 학습할 모델의 params: 내부 병렬을 n_jobs=1로 (워커 수 × 모델 스레드 과다 구독 방지)"""
+    return {**(params or {}), "n_jobs": 1} if name in THREADED_MODELS else params
+
+
+def fit_dtype(name: str) -> np.dtype:
+    """모델별 학습 입력 dtype: 선형회귀(최소제곱 해)는 항상 float64, 나머지는 설정 정밀도"""
+    return np.dtype("float64") if name == "LinearRegression" else get_dtype()
 
 
 def get_feature_cols(df: pd.DataFrame) -> list[str]:
     """사용 가능한 피처만 반환"""
     base = [c for c in FEATURE_COLS_BASE if c in df.columns]
     extra = [c for c in FEATURE_COLS_EXTRA if c in df.columns]
-    return base + extra
+    spatial = [c for c in FEATURE_COLS_SPATIAL if c in df.columns]
+    return base + extra + spatial
 
 
 def prepare_xy(
@@ -44,16 +115,17 @@ def prepare_xy(
     feature_cols: list[str] | None = None,
     scale: bool = False,
 ):
-    """X, y 준비 (결측 제거)"""
+    """X, y 준비 (결측 제거, X는 설정 정밀도 dtype)"""
     if feature_cols is None:
         feature_cols = get_feature_cols(df)
     cols = [c for c in feature_cols if c in df.columns]
     sub = df[cols + [target_col]].dropna()
 
-    X = sub[cols]
+    X = sub[cols].astype(get_dtype())
     y = sub[target_col]
 
     if scale:
+        from sklearn.preprocessing import StandardScaler
         scaler = StandardScaler()
         X = pd.DataFrame(scaler.fit_transform(X), columns=cols, index=X.index)
         return X, y, scaler
@@ -64,8 +136,18 @@ def train_and_evaluate(
     train_df: pd.DataFrame,
     test_df: pd.DataFrame,
     feature_cols: list[str] | None = None,
+    mlp_mode: str | None = None,
+    params: dict | None = None,
 ) -> dict:
-    """LinearRegression, DecisionTree, RandomForest, XGBoost, MLP 학습 및 평가"""
+    """
+    LinearRegression, DecisionTree, RandomForest, XGBoost, MLP 학습 및 평가
+    mlp_mode: "full" (전체 행렬 fit) / "stream" (feature store 미니배치 partial_fit, 마지막 분기 early stopping)
+      None이면 ML_MLP_MODE 환경변수 (기본 full)
+    params: {모델명: 하이퍼파라미터} - DEFAULT_PARAMS 덮어쓰기 (예: successive_halving의 best_params)
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    params = params or {}
     feature_cols = feature_cols or get_feature_cols(train_df)
 
     X_train, y_train, _ = prepare_xy(train_df, feature_cols=feature_cols)
@@ -74,47 +156,66 @@ def train_and_evaluate(
     # NN용 스케일링
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
 
     results = {}
 
     # 1. Linear Regression (해석용)
-    lr = LinearRegression()
-    lr.fit(X_train, y_train)
-    y_pred = lr.predict(X_test)
+    lr = make_model("LinearRegression", params.get("LinearRegression"))
+    lr.fit(X_train.astype(fit_dtype("LinearRegression")), y_train)
+    y_pred = predict_chunked(lr, X_test.astype(fit_dtype("LinearRegression")))
     results["LinearRegression"] = _eval(y_test, y_pred, lr)
 
     # 2. Decision Tree (불순도 설명)
-    dt = DecisionTreeRegressor(max_depth=10, random_state=42)
+    dt = make_model("DecisionTree", params.get("DecisionTree"))
     dt.fit(X_train, y_train)
-    results["DecisionTree"] = _eval(y_test, dt.predict(X_test), dt)
+    results["DecisionTree"] = _eval(y_test, predict_chunked(dt, X_test), dt)
 
     # 3. Random Forest (Bagging)
-    rf = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42)
+    rf = make_model("RandomForest", params.get("RandomForest"))
     rf.fit(X_train, y_train)
-    results["RandomForest"] = _eval(y_test, rf.predict(X_test), rf)
+    results["RandomForest"] = _eval(y_test, predict_chunked(rf, X_test), rf)
 
     # 4. XGBoost (Boosting)
     try:
-        import xgboost as xgb
-        xgb_m = xgb.XGBRegressor(n_estimators=100, max_depth=6, random_state=42)
+        xgb_m = make_model("XGBoost", params.get("XGBoost"))
         xgb_m.fit(X_train, y_train)
-        results["XGBoost"] = _eval(y_test, xgb_m.predict(X_test), xgb_m)
+        results["XGBoost"] = _eval(y_test, predict_chunked(xgb_m, X_test), xgb_m)
     except Exception as e:
         print(f"  (XGBoost 스킵: {e})")
         results["XGBoost"] = None
 
     # 5. MLP (Shallow NN, 스케일링 필요)
-    mlp = MLPRegressor(hidden_layer_sizes=(64, 32), activation="relu", max_iter=500, random_state=42)
-    mlp.fit(X_train_scaled, y_train)
-    results["MLP"] = _eval(y_test, mlp.predict(X_test_scaled), mlp)
+    if get_mlp_mode(mlp_mode) == "stream":
+        from src.data.feature_store import FEATURE_DIR, write_feature_store
+        from src.models.mlp_stream import train_mlp_streaming
+
+        # 입력이 같으면 기존 store 재사용 (write_feature_store가 fingerprint 비교)
+        store = write_feature_store(train_df, list(X_train.columns), FEATURE_DIR / "train")
+        fit = train_mlp_streaming(store)
+        mlp, scaler = fit["model"], fit["scaler"]
+        print(f"  MLP(stream): best epoch {fit['best_epoch']}, val RMSE {fit['val_RMSE']:.4f}, "
+              f"epoch당 {fit['history']['seconds'].mean():.2f}s")
+        results["MLP"] = _eval(y_test, predict_chunked(mlp, X_test.to_numpy(), transform=scaler.transform), mlp)
+        results["MLP"]["history"] = fit["history"]
+    else:
+        mlp = make_model("MLP", params.get("MLP"))
+        mlp.fit(X_train_scaled, y_train)
+        results["MLP"] = _eval(y_test, predict_chunked(mlp, X_test, transform=scaler.transform), mlp)
+    results["MLP"]["scaler"] = scaler  # 재예측(permutation importance 등) 시 입력 변환
 
+    results["X_test"] = X_test
     results["y_test"] = y_test
     results["feature_cols"] = feature_cols
     return results
 
 
+# results 중 모델이 아닌 항목
+_META_KEYS = ("X_test", "y_test", "feature_cols")
+
+
 def _eval(y_true, y_pred, model) -> dict:
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
     return {
         "RMSE": np.sqrt(mean_squared_error(y_true, y_pred)),
         "MAE": mean_absolute_error(y_true, y_pred),
@@ -131,6 +232,9 @@ def time_series_cv(
     n_splits: int = 2,
 ) -> pd.DataFrame:
     """TimeSeriesSplit 기반 교차검증"""
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import TimeSeriesSplit
+
     tscv = TimeSeriesSplit(n_splits=n_splits)
     df = df.sort_values(["연도", "분기"]).dropna(subset=feature_cols + ["target"])
     years = sorted(df["연도"].unique())
@@ -146,11 +250,51 @@ def time_series_cv(
         X_test, y_test, _ = prepare_xy(test, feature_cols=feature_cols)
         model = model_fn()
         model.fit(X_train, y_train)
-        pred = model.predict(X_test)
+        pred = predict_chunked(model, X_test)
         folds.append({"test_year": test_year, "RMSE": np.sqrt(mean_squared_error(y_test, pred)), "R2": r2_score(y_test, pred)})
     return pd.DataFrame(folds)
 
 
+def compare_precision(
+    train_df: pd.DataFrame,
+    test_df: pd.DataFrame,
+    feature_cols: list[str] | None = None,
+    rtol: float = 0.01,
+    params: dict | None = None,
+    mlp_mode: str | None = None,
+    results: dict | None = None,
+) -> pd.DataFrame:
+    """
+    float64 vs float32 학습 결과 비교 (모델별 RMSE·R2)
+    params, mlp_mode: train_and_evaluate와 동일 (파이프라인에서 학습한 설정 그대로 비교)
+    results: 현재 정밀도(get_precision)로 이미 학습한 train_and_evaluate 결과 → 다른 정밀도만 재학습
+    RMSE 상대차이가 rtol 이내면 허용범위=True
+    """
+    runs = {}
+    if results is not None:
+        runs[get_precision()] = results
+    for p in ("float64", "float32"):
+        if p not in runs:
+            with precision(p):
+                runs[p] = train_and_evaluate(
+                    train_df, test_df, feature_cols=feature_cols, mlp_mode=mlp_mode, params=params
+                )
+
+    rows = {}
+    for p in ("float64", "float32"):
+        for name, v in runs[p].items():
+            if name in _META_KEYS or v is None:
+                continue
+            rows.setdefault(name, {"model": name})
+            rows[name][f"RMSE_{p}"] = v["RMSE"]
+            rows[name][f"R2_{p}"] = v["R2"]
+
+    out = pd.DataFrame(list(rows.values()))
+    out["RMSE_상대차이"] = (out["RMSE_float32"] - out["RMSE_float64"]).abs() / out["RMSE_float64"]
+    out["허용범위"] = out["RMSE_상대차이"] <= rtol
+    return out
+
+
 def print_performance_table(results: dict) -> None:
     """성능표 출력"""
     print("\n" + "=" * 55)
@@ -158,7 +302,7 @@ def print_performance_table(results: dict) -> None:
     print("=" * 55)
     rows = []
     for name, v in results.items():
-        if name in ("y_test", "feature_cols") or v is None:
+        if name in _META_KEYS or v is None:
             continue
         rows.append([name, f"{v['RMSE']:.4f}", f"{v['MAE']:.4f}", f"{v['R2']:.4f}"])
     print(pd.DataFrame(rows, columns=["모델", "RMSE", "MAE", "R2"]).to_string(index=False))
@@ -183,3 +327,89 @@ def get_feature_importance(results: dict) -> pd.DataFrame:
     for d in imp[1:]:
         out = out.merge(d, on="feature")
     return out
+
+
+def _feature_blocks(cols: list[str], groups: dict | None) -> dict[str, list[int]]:
+    """그룹 정의 → {블록명: 컬럼 위치}. 그룹에 없는 피처는 단독 블록."""
+    groups = FEATURE_GROUPS if groups is None else groups
+    blocks, used = {}, set()
+    for name, members in groups.items():
+        idx = [cols.index(c) for c in members if c in cols]
+        if idx:
+            blocks[name] = idx
+            used.update(idx)
+    for i, c in enumerate(cols):
+        if i not in used:
+            blocks[c] = [i]
+    return blocks
+
+
+def permutation_importance_all(
+    results: dict,
+    groups: dict | None = None,
+    n_repeats: int = 10,
+    random_state: int = 42,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """
+    results의 모든 모델(LR, DT, RF, XGB, MLP)에 대한 블록 permutation importance.
+    - 기준 예측은 학습 시 저장된 y_pred 재사용 (재예측 없음)
+    - 블록(groups, 기본 FEATURE_GROUPS) 단위로 행을 함께 섞음
+    - (블록 × 반복) 순열은 모든 모델이 공유 → 모델 간 비교 시 잡음 감소
+    - (모델 × 블록 × 반복) 작업을 스레드 풀로 분산 (predict 커널은 GIL 해제)
+      RF·XGB는 n_jobs=1 복사본으로 채점 (results의 모델은 그대로)
+    importance = 섞은 뒤 RMSE − 기준 RMSE
+    반환: model, feature, importance_mean, importance_std, ci_low, ci_high (95%)
+    """
+    from sklearn.metrics import mean_squared_error
+
+    cols = results["feature_cols"]
+    X = results["X_test"][cols].to_numpy(dtype=float)
+    y = np.asarray(results["y_test"], dtype=float)
+    blocks = _feature_blocks(cols, groups)
+
+    models = {
+        name: v for name, v in results.items()
+        if name not in _META_KEYS and v is not None and "model" in v
+    }
+    base_rmse = {name: np.sqrt(mean_squared_error(y, v["y_pred"])) for name, v in models.items()}
+    # 자체 병렬 예측 모델(RF, XGB)은 복사본을 n_jobs=1로 고정해 채점 (풀 스레드 × 모델 스레드 과다 구독 방지)
+    scoring_models = {}
+    for name, v in models.items():
+        model = v["model"]
+        if getattr(model, "n_jobs", None) not in (None, 1):
+            model = copy.deepcopy(model).set_params(n_jobs=1)
+        scoring_models[name] = model
+
+    seeds = np.random.SeedSequence(random_state).spawn(len(blocks) * n_repeats)
+    perms = {
+        (b, r): np.random.default_rng(seeds[i * n_repeats + r]).permutation(len(X))
+        for i, b in enumerate(blocks)
+        for r in range(n_repeats)
+    }
+
+    def _score(job):
+        name, block, r = job
+        Xp = X.copy()
+        idx = blocks[block]
+        Xp[:, idx] = X[perms[(block, r)]][:, idx]
+        entry = models[name]
+        Xp_df = pd.DataFrame(Xp, columns=cols)
+        transform = entry["scaler"].transform if entry.get("scaler") is not None else None
+        model = scoring_models[name]
+        if transform is not None or hasattr(model, "feature_names_in_"):
+            Xp = Xp_df
+        # 작업 자체가 스레드 풀에서 실행되므로 청크는 순차 (n_jobs=1)
+        pred = predict_chunked(model, Xp, n_jobs=1, transform=transform)
+        return name, block, np.sqrt(mean_squared_error(y, pred)) - base_rmse[name]
+
+    jobs = [(name, b, r) for name in models for b in blocks for r in range(n_repeats)]
+    with ThreadPoolExecutor(max_workers=get_n_jobs(n_jobs)) as ex:
+        scores = pd.DataFrame(list(ex.map(_score, jobs)), columns=["model", "feature", "importance"])
+
+    out = scores.groupby(["model", "feature"], sort=False)["importance"].agg(["mean", "std"]).reset_index()
+    out.columns = ["model", "feature", "importance_mean", "importance_std"]
+    half = 1.96 * out["importance_std"] / np.sqrt(n_repeats)
+    out["ci_low"] = out["importance_mean"] - half
+    out["ci_high"] = out["importance_mean"] + half
+    return out
@@ -0,0 +1,225 @@
+"""
+트리 앙상블(DT/RF/XGB) → 배열 패킹 + 순수 NumPy 예측기
+- 노드별 feature / threshold / left / default_left / value 를 모든 트리에 걸쳐 이어붙인 배열
+  (BFS 재번호로 right = left + 1 → right 배열 불필요)
+- 여러 모델을 npz 1개 파일로 저장 (키: "{모델명}/{배열명}"), 로드는 수 ms
+- predict_packed: 모든 트리를 깊이 단위로 동시에 내려가는 벡터화 순회 (행은 chunk 단위)
+
+분기 규칙: sklearn은 x <= threshold → left, xgboost는 x < split → left.
+입력은 두 라이브러리와 동일하게 float32로 변환, threshold도 비교 결과가 같도록 float32로 저장
+→ 원 모델과 같은 leaf 도달 (메모리 대역폭 절반).
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_ARRAYS = ("feature", "threshold", "left", "default_left", "value", "roots")
+_META = ("less_than", "aggregate", "base_score", "max_depth", "feature_names")
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    """단일 트리 최대 깊이 (leaf: left == -1)"""
+    depth, frontier = 0, np.array([0])
+    while True:
+        frontier = frontier[left[frontier] >= 0]
+        if len(frontier) == 0:
+            return depth
+        frontier = np.concatenate([left[frontier], right[frontier]])
+        depth += 1
+
+
+def _relabel(t: dict) -> dict:
+    """
+    BFS 순서로 노드 재번호: 내부 노드의 right = left + 1 이 되도록 형제를 인접 배치.
+    leaf는 자기 자신을 left로 가리킴 (내부 노드의 left는 항상 뒤 번호 → left == 자신이면 leaf).
+    → 예측 루프는 leaf면 제자리, 아니면 left + (오른쪽 여부). right 배열 조회 불필요
+    """
+    left, right = t["left"], t["right"]
+    order = [0]
+    for node in order:
+        if left[node] >= 0:
+            order.extend((left[node], right[node]))
+    order = np.array(order)
+    new_id = np.empty(len(left), dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+
+    leaf = left[order] < 0
+    return {
+        "feature": np.where(leaf, 0, t["feature"][order]),
+        "threshold": np.where(leaf, np.inf, t["threshold"][order]),
+        "left": np.where(leaf, np.arange(len(order)), new_id[np.where(leaf, 0, left[order])]),
+        "default_left": np.where(leaf, True, t["default_left"][order]),
+        "value": np.where(leaf, t["value"][order], 0.0),
+        "depth": _tree_depth(left, right),
+    }
+
+
+def _float32_threshold(thr: np.ndarray, less_than: bool) -> np.ndarray:
+    """
+    float64 threshold → float32 (입력 x도 float32이므로 비교 결과 보존).
+    sklearn (x <= thr): thr 이하 최대 float32로 내림 → x <= thr ⇔ x <= t32
+    xgboost (x < thr): 분기값 자체가 float32 → 그대로
+    """
+    t32 = thr.astype(np.float32)
+    if not less_than:
+        over = t32.astype(np.float64) > thr
+        t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+def _concat(trees: list[dict], **meta) -> dict:
+    """트리별 로컬 인덱스 → 전역 인덱스로 이어붙이기"""
+    trees = [_relabel(t) for t in trees]
+    offsets = np.cumsum([0] + [len(t["feature"]) for t in trees[:-1]])
+    packed = {
+        "feature": np.concatenate([t["feature"] for t in trees]).astype(np.int32),
+        "threshold": _float32_threshold(np.concatenate([t["threshold"] for t in trees]), meta["less_than"]),
+        "left": np.concatenate([t["left"] + o for t, o in zip(trees, offsets)]).astype(np.int32),
+        "default_left": np.concatenate([t["default_left"] for t in trees]).astype(bool),
+        "value": np.concatenate([t["value"] for t in trees]).astype(np.float64),
+        "roots": offsets.astype(np.int32),
+        "max_depth": max(t["depth"] for t in trees),
+    }
+    packed.update(meta)
+    return packed
+
+
+def _sklearn_tree(tree) -> dict:
+    t = tree.tree_
+    leaf = t.children_left < 0
+    missing_left = getattr(t, "missing_go_to_left", np.ones(t.node_count, dtype=bool))
+    return {
+        "feature": np.where(leaf, -1, t.feature),
+        "threshold": t.threshold,
+        "left": t.children_left,
+        "right": t.children_right,
+        "default_left": missing_left,
+        "value": t.value[:, 0, 0],
+    }
+
+
+def _xgb_trees(booster) -> tuple[list[dict], float]:
+    model = json.loads(booster.save_raw(raw_format="json"))
+    learner = model["learner"]
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    trees = []
+    for t in learner["gradient_booster"]["model"]["trees"]:
+        left = np.array(t["left_children"], dtype=np.int64)
+        # split_conditions: 내부 노드는 분기값, leaf는 출력값 (float32)
+        cond = np.array(t["split_conditions"], dtype=np.float32).astype(np.float64)
+        leaf = left < 0
+        trees.append({
+            "feature": np.where(leaf, -1, np.array(t["split_indices"])),
+            "threshold": np.where(leaf, 0.0, cond),
+            "left": left,
+            "right": np.array(t["right_children"], dtype=np.int64),
+            "default_left": np.array(t["default_left"], dtype=bool),
+            "value": np.where(leaf, cond, 0.0),
+        })
+    return trees, base_score
+
+
+def pack_tree_model(model, feature_names: list[str] | None = None) -> dict:
+    """
+    DecisionTree / RandomForest (sklearn) 또는 XGBRegressor → 패킹 dict.
+    aggregate: "mean" (RF, DT) / "sum" (XGB, + base_score)
+    """
+    if feature_names is None:
+        names = getattr(model, "feature_names_in_", None)
+        feature_names = list(names) if names is not None else []
+
+    if hasattr(model, "get_booster"):
+        trees, base_score = _xgb_trees(model.get_booster())
+        return _concat(trees, less_than=True, aggregate="sum", base_score=base_score, feature_names=feature_names)
+    if hasattr(model, "estimators_"):
+        trees = [_sklearn_tree(est) for est in model.estimators_]
+    elif hasattr(model, "tree_"):
+        trees = [_sklearn_tree(model)]
+    else:
+        raise TypeError(f"트리 모델이 아닙니다: {type(model).__name__}")
+    return _concat(trees, less_than=False, aggregate="mean", base_score=0.0, feature_names=feature_names)
+
+
+def export_tree_models(
+    results: dict,
+    path: str | Path,
+    keys: tuple[str, ...] = ("DecisionTree", "RandomForest", "XGBoost"),
+) -> dict:
+    """train_and_evaluate 결과의 트리 모델들을 npz 1개로 저장. 반환: {모델명: 패킹 dict}"""
+    cols = results.get("feature_cols")
+    packed = {
+        k: pack_tree_model(results[k]["model"], feature_names=cols)
+        for k in keys
+        if results.get(k) is not None
+    }
+    save_packed(packed, path)
+    return packed
+
+
+def save_packed(packed: dict, path: str | Path) -> None:
+    """{모델명: 패킹 dict} → 단일 npz (비압축: 로드 속도 우선)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {}
+    for name, p in packed.items():
+        for k in _ARRAYS:
+            arrays[f"{name}/{k}"] = p[k]
+        meta = {k: p[k] for k in _META}
+        arrays[f"{name}/meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode(), dtype=np.uint8)
+    np.savez(path, **arrays)
+
+
+def load_packed(path: str | Path) -> dict:
+    """save_packed 파일 로드 → {모델명: 패킹 dict}"""
+    out = {}
+    with np.load(path) as z:
+        names = {k.split("/")[0] for k in z.files}
+        for name in names:
+            p = {k: z[f"{name}/{k}"] for k in _ARRAYS}
+            p.update(json.loads(z[f"{name}/meta"].tobytes().decode()))
+            out[name] = p
+    return out
+
+
+def predict_packed(packed: dict, X, chunk_size: int = 8192) -> np.ndarray:
+    """
+    패킹된 트리 앙상블 예측.
+    행 chunk마다 (행 × 트리) 노드 인덱스 행렬을 max_depth번 갱신: node = left[node] + (오른쪽 여부)
+    leaf에 도달한 행은 비교 결과와 무관하게 제자리 (xgboost x < thr에서 x=+inf도 leaf 유지)
+    → leaf 값 집계 (RF/DT 평균, XGB 합 + base_score)
+    """
+    if isinstance(X, pd.DataFrame):
+        X = X[packed["feature_names"]] if packed["feature_names"] else X
+        X = X.to_numpy()
+    X = np.asarray(X, dtype=np.float32)
+    n_features = X.shape[1]
+
+    feature = packed["feature"].astype(np.intp)
+    left = packed["left"].astype(np.intp)
+    is_leaf = left == np.arange(len(left))
+    threshold, default_left, value = packed["threshold"], packed["default_left"], packed["value"]
+    roots = packed["roots"].astype(np.intp)
+
+    out = np.empty(len(X), dtype=np.float64)
+    for start in range(0, len(X), chunk_size):
+        Xc = X[start:start + chunk_size]
+        has_nan = np.isnan(Xc).any()
+        flat = Xc.ravel()
+        row_base = (np.arange(len(Xc)) * n_features)[:, None]
+        node = np.broadcast_to(roots, (len(Xc), len(roots))).copy()
+        for _ in range(packed["max_depth"]):
+            x = flat.take(row_base + feature.take(node))
+            thr = threshold.take(node)
+            go_right = ~(x < thr) if packed["less_than"] else ~(x <= thr)
+            if has_nan:
+                missing = np.isnan(x)
+                go_right[missing] = ~default_left.take(node[missing])
+            node = np.where(is_leaf.take(node), node, left.take(node) + go_right)
+        leaf_vals = value.take(node)
+        agg = leaf_vals.sum(axis=1) if packed["aggregate"] == "sum" else leaf_vals.mean(axis=1)
+        out[start:start + chunk_size] = agg + packed["base_score"]
+    return out
@@ -0,0 +1,133 @@
+"""
+XGBoost 시계열 fold 학습 (분기 expanding window + early stopping)
+- 패널 전체로 QuantileDMatrix(히스토그램 분위 cut)를 한 번만 만들고 ref로 공유
+  → fold별 행렬은 ref의 cut을 재사용 (fold마다 재양자화 없음)
+- fold k: train = k 이전 분기 전체, valid = k분기 (early stopping), test = k+1분기
+- fold 행렬은 패널 dict 내부에 캐시 → 하이퍼파라미터 trial 간 재사용
+- nthread = 파이프라인 코어 예산 (get_n_jobs)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_n_jobs
+from src.models.cv import period_key, period_label
+
+DEFAULT_XGB_PARAMS = {
+    "objective": "reg:squarederror",
+    "tree_method": "hist",
+    "max_depth": 6,
+    "learning_rate": 0.1,
+    "seed": 42,
+}
+
+
+def build_panel_matrix(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    target_col: str = "target",
+    max_bin: int = 256,
+    n_jobs: int | None = None,
+) -> dict:
+    """
+    패널 전체 → 기준 QuantileDMatrix (ref) + fold 구성용 배열
+    반환 dict: X, y, key(분기 키), periods, ref, feature_cols, max_bin, nthread, cache
+    """
+    import xgboost as xgb
+
+    sub = df.dropna(subset=feature_cols + [target_col])
+    X = sub[feature_cols].to_numpy(dtype=np.float32)
+    y = sub[target_col].to_numpy(dtype=np.float32)
+    nthread = get_n_jobs(n_jobs)
+    ref = xgb.QuantileDMatrix(X, y, max_bin=max_bin, nthread=nthread, feature_names=feature_cols)
+    key = period_key(sub, unit="quarter")
+    return {
+        "X": X,
+        "y": y,
+        "key": key,
+        "periods": np.unique(key),
+        "ref": ref,
+        "feature_cols": feature_cols,
+        "max_bin": max_bin,
+        "nthread": nthread,
+        "cache": {},
+    }
+
+
+def _fold_matrix(pm: dict, name: tuple, idx: np.ndarray, ref=None):
+    """ref(기본: 패널 행렬)의 분위 cut을 공유하는 부분 행렬 (name 기준 캐시)"""
+    import xgboost as xgb
+
+    if name not in pm["cache"]:
+        pm["cache"][name] = xgb.QuantileDMatrix(
+            pm["X"][idx], pm["y"][idx], ref=pm["ref"] if ref is None else ref,
+            max_bin=pm["max_bin"], nthread=pm["nthread"], feature_names=pm["feature_cols"],
+        )
+    return pm["cache"][name]
+
+
+def quarter_folds(pm: dict, min_train: int = 4, last_n: int | None = None) -> list[tuple[int, int]]:
+    """
+    (valid 분기 위치 i, test 분기 위치 i+1) 목록
+    min_train: 첫 fold의 최소 train 분기 수, last_n: 최근 n개 fold만
+    """
+    folds = [(i, i + 1) for i in range(min_train, len(pm["periods"]) - 1)]
+    return folds[-last_n:] if last_n else folds
+
+
+def fit_fold(
+    pm: dict,
+    fold: tuple[int, int],
+    params: dict | None = None,
+    num_boost_round: int = 1000,
+    early_stopping_rounds: int = 50,
+) -> dict:
+    """fold 1개 학습 (valid 분기 early stopping) → test 분기 성능"""
+    import xgboost as xgb
+
+    i_val, i_test = fold
+    p = pm["periods"]
+    key = pm["key"]
+    train_idx = np.flatnonzero(key < p[i_val])
+    test_idx = np.flatnonzero(key == p[i_test])
+    dtrain = _fold_matrix(pm, ("train", i_val), train_idx)
+    # xgboost는 eval 행렬이 train 행렬을 ref로 갖도록 요구 (cut은 패널 ref와 동일)
+    dvalid = _fold_matrix(pm, ("valid", i_val), np.flatnonzero(key == p[i_val]), ref=dtrain)
+
+    booster = xgb.train(
+        {**DEFAULT_XGB_PARAMS, **(params or {}), "nthread": pm["nthread"]},
+        dtrain,
+        num_boost_round=num_boost_round,
+        evals=[(dvalid, "valid")],
+        early_stopping_rounds=early_stopping_rounds,
+        verbose_eval=False,
+    )
+    pred = booster.inplace_predict(pm["X"][test_idx], iteration_range=(0, booster.best_iteration + 1))
+    y = pm["y"][test_idx]
+    return {
+        "fold": period_label(p[i_test], "quarter"),
+        "n_train": len(train_idx),
+        "best_iteration": booster.best_iteration,
+        "valid_RMSE": booster.best_score,
+        "RMSE": float(np.sqrt(np.mean((y - pred) ** 2))),
+        "R2": float(1 - ((y - pred) ** 2).sum() / ((y - y.mean()) ** 2).sum()),
+        "booster": booster,
+    }
+
+
+def xgb_fold_cv(
+    pm: dict,
+    params: dict | None = None,
+    min_train: int = 4,
+    last_n: int | None = None,
+    num_boost_round: int = 1000,
+    early_stopping_rounds: int = 50,
+) -> pd.DataFrame:
+    """분기 expanding window CV: fold별 best_iteration, valid/test RMSE, R2"""
+    rows = []
+    for fold in quarter_folds(pm, min_train=min_train, last_n=last_n):
+        r = fit_fold(pm, fold, params, num_boost_round, early_stopping_rounds)
+        r.pop("booster")
+        rows.append(r)
+    return pd.DataFrame(rows)
@@ -0,0 +1,80 @@
+"""
+tree_export.predict_packed ↔ model.predict 일치 검증 (DT, RF, XGB)
+- 정상 입력, NaN, ±inf 입력 포함
+- sklearn은 inf 입력을 거부 → 기대값은 ±inf를 float32 최대값으로 바꿔 예측 (모든 threshold가 유한하므로 분기 동일)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.tree_export import load_packed, pack_tree_model, predict_packed, save_packed
+
+
+def _data(n: int = 2000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = 2 * X[:, 0] + np.sin(X[:, 1]) + 0.5 * X[:, 2] * X[:, 3] + rng.normal(scale=0.1, size=n)
+    X[rng.random(n) < 0.05, 4] = np.nan  # 학습 단계 결측 → 결측 분기 방향 학습
+    return X, y
+
+
+def _special_inputs(X: np.ndarray) -> np.ndarray:
+    """정상 행 + 컬럼별 NaN / +inf / -inf 행"""
+    base = X[:100]
+    blocks = [base]
+    for j in range(X.shape[1]):
+        for v in (np.nan, np.inf, -np.inf):
+            b = base.copy()
+            b[:, j] = v
+            blocks.append(b)
+    return np.vstack(blocks)
+
+
+def _sklearn_safe(X: np.ndarray) -> np.ndarray:
+    big = np.finfo(np.float32).max
+    return np.where(np.isposinf(X), big, np.where(np.isneginf(X), -big, X))
+
+
+def _models():
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    models = [
+        pytest.param("DecisionTree", DecisionTreeRegressor(max_depth=8, random_state=42), id="DecisionTree"),
+        pytest.param(
+            "RandomForest", RandomForestRegressor(n_estimators=20, max_depth=8, random_state=42), id="RandomForest"
+        ),
+    ]
+    try:
+        import xgboost as xgb
+    except ImportError:
+        return models
+    models.append(pytest.param(
+        "XGBoost", xgb.XGBRegressor(n_estimators=50, max_depth=5, random_state=42, n_jobs=1), id="XGBoost"
+    ))
+    return models
+
+
+@pytest.mark.parametrize("name,model", _models())
+def test_predict_packed_matches_model(name, model, tmp_path):
+    X, y = _data()
+    model.fit(X, y)
+    X_eval = _special_inputs(X)
+
+    if name == "XGBoost":
+        expected = model.predict(X_eval)
+    else:
+        with np.errstate(over="ignore", invalid="ignore"):  # sklearn 유한성 검사의 합계 overflow
+            expected = model.predict(_sklearn_safe(X_eval))
+
+    packed = pack_tree_model(model)
+    np.testing.assert_allclose(predict_packed(packed, X_eval), expected, rtol=1e-5, atol=1e-5)
+
+    # 저장 → 로드 후에도 동일
+    save_packed({name: packed}, tmp_path / "trees.npz")
+    loaded = load_packed(tmp_path / "trees.npz")[name]
+    np.testing.assert_allclose(predict_packed(loaded, X_eval), expected, rtol=1e-5, atol=1e-5)